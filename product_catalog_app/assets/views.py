@@ -1,22 +1,18 @@
 from rest_framework import viewsets, serializers, status
 from rest_framework.filters import SearchFilter, OrderingFilter
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
+from core.pagination import StandardResultsSetPagination
 from product_catalog_app.core.utils.file_management import delete_asset_file, save_uploaded_file
 from .models import Asset, AssetAssociation
 from .serializers import AssetSerializer, AssetAssociationSerializer
 
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 200
-
 class AssetViewSet(viewsets.ModelViewSet):
     queryset = Asset.objects.all().order_by('id')
     serializer_class = AssetSerializer
     pagination_class = StandardResultsSetPagination
+    cursor_orderings = {'id': ('id',)}
     permission_classes = [IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filter_fields = ['name', 'type', 'filepath', 'extension', 'url']
@@ -74,6 +70,7 @@ class AssetAssociationViewSet(viewsets.ModelViewSet):
     queryset = AssetAssociation.objects.all().order_by('id')
     serializer_class = AssetAssociationSerializer
     pagination_class = StandardResultsSetPagination
+    cursor_orderings = {'id': ('id',)}
     permission_classes = [IsAuthenticated]    
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_fields = ['entity', 'entity_id']
@@ -3,21 +3,16 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action, api_view
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.filters import SearchFilter, OrderingFilter
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from core.pagination import StandardResultsSetPagination
 from product_catalog_app.containers.django_container import DjangoContainer
 from product_catalog_app.brands.agents.command import BrandCheckCommand
 from product_catalog_app.brands.agents.params import BrandCheckAgentParams
 from .models import Brand
 from .serializers import BrandSerializer
 
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 200
-    
 class BrandViewSet(viewsets.ModelViewSet):
     queryset = Brand.objects.all()
     serializer_class = BrandSerializer
@@ -1,6 +1,28 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class CategoriesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'categories'
+
+    def ready(self):
+        from .models import Category, CategorySystem
+        from .signals import category_changed, category_deleted, category_system_changed
+
+        post_save.connect(
+            receiver=category_changed,
+            sender=Category
+        )
+        post_delete.connect(
+            receiver=category_changed,
+            sender=Category
+        )
+        post_delete.connect(
+            receiver=category_deleted,
+            sender=Category
+        )
+        post_save.connect(
+            receiver=category_system_changed,
+            sender=CategorySystem
+        )
@@ -0,0 +1,235 @@
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+from django.db import transaction
+from django.db.models import F
+from django.utils.text import slugify
+from rest_framework import serializers
+from .models import Category, CategorySystem
+from .snapshots import invalidate_tree_snapshots
+
+class CategoryTreeLoadError(ValueError):
+    """Raised with every problem found in a bulk tree payload; nothing is written."""
+    def __init__(self, errors: List[dict]):
+        super().__init__(f"{len(errors)} invalid categories")
+        self.errors = errors
+
+class CategoryNodeDataSerializer(serializers.ModelSerializer):
+    """Validates the per-node fields of a bulk tree payload."""
+    class Meta:
+        model = Category
+        fields = [
+            'name',
+            'description',
+            'image_url',
+            'banner_image_url',
+            'is_active',
+            'display_order',
+            'meta_title',
+            'meta_description',
+            'meta_keywords',
+            'is_ai_generated',
+            'verification_status',
+        ]
+
+class _Node:
+    __slots__ = ('ref', 'parent_ref', 'parent_id', 'data', 'index', 'category', 'children')
+
+    def __init__(self, ref, parent_ref, parent_id, data, index):
+        self.ref = ref
+        self.parent_ref = parent_ref
+        self.parent_id = parent_id
+        self.data = data
+        self.index = index
+        self.category = None
+        self.children = []
+
+def _flatten(items: List[dict]) -> List[dict]:
+    """Turns a nested payload into flat ``ref``/``parent_ref`` rows."""
+    rows = []
+
+    def visit(item, parent_ref):
+        item = dict(item)
+        children = item.pop('children', None) or item.pop('nested_children_data', None) or []
+        item.setdefault('ref', f"#{len(rows)}")
+        if parent_ref is not None:
+            item['parent_ref'] = parent_ref
+        rows.append(item)
+        for child in children:
+            visit(child, item['ref'])
+
+    for item in items:
+        visit(item, None)
+    return rows
+
+def _sort_key(node: _Node):
+    return tuple(node.data.get(f, Category._meta.get_field(f).get_default()) for f in Category.node_order_by)
+
+def load_category_tree(category_system: CategorySystem, items: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Inserts a tree of categories with one ``bulk_create`` per depth level.
+
+    ``items`` is either nested (``children`` or ``nested_children_data``
+    lists) or flat, where each row has a unique ``ref`` and points at its
+    parent with ``parent_ref``. Any row may attach to an existing category
+    with ``parent`` (its id); rows without a parent become roots. A row whose
+    name already exists in the system is matched to that category instead
+    of created, so its children are added under it.
+
+    ``path``, ``depth`` and ``numchild`` are computed in memory. New
+    siblings are ordered by ``Category.node_order_by`` among themselves and
+    appended after a parent's existing children; ``fix_category_tree`` can
+    renumber a parent that needs a fully sorted order.
+
+    Args:
+        category_system (CategorySystem): The system to load into.
+        items (List[Dict[str, Any]]): The nested or flat payload.
+
+    Returns:
+        Dict[str, int]: The category id for every ``ref`` in the payload.
+
+    Raises:
+        CategoryTreeLoadError: The payload is invalid; nothing was written.
+
+    Example:
+        ids = load_category_tree(system, [
+            {'name': 'Toys', 'children': [{'name': 'Lego'}, {'name': 'Duplo'}]},
+        ])
+    """
+    rows = _flatten(items)
+    errors = []
+    nodes: Dict[str, _Node] = {}
+    for index, row in enumerate(rows):
+        ref = str(row.get('ref'))
+        serializer = CategoryNodeDataSerializer(data=row)
+        if not serializer.is_valid():
+            errors.append({'index': index, 'ref': ref, 'errors': serializer.errors})
+            continue
+        if ref in nodes:
+            errors.append({'index': index, 'ref': ref, 'errors': {'ref': ['Duplicate ref.']}})
+            continue
+        parent_ref = row.get('parent_ref')
+        nodes[ref] = _Node(
+            ref,
+            str(parent_ref) if parent_ref is not None else None,
+            row.get('parent'),
+            serializer.validated_data,
+            index,
+        )
+
+    names = defaultdict(list)
+    for node in nodes.values():
+        names[node.data['name']].append(node)
+        if node.parent_ref is not None:
+            if node.parent_ref not in nodes:
+                errors.append({'index': node.index, 'ref': node.ref, 'errors': {'parent_ref': ['Unknown parent_ref.']}})
+            else:
+                nodes[node.parent_ref].children.append(node)
+    for name, same in names.items():
+        for node in same[1:]:
+            errors.append({'index': node.index, 'ref': node.ref, 'errors': {'name': [f"Duplicate name '{name}'."]}})
+
+    with transaction.atomic():
+        existing = {
+            c.name: c for c in Category.objects.select_for_update().filter(
+                category_system=category_system,
+                name__in=list(names),
+            )
+        }
+        parent_ids = {n.parent_id for n in nodes.values() if n.parent_id is not None and n.parent_ref is None}
+        parents = Category.objects.select_for_update().filter(
+            category_system=category_system,
+            pk__in=parent_ids,
+        ).in_bulk()
+        for node in nodes.values():
+            if node.parent_id is not None and node.parent_ref is None and node.parent_id not in parents:
+                errors.append({'index': node.index, 'ref': node.ref, 'errors': {'parent': ['Unknown parent category.']}})
+            if node.data['name'] in existing:
+                node.category = existing[node.data['name']]
+        if errors:
+            raise CategoryTreeLoadError(sorted(errors, key=lambda e: e['index']))
+
+        used_slugs = set(
+            Category.objects.filter(category_system=category_system).values_list('slug', flat=True)
+        )
+        levels = defaultdict(list)
+        added_children = defaultdict(int)
+
+        def place(siblings: List[_Node], parent: Optional[Category]):
+            """Assigns paths to the new nodes among ``siblings`` and recurses."""
+            new = sorted((n for n in siblings if n.category is None), key=_sort_key)
+            if new:
+                if parent is None:
+                    last = Category.get_last_root_node()
+                    depth, base = 1, ''
+                elif parent.pk is None:
+                    last = None
+                    depth, base = parent.depth + 1, parent.path
+                else:
+                    last = Category.objects.filter(
+                        path__startswith=parent.path,
+                        depth=parent.depth + 1,
+                    ).order_by('-path').first()
+                    depth, base = parent.depth + 1, parent.path
+                    added_children[parent.pk] += len(new)
+                position = last._get_lastpos_in_path() if last else 0
+                for node in new:
+                    position += 1
+                    slug = slugify(node.data['name'])
+                    if slug in used_slugs:
+                        raise CategoryTreeLoadError([{'index': node.index, 'ref': node.ref, 'errors': {'name': [f"Slug '{slug}' is already used."]}}])
+                    used_slugs.add(slug)
+                    node.category = Category(
+                        category_system=category_system,
+                        parent_id=parent.pk if parent else None,
+                        slug=slug,
+                        path=Category._get_path(base, depth, position),
+                        depth=depth,
+                        numchild=0,
+                        **node.data,
+                    )
+                    levels[depth].append(node)
+            for node in siblings:
+                if node.children:
+                    if node.category.pk is None:
+                        node.category.numchild = len([c for c in node.children if c.category is None])
+                    place(node.children, node.category)
+
+        roots = [n for n in nodes.values() if n.parent_ref is None and n.parent_id is None]
+        place(roots, None)
+        by_parent = defaultdict(list)
+        for node in nodes.values():
+            if node.parent_ref is None and node.parent_id is not None:
+                by_parent[node.parent_id].append(node)
+        for parent_id, siblings in by_parent.items():
+            place(siblings, parents[parent_id])
+        unplaced = [n for n in nodes.values() if n.category is None]
+        if unplaced:
+            raise CategoryTreeLoadError([
+                {'index': n.index, 'ref': n.ref, 'errors': {'parent_ref': ['parent_ref forms a cycle.']}}
+                for n in sorted(unplaced, key=lambda n: n.index)
+            ])
+
+        for depth in sorted(levels):
+            level = levels[depth]
+            for node in level:
+                parent = nodes[node.parent_ref].category if node.parent_ref else None
+                if parent is not None:
+                    node.category.parent_id = parent.pk
+            Category.objects.bulk_create([n.category for n in level])
+            _assign_missing_pks(category_system, [n.category for n in level])
+
+        for parent_id, count in added_children.items():
+            Category.objects.filter(pk=parent_id).update(numchild=F('numchild') + count)
+        invalidate_tree_snapshots(category_system.pk)
+
+    return {node.ref: node.category.pk for node in nodes.values()}
+
+def _assign_missing_pks(category_system: CategorySystem, categories: List[Category]) -> None:
+    # MySQL cannot return ids from a multi-row INSERT; paths are unique per system.
+    missing = {c.path: c for c in categories if c.pk is None}
+    if not missing:
+        return
+    for path, pk in Category.objects.filter(
+        category_system=category_system,
+        path__in=list(missing),
+    ).values_list('path', 'id'):
+        missing[path].pk = pk
@@ -0,0 +1,121 @@
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+from django.db.models import F
+from .models import Category
+from .snapshots import invalidate_tree_snapshots
+
+def ancestor_paths(path: str, include_self: bool = True) -> List[str]:
+    """Materialized paths of the ancestors of ``path``, root first."""
+    end = len(path) if include_self else len(path) - Category.steplen
+    return [path[:i] for i in range(Category.steplen, end + 1, Category.steplen)]
+
+def _apply_subtree_deltas(system_id: int, deltas: Dict[str, int]) -> None:
+    by_delta = defaultdict(list)
+    for path, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(path)
+    for delta, paths in by_delta.items():
+        Category.objects.filter(category_system_id=system_id, path__in=paths).update(
+            subtree_product_count=F('subtree_product_count') + delta,
+        )
+
+def adjust_category_counts(deltas: Dict[Optional[int], int]) -> None:
+    """Adds ``delta`` active products to each category id and its ancestors.
+
+    Args:
+        deltas (Dict[int, int]): Change in active product count per
+            category id; ``None`` keys (no category) are ignored.
+
+    Example:
+        adjust_category_counts({old_category_id: -1, new_category_id: 1})
+    """
+    deltas = {pk: delta for pk, delta in deltas.items() if pk is not None and delta}
+    if not deltas:
+        return
+    rows = Category.objects.filter(pk__in=list(deltas)).values_list('pk', 'path', 'category_system_id')
+    subtree = defaultdict(Counter)
+    for pk, path, system_id in rows:
+        Category.objects.filter(pk=pk).update(product_count=F('product_count') + deltas[pk])
+        for ancestor in ancestor_paths(path):
+            subtree[system_id][ancestor] += deltas[pk]
+    for system_id, system_deltas in subtree.items():
+        _apply_subtree_deltas(system_id, system_deltas)
+        invalidate_tree_snapshots(system_id)
+
+def remove_category_counts(category: Category) -> None:
+    """Takes a deleted category's own products off its remaining ancestors.
+
+    Called for every node of a deleted subtree, so each node only removes
+    its direct count.
+    """
+    if category.product_count:
+        _apply_subtree_deltas(
+            category.category_system_id,
+            {path: -category.product_count for path in ancestor_paths(category.path, include_self=False)},
+        )
+
+def ancestor_ids(category: Category) -> List[int]:
+    """Ids of the category's stored ancestors, excluding itself."""
+    path = Category.objects.filter(pk=category.pk).values_list('path', flat=True).first()
+    if path is None:
+        return []
+    return list(
+        Category.objects.filter(
+            category_system_id=category.category_system_id,
+            path__in=ancestor_paths(path, include_self=False),
+        ).values_list('pk', flat=True)
+    )
+
+def move_subtree_counts(category: Category, old_ancestors: List[int]) -> None:
+    """Moves a subtree's total from its old ancestors to its new ones.
+
+    Ancestors are tracked by id because a move may renumber the paths of
+    the nodes around it.
+    """
+    total = Category.objects.filter(pk=category.pk).values_list('subtree_product_count', flat=True).first()
+    if not total:
+        return
+    new_ancestors = ancestor_ids(category)
+    deltas = Counter()
+    for pk in old_ancestors:
+        deltas[pk] -= total
+    for pk in new_ancestors:
+        deltas[pk] += total
+    by_delta = defaultdict(list)
+    for pk, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(pk)
+    for delta, pks in by_delta.items():
+        Category.objects.filter(pk__in=pks).update(subtree_product_count=F('subtree_product_count') + delta)
+
+def rollup_category_counts(direct_counts: Dict[int, int], system_id: Optional[int] = None) -> List[Category]:
+    """Recomputes direct and subtree counts in one pass over the categories.
+
+    Categories are read once in reverse path order, so every node is seen
+    after all of its descendants and can add its total to its parent's.
+
+    Args:
+        direct_counts (Dict[int, int]): Active products per category id.
+        system_id (int): Limit the rebuild to one category system.
+
+    Returns:
+        List[Category]: Categories whose stored counts differ, with the
+        correct values set (not saved).
+    """
+    categories = Category.objects.only('id', 'path', 'category_system_id', 'product_count', 'subtree_product_count')
+    if system_id is not None:
+        categories = categories.filter(category_system_id=system_id)
+    subtree = Counter()
+    changed = []
+    for category in categories.order_by('category_system_id', '-path').iterator():
+        key = (category.category_system_id, category.path)
+        direct = direct_counts.get(category.pk, 0)
+        total = subtree.pop(key, 0) + direct
+        parent_key = (category.category_system_id, category.path[:-Category.steplen])
+        if parent_key[1]:
+            subtree[parent_key] += total
+        if category.product_count != direct or category.subtree_product_count != total:
+            category.product_count = direct
+            category.subtree_product_count = total
+            changed.append(category)
+    return changed
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from categories.models import Category, CategorySystem
+from categories.repair import plan_tree_repair
 from django.db import connection
 
 
@@ -49,15 +50,13 @@ class Command(BaseCommand):
             self.stdout.write(self.style.ERROR(f'Error checking next path: {e}'))
         
         # Check for any orphaned or problematic records
-        try:
-            problems = Category.find_problems()
-            if problems:
-                self.stdout.write(f'\nTree problems: {len(problems)}')
-                for i, problem in enumerate(problems[:3]):
+        for sys in systems:
+            repair = plan_tree_repair(sys)
+            if repair.problems:
+                self.stdout.write(f'\nTree problems in {sys.name}: {len(repair.problems)}')
+                for i, problem in enumerate(repair.problems[:3]):
                     self.stdout.write(f'  Problem {i+1}: {problem}')
             else:
-                self.stdout.write('\nNo tree problems detected')
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f'Error checking problems: {e}'))
+                self.stdout.write(f'\nNo tree problems detected in {sys.name}')
         
         self.stdout.write(self.style.SUCCESS('\n=== Debug Complete ==='))
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
-from categories.models import Category
+from categories.models import CategorySystem
+from categories.repair import REPAIR_BATCH_SIZE, repair_category_tree
 
 
 class Command(BaseCommand):
@@ -11,75 +12,53 @@ class Command(BaseCommand):
             action='store_true',
             help='Show what would be done without making changes',
         )
+        parser.add_argument(
+            '--system',
+            type=int,
+            help='Only repair the category system with this id',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=REPAIR_BATCH_SIZE,
+            help='Categories written per UPDATE statement',
+        )
 
     def handle(self, *args, **options):
         dry_run = options['dry_run']
         
         self.stdout.write(self.style.SUCCESS('Starting category tree fix...'))
         
-        # Check current tree state
-        total_categories = Category.objects.count()
-        self.stdout.write(f'Total categories: {total_categories}')
-        
-        if total_categories == 0:
-            self.stdout.write(self.style.WARNING('No categories found.'))
-            return
-        
-        # Get all paths and check for duplicates
-        paths = list(Category.objects.values_list('path', flat=True))
-        duplicate_paths = [p for p in set(paths) if paths.count(p) > 1]
-        
-        if duplicate_paths:
-            self.stdout.write(
-                self.style.ERROR(f'Found duplicate paths: {duplicate_paths}')
-            )
-        else:
-            self.stdout.write(self.style.SUCCESS('No duplicate paths found.'))
-        
-        # Check tree consistency
-        try:
-            problems = Category.find_problems()
-            if problems:
+        systems = CategorySystem.objects.order_by('id')
+        if options['system'] is not None:
+            systems = systems.filter(pk=options['system'])
+
+        # Each system is rebuilt from its parent links in memory and only
+        # the rows that differ are written
+        total_changes = 0
+        for system in systems:
+            repair = repair_category_tree(system, dry_run=dry_run, batch_size=options['batch_size'])
+            total_changes += len(repair.changes)
+            if repair.is_consistent:
                 self.stdout.write(
-                    self.style.ERROR(f'Tree problems found: {len(problems)} issues')
+                    self.style.SUCCESS(f'{system.name}: {repair.total} categories, tree is consistent.')
                 )
-                for problem in problems[:5]:  # Show first 5 problems
-                    self.stdout.write(f'  - {problem}')
-                if len(problems) > 5:
-                    self.stdout.write(f'  ... and {len(problems) - 5} more')
-            else:
-                self.stdout.write(self.style.SUCCESS('Tree structure is consistent.'))
-        except Exception as e:
+                continue
             self.stdout.write(
-                self.style.ERROR(f'Error checking tree problems: {e}')
+                self.style.ERROR(
+                    f'{system.name}: {len(repair.changes)} of {repair.total} categories need fixing'
+                )
             )
-        
-        # Fix the tree if not dry run
-        if not dry_run:
-            if duplicate_paths or (problems if 'problems' in locals() else False):
-                self.stdout.write('Attempting to fix tree structure...')
-                try:
-                    Category.fix_tree()
-                    self.stdout.write(self.style.SUCCESS('Tree structure fixed!'))
-                    
-                    # Verify fix
-                    new_paths = list(Category.objects.values_list('path', flat=True))
-                    new_duplicates = [p for p in set(new_paths) if new_paths.count(p) > 1]
-                    
-                    if new_duplicates:
-                        self.stdout.write(
-                            self.style.ERROR(f'Still have duplicate paths: {new_duplicates}')
-                        )
-                    else:
-                        self.stdout.write(self.style.SUCCESS('All path duplicates resolved!'))
-                        
-                except Exception as e:
-                    self.stdout.write(
-                        self.style.ERROR(f'Error fixing tree: {e}')
-                    )
-            else:
-                self.stdout.write(self.style.SUCCESS('No fixes needed.'))
-        else:
+            for problem in repair.problems[:5]:  # Show first 5 problems
+                self.stdout.write(f'  - {problem}')
+            if len(repair.problems) > 5:
+                self.stdout.write(f'  ... and {len(repair.problems) - 5} more')
+
+        if dry_run:
             self.stdout.write(self.style.WARNING('Dry run mode - no changes made.'))
+        elif total_changes:
+            self.stdout.write(self.style.SUCCESS(f'Tree structure fixed! Updated {total_changes} categories.'))
+        else:
+            self.stdout.write(self.style.SUCCESS('No fixes needed.'))
         
         self.stdout.write(self.style.SUCCESS('Category tree fix completed.'))
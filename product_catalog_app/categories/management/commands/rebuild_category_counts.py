@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from categories.counts import rollup_category_counts
+from categories.models import Category
+from categories.snapshots import invalidate_tree_snapshots
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Recompute direct and subtree active product counts for every category'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--system',
+            type=int,
+            help='Only rebuild the categories of this category system id',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Categories written per UPDATE statement',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the categories that are off without saving them',
+        )
+
+    def handle(self, *args, **options):
+        system_id = options['system']
+        products = Product.objects.filter(is_active=True, category__isnull=False)
+        if system_id is not None:
+            products = products.filter(category__category_system_id=system_id)
+
+        with transaction.atomic():
+            direct_counts = dict(
+                products.order_by().values_list('category_id').annotate(total=Count('id'))
+            )
+            changed = rollup_category_counts(direct_counts, system_id)
+            self.stdout.write(f'{len(changed)} categories have stale product counts')
+            if options['dry_run']:
+                for category in changed[:50]:
+                    self.stdout.write(
+                        f'  {category.pk}: {category.product_count} direct, '
+                        f'{category.subtree_product_count} in subtree'
+                    )
+                return
+            Category.objects.bulk_update(
+                changed,
+                ['product_count', 'subtree_product_count'],
+                batch_size=options['batch_size'],
+            )
+            for changed_system in {category.category_system_id for category in changed}:
+                invalidate_tree_snapshots(changed_system)
+        self.stdout.write(self.style.SUCCESS(f'Updated product counts of {len(changed)} categories'))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 01:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('categories', '0005_category_is_ai_generated_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='product_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='subtree_product_count',
+            field=models.IntegerField(default=0),
+        ),
+    ]
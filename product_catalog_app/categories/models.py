@@ -100,6 +100,10 @@ class Category(MP_Node):
         default='EXEMPT',
         help_text="Status realted to AI generated product's that require verification",
     )
+    # active products assigned to this category, and to it or any descendant;
+    # kept by categories.counts
+    product_count = models.IntegerField(default=0)
+    subtree_product_count = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -118,6 +122,18 @@ class Category(MP_Node):
         if not self.slug:
             self.slug = slugify(self.name)
         super().save(*args, **kwargs)
+
+    def move(self, target, pos=None):
+        # treebeard rewrites the moved subtree's paths with raw SQL, so no
+        # post_save fires for it
+        from .counts import ancestor_ids, move_subtree_counts
+        from .signals import category_moved
+        from .snapshots import invalidate_tree_snapshots
+        old_ancestors = ancestor_ids(self)
+        super().move(target, pos)
+        move_subtree_counts(self, old_ancestors)
+        invalidate_tree_snapshots(self.category_system_id)
+        category_moved.send(sender=Category, instance=self)
         
     def __str__(self):
         return '-' * (self.depth - 1) + ' ' + self.name if self.depth > 0 else self.name
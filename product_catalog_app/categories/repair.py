@@ -0,0 +1,216 @@
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
+from django.db import transaction
+from .counts import rollup_category_counts
+from .models import Category, CategorySystem
+from .snapshots import invalidate_tree_snapshots
+
+logger = logging.getLogger(__name__)
+
+REPAIR_BATCH_SIZE = 1000
+
+# Prefix for the parking paths used while rows swap paths; it sorts after
+# treebeard's alphabet and never appears in a real path.
+PARKING_PREFIX = '~'
+
+class TreeRepair():
+    """The difference between a system's stored tree columns and the ones its
+    ``parent`` FKs imply.
+
+    ``changes`` holds the categories whose ``path``, ``depth``, ``numchild``
+    or ``parent`` differ, with the corrected values set (not saved).
+    ``problems`` describes what was wrong, one line per category.
+    """
+    def __init__(self, category_system: CategorySystem, total: int):
+        self.category_system = category_system
+        self.total = total
+        self.changes: List[Category] = []
+        self.moved: List[int] = []
+        self.problems: List[str] = []
+
+    def __str__(self):
+        return f"TreeRepair(system={self.category_system.pk}, total={self.total}, changes={len(self.changes)})"
+
+    @property
+    def is_consistent(self) -> bool:
+        return not self.changes
+
+def _sort_key(category: Category):
+    return (category.display_order, category.name, category.pk)
+
+def _load_nodes(category_system: CategorySystem, lock: bool = False) -> List[Category]:
+    queryset = Category.objects.filter(category_system=category_system).only(
+        'id', 'parent_id', 'display_order', 'name', 'path', 'depth', 'numchild',
+        'category_system_id', 'product_count', 'subtree_product_count',
+    )
+    if lock:
+        queryset = queryset.select_for_update()
+    return list(queryset.order_by('id'))
+
+def _root_steps(category_system: CategorySystem, nodes: List[Category], needed: int) -> List[int]:
+    # Roots are global in treebeard, so the system keeps the root slots its
+    # depth-1 nodes already hold and takes new ones after the last root.
+    steps = sorted(
+        Category._str2int(node.path)
+        for node in nodes
+        if len(node.path) == Category.steplen
+    )
+    if len(steps) < needed:
+        last_root = (
+            Category.objects.filter(depth=1)
+            .exclude(category_system=category_system)
+            .order_by('-path')
+            .values_list('path', flat=True)
+            .first()
+        )
+        last = max([0] + steps + ([Category._str2int(last_root)] if last_root else []))
+        steps.extend(range(last + 1, last + 1 + needed - len(steps)))
+    return steps[:needed]
+
+def plan_tree_repair(category_system: CategorySystem, nodes: Optional[List[Category]] = None) -> TreeRepair:
+    """Rebuilds a system's ``path``, ``depth`` and ``numchild`` from ``parent`` in memory.
+
+    The ``parent`` FK is taken as the source of truth. Siblings are
+    ordered like ``node_order_by`` (``display_order``, ``name``, then id)
+    and numbered from the first step, so the whole system is laid out in
+    one pass over the nodes loaded by a single query. Parents that are
+    missing or belong to another system make the node a root; a parent
+    cycle is broken by making its lowest id a root.
+
+    Args:
+        category_system (CategorySystem): The system to check.
+        nodes (List[Category]): Preloaded nodes of the system, if any.
+
+    Returns:
+        TreeRepair: The categories to update and the problems found.
+
+    Example:
+        repair = plan_tree_repair(system)
+        if not repair.is_consistent:
+            apply_tree_repair(repair)
+    """
+    if nodes is None:
+        nodes = _load_nodes(category_system)
+    repair = TreeRepair(category_system, len(nodes))
+    by_id = {node.pk: node for node in nodes}
+    parents: Dict[int, Optional[int]] = {}
+    children = defaultdict(list)
+    for node in nodes:
+        parent_id = node.parent_id
+        if parent_id is not None and parent_id not in by_id:
+            repair.problems.append(f"{node.pk} '{node.name}': parent {parent_id} is not in this system")
+            parent_id = None
+        parents[node.pk] = parent_id
+        children[parent_id].append(node)
+
+    layout = {}
+
+    def place(roots: List[Category], base: str, depth: int) -> None:
+        # iterative depth-first walk; each node is visited once
+        stack = [(roots, base, depth)]
+        while stack:
+            siblings, parent_path, level = stack.pop()
+            siblings.sort(key=_sort_key)
+            for position, node in enumerate(siblings, start=1):
+                path = Category._get_path(parent_path, level, position)
+                layout[node.pk] = (path, level, len(children[node.pk]))
+                if children[node.pk]:
+                    stack.append((children[node.pk], path, level + 1))
+
+    roots = list(children[None])
+    # nodes unreachable from a root sit on a parent cycle (or below one)
+    reached = set()
+    stack = [node.pk for node in roots]
+    while stack:
+        pk = stack.pop()
+        reached.add(pk)
+        stack.extend(child.pk for child in children[pk])
+    for node in nodes:
+        if node.pk in reached:
+            continue
+        # walk up until a node repeats: that closes the cycle
+        chain, on_chain, pk = [], set(), node.pk
+        while pk not in on_chain:
+            chain.append(pk)
+            on_chain.add(pk)
+            pk = parents[pk]
+        breaker = by_id[min(chain[chain.index(pk):])]
+        repair.problems.append(f"{breaker.pk} '{breaker.name}': parent cycle, made a root")
+        children[parents[breaker.pk]].remove(breaker)
+        parents[breaker.pk] = None
+        roots.append(breaker)
+        stack = [breaker.pk]
+        while stack:
+            pk = stack.pop()
+            reached.add(pk)
+            stack.extend(child.pk for child in children[pk] if child.pk not in reached)
+
+    roots.sort(key=_sort_key)
+    steps = _root_steps(category_system, nodes, len(roots))
+    for node, step in zip(roots, steps):
+        path = Category._get_path('', 1, step)
+        layout[node.pk] = (path, 1, len(children[node.pk]))
+        if children[node.pk]:
+            place(children[node.pk], path, 2)
+
+    for node in nodes:
+        path, depth, numchild = layout[node.pk]
+        parent_id = parents[node.pk]
+        if (node.path, node.depth, node.numchild, node.parent_id) == (path, depth, numchild, parent_id):
+            continue
+        if node.path != path:
+            repair.moved.append(node.pk)
+            repair.problems.append(f"{node.pk} '{node.name}': path {node.path} should be {path}")
+        elif (node.depth, node.numchild) != (depth, numchild):
+            repair.problems.append(
+                f"{node.pk} '{node.name}': depth/numchild {node.depth}/{node.numchild} should be {depth}/{numchild}"
+            )
+        node.path, node.depth, node.numchild, node.parent_id = path, depth, numchild, parent_id
+        repair.changes.append(node)
+    return repair
+
+def apply_tree_repair(repair: TreeRepair, batch_size: int = REPAIR_BATCH_SIZE) -> int:
+    """Writes a planned repair with ``bulk_update`` and refreshes derived data.
+
+    Rows whose path changes are first parked on a unique temporary path so
+    that paths can be swapped without tripping the unique index. The
+    subtree product counts are rolled up again from the direct counts and
+    the system's tree snapshots are invalidated.
+
+    Returns:
+        int: The number of categories updated.
+    """
+    if repair.is_consistent:
+        return 0
+    with transaction.atomic():
+        parked = [Category(pk=pk, path=f"{PARKING_PREFIX}{pk}") for pk in repair.moved]
+        Category.objects.bulk_update(parked, ['path'], batch_size=batch_size)
+        Category.objects.bulk_update(
+            repair.changes, ['path', 'depth', 'numchild', 'parent'], batch_size=batch_size,
+        )
+        direct_counts = dict(
+            Category.objects.filter(category_system=repair.category_system).values_list('id', 'product_count')
+        )
+        recounted = rollup_category_counts(direct_counts, repair.category_system.pk)
+        Category.objects.bulk_update(recounted, ['subtree_product_count'], batch_size=batch_size)
+        invalidate_tree_snapshots(repair.category_system.pk)
+    logger.info(f"Repaired {len(repair.changes)} categories of system {repair.category_system.pk}")
+    return len(repair.changes)
+
+def repair_category_tree(
+    category_system: CategorySystem,
+    dry_run: bool = False,
+    batch_size: int = REPAIR_BATCH_SIZE,
+) -> TreeRepair:
+    """Plans and, unless ``dry_run``, applies the repair of one system.
+
+    The system's rows are locked only for the load, the in-memory rebuild
+    and the bulk writes, all in one short transaction.
+    """
+    if dry_run:
+        return plan_tree_repair(category_system)
+    with transaction.atomic():
+        repair = plan_tree_repair(category_system, _load_nodes(category_system, lock=True))
+        apply_tree_repair(repair, batch_size)
+    return repair
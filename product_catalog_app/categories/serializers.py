@@ -66,6 +66,8 @@ class CategorySerializer(serializers.ModelSerializer):
             'meta_keywords',
             'is_ai_generated',
             'verification_status',
+            'product_count',
+            'subtree_product_count',
             'created_at',
             'updated_at',
             'parent',
@@ -81,7 +83,7 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = [
             'slug', 'created_at', 'updated_at',
             'depth', 'path', 'category_system_name', 'category_system_slug', 
-            'parent_name',
+            'parent_name', 'product_count', 'subtree_product_count',
         ]
 
     def get_parent_name(self, obj):
@@ -163,4 +165,13 @@ class CategorySerializer(serializers.ModelSerializer):
                     instance.move(None)
             instance.parent = None
         instance.save()
-        return instance
\ No newline at end of file
+        return instance
+
+class CategoryNodeSerializer(CategorySerializer):
+    """``CategorySerializer`` without the per-node ``children`` and
+    ``parent_name`` lookups, which ``categories.tree`` fills in memory."""
+    class Meta(CategorySerializer.Meta):
+        fields = [
+            f for f in CategorySerializer.Meta.fields
+            if f not in ('children', 'parent_name')
+        ]
@@ -0,0 +1,17 @@
+from django.dispatch import Signal
+from .counts import remove_category_counts
+from .models import Category, CategorySystem
+from .snapshots import invalidate_tree_snapshots
+
+# Sent after Category.move, which rewrites paths without post_save.
+category_moved = Signal()
+
+def category_changed(sender, instance: Category, **kwargs):
+    invalidate_tree_snapshots(instance.category_system_id)
+
+# Snapshots carry the system's name and slug on every node.
+def category_system_changed(sender, instance: CategorySystem, **kwargs):
+    invalidate_tree_snapshots(instance.pk)
+
+def category_deleted(sender, instance: Category, **kwargs):
+    remove_category_counts(instance)
@@ -0,0 +1,60 @@
+import uuid
+from typing import Optional
+from cachalot.api import cachalot_disabled
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from .models import Category, CategorySystem
+from .tree import build_category_tree, load_tree_nodes
+
+TREE_SNAPSHOT_TIMEOUT = 60 * 60 * 24
+
+def _version_key(system_id: int) -> str:
+    return f"category-tree:{system_id}:version"
+
+def get_tree_version(system_id: int) -> str:
+    """Returns the current tree version of a category system.
+
+    Versions are random tokens rather than counters so a version evicted
+    from the cache is replaced by a new one instead of reusing an old
+    snapshot.
+    """
+    version = cache.get(_version_key(system_id))
+    if version is None:
+        cache.add(_version_key(system_id), uuid.uuid4().hex, None)
+        version = cache.get(_version_key(system_id))
+    return version
+
+def invalidate_tree_snapshots(system_id: int) -> None:
+    """Moves the system's tree version forward once the transaction commits.
+
+    Bumping after commit keeps a concurrent reader from caching the old
+    tree under the new version.
+    """
+    transaction.on_commit(lambda: cache.set(_version_key(system_id), uuid.uuid4().hex, None))
+
+def tree_etag(system_id: int, version: str, root_id: Optional[int], depth: int) -> str:
+    return f'"{system_id}-{version}-{root_id or 0}-{depth}"'
+
+def get_tree_snapshot(category_system: CategorySystem, version: str, root: Optional[Category] = None, depth: int = 2) -> bytes:
+    """Returns the rendered tree JSON for a system version, building it on a miss.
+
+    Args:
+        category_system (CategorySystem): The system to render.
+        version (str): From ``get_tree_version``; part of the cache key.
+        root (Category): Optional subtree root.
+        depth (int): Levels of children nested under each node.
+
+    Returns:
+        bytes: The JSON document served by the tree endpoint.
+    """
+    key = f"category-tree:{category_system.pk}:{version}:{root.pk if root else 0}:{depth}"
+    content = cache.get(key)
+    if content is None:
+        # the snapshot is the cache; keeping the tree query in cachalot too
+        # would only be flushed by writes to other systems
+        with cachalot_disabled():
+            nodes = load_tree_nodes(category_system, root=root)
+        content = JSONRenderer().render(build_category_tree(nodes, depth=depth))
+        cache.set(key, content, TREE_SNAPSHOT_TIMEOUT)
+    return content
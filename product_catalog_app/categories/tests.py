@@ -1,3 +1,322 @@
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from products.ingest import bulk_create_products
+from products.models import Product
+from .bulk import CategoryTreeLoadError, load_category_tree
+from .models import Category, CategorySystem
+from .repair import plan_tree_repair, repair_category_tree
+from .serializers import CategorySerializer
+from .snapshots import get_tree_version
+from .tree import build_category_tree, load_tree_nodes
 
-# Create your tests here.
+class CategoryTreeTestCase(TestCase):
+    """Storefront tree shared by the builder, count and repair tests:
+    Toys > Lego > Duplo and an empty Books root."""
+    def setUp(self):
+        self.system = CategorySystem.objects.create(name='Storefront')
+        self.toys = Category.add_root(name='Toys', category_system=self.system)
+        self.books = Category.add_root(name='Books', category_system=self.system)
+        self.lego = self.add_child(self.toys, 'Lego')
+        self.duplo = self.add_child(self.lego, 'Duplo')
+
+    def add_child(self, parent, name):
+        parent.refresh_from_db()
+        child = parent.add_child(name=name, category_system=self.system)
+        child.parent = parent
+        child.save()
+        return child
+
+class CategoryTreeBuilderTest(CategoryTreeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.add_child(self.duplo, 'Duplo Animals')
+        self.add_child(self.books, 'Fiction')
+        other = CategorySystem.objects.create(name='Supplier')
+        Category.add_root(name='Elsewhere', category_system=other)
+
+    def test_matches_serializer_output(self):
+        """
+        Test that the tree builder renders the same JSON as CategorySerializer
+        """
+        categories = Category.objects.filter(category_system=self.system).order_by('path')
+        expected = CategorySerializer(categories, many=True).data
+        with self.assertNumQueries(1):
+            tree = build_category_tree(load_tree_nodes(self.system))
+        self.assertEqual(tree, expected)
+
+    def test_subtree_and_depth(self):
+        """
+        Test that a subtree root and depth limit the rendered tree
+        """
+        self.lego.refresh_from_db()
+        tree = build_category_tree(load_tree_nodes(self.system, root=self.lego), depth=5)
+        self.assertEqual([n['name'] for n in tree], ['Lego', 'Duplo', 'Duplo Animals'])
+        self.assertEqual(tree[0]['parent_name'], 'Toys')
+        self.assertEqual(tree[0]['children'][0]['children'][0]['name'], 'Duplo Animals')
+        self.assertEqual(build_category_tree(load_tree_nodes(self.system), depth=0)[0]['children'], [])
+
+class CategoryTreeSnapshotTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.system = CategorySystem.objects.create(name='Storefront')
+        self.other = CategorySystem.objects.create(name='Supplier')
+        self.toys = Category.add_root(name='Toys', category_system=self.system)
+        self.books = Category.add_root(name='Books', category_system=self.system)
+        Category.add_root(name='Parts', category_system=self.other)
+        self.client = APIClient()
+        self.client.force_authenticate(user=get_user_model()(username='shopper'))
+
+    def test_writes_bump_only_their_system(self):
+        """
+        Test that adds, moves and deletes move only the affected system's version
+        """
+        self.toys.refresh_from_db()
+        self.books.refresh_from_db()
+        versions = [get_tree_version(self.system.pk)]
+        other_version = get_tree_version(self.other.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            child = self.toys.add_child(name='Lego', category_system=self.system)
+        versions.append(get_tree_version(self.system.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            child.move(self.books, pos='sorted-child')
+        versions.append(get_tree_version(self.system.pk))
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.get(pk=child.pk).delete()
+        versions.append(get_tree_version(self.system.pk))
+        self.assertEqual(len(set(versions)), 4)
+        self.assertEqual(get_tree_version(self.other.pk), other_version)
+
+    def test_renaming_system_bumps_its_version(self):
+        """
+        Test that a system rename or slug change invalidates its cached trees
+        """
+        etag = self.client.get('/api/categories/tree/', {'system_id': self.system.pk})['ETag']
+        version = get_tree_version(self.system.pk)
+        self.system.name = 'Webshop'
+        self.system.slug = 'webshop'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.system.save()
+        self.assertNotEqual(get_tree_version(self.system.pk), version)
+        response = self.client.get('/api/categories/tree/', {'system_id': self.system.pk}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['category_system_slug'], 'webshop')
+
+    def test_tree_endpoint_serves_etags(self):
+        """
+        Test that the tree endpoint answers conditional requests with 304
+        """
+        response = self.client.get('/api/categories/tree/', {'system_id': self.system.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([n['name'] for n in response.json()], ['Books', 'Toys'])
+        etag = response['ETag']
+
+        with self.assertNumQueries(1):
+            cached = self.client.get('/api/categories/tree/', {'system_id': self.system.pk}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(cached.status_code, 304)
+
+        self.toys.refresh_from_db()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.toys.add_child(name='Lego', category_system=self.system)
+        changed = self.client.get('/api/categories/tree/', {'system_id': self.system.pk}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+        self.assertEqual(changed.json()[1]['children'][0]['name'], 'Lego')
+
+class LoadCategoryTreeTest(TestCase):
+    def setUp(self):
+        self.system = CategorySystem.objects.create(name='Storefront')
+        self.toys = Category.add_root(name='Toys', category_system=self.system)
+        self.toys.add_child(name='Puzzles', category_system=self.system)
+        self.toys.refresh_from_db()
+
+    def test_nested_payload_builds_valid_tree(self):
+        """
+        Test that a nested payload is inserted with consistent paths and counts
+        """
+        ids = load_category_tree(self.system, [
+            {'name': 'Books', 'children': [
+                {'name': 'Fiction', 'children': [{'name': 'Sci-Fi'}]},
+                {'name': 'Comics', 'display_order': 1},
+            ]},
+            {'ref': 'toys', 'name': 'Toys', 'children': [{'name': 'Lego'}]},
+        ])
+        self.assertEqual(len(ids), 6)
+        self.assertEqual(ids['toys'], self.toys.pk)
+        self.assertEqual(Category.find_problems(), ([], [], [], [], []))
+        books = Category.objects.get(name='Books')
+        self.assertEqual(books.numchild, 2)
+        self.assertEqual([c.name for c in books.get_children()], ['Fiction', 'Comics'])
+        self.assertEqual(Category.objects.get(name='Sci-Fi').parent.name, 'Fiction')
+        self.toys.refresh_from_db()
+        self.assertEqual([c.name for c in self.toys.get_children()], ['Puzzles', 'Lego'])
+        self.assertEqual(self.toys.numchild, 2)
+
+    def test_flat_payload_one_insert_per_level(self):
+        """
+        Test that a flat parent_ref payload is written with one INSERT per depth
+        """
+        rows = [{'ref': 'root', 'name': 'Garden', 'parent': None}]
+        rows += [{'ref': f'c{i}', 'parent_ref': 'root', 'name': f'Child {i}'} for i in range(20)]
+        rows += [{'ref': f'g{i}', 'parent_ref': f'c{i % 20}', 'name': f'Grandchild {i}'} for i in range(40)]
+        with CaptureQueriesContext(connection) as queries:
+            load_category_tree(self.system, rows)
+        inserts = [q for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "categories_category"')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(Category.find_problems(), ([], [], [], [], []))
+        self.assertEqual(Category.objects.get(name='Child 3').get_children().count(), 2)
+
+    def test_invalid_payload_writes_nothing(self):
+        """
+        Test that every invalid row is reported and nothing is inserted
+        """
+        count = Category.objects.count()
+        with self.assertRaises(CategoryTreeLoadError) as raised:
+            load_category_tree(self.system, [
+                {'ref': 'a', 'name': 'Alpha', 'parent_ref': 'b'},
+                {'ref': 'b', 'name': 'Beta', 'parent_ref': 'a'},
+                {'ref': 'c', 'name': 'Gamma', 'parent_ref': 'missing'},
+                {'ref': 'd', 'name': ''},
+            ])
+        self.assertEqual([e['ref'] for e in raised.exception.errors], ['c', 'd'])
+        self.assertEqual(Category.objects.count(), count)
+
+class CategoryProductCountTest(CategoryTreeTestCase):
+    def assertCounts(self, category, direct, subtree):
+        category.refresh_from_db()
+        self.assertEqual((category.product_count, category.subtree_product_count), (direct, subtree))
+
+    def test_product_changes_roll_up(self):
+        """
+        Test that saving, deactivating, moving and deleting products update the counts
+        """
+        product = Product.objects.create(name='Brick', category=self.duplo)
+        bulk_create_products([
+            {'name': 'Set', 'category': self.lego},
+            {'name': 'Hidden', 'category': self.lego, 'is_active': False},
+        ])
+        self.assertCounts(self.duplo, 1, 1)
+        self.assertCounts(self.lego, 1, 2)
+        self.assertCounts(self.toys, 0, 2)
+
+        product.is_active = False
+        product.save()
+        self.assertCounts(self.toys, 0, 1)
+        product.is_active = True
+        product.category = self.books
+        product.save()
+        self.assertCounts(self.duplo, 0, 0)
+        self.assertCounts(self.books, 1, 1)
+        product.delete()
+        self.assertCounts(self.books, 0, 0)
+        self.assertCounts(self.toys, 0, 1)
+
+    def test_subtree_move_and_delete(self):
+        """
+        Test that moving or deleting a subtree shifts its total between ancestors
+        """
+        Product.objects.create(name='Brick', category=self.duplo)
+        Product.objects.create(name='Set', category=self.lego)
+        self.lego.refresh_from_db()
+        self.books.refresh_from_db()
+        self.lego.move(self.books, 'sorted-child')
+        self.assertCounts(self.toys, 0, 0)
+        self.assertCounts(self.books, 0, 2)
+        self.assertCounts(self.lego, 1, 2)
+
+        Category.objects.get(pk=self.duplo.pk).delete()
+        self.assertCounts(self.books, 0, 1)
+        self.assertCounts(self.lego, 1, 1)
+
+    def test_rebuild_command(self):
+        """
+        Test that the rebuild command restores counts that drifted
+        """
+        Product.objects.create(name='Brick', category=self.duplo)
+        Product.objects.create(name='Novel', category=self.books)
+        Category.objects.update(product_count=7, subtree_product_count=7)
+        call_command('rebuild_category_counts', stdout=StringIO())
+        self.assertCounts(self.duplo, 1, 1)
+        self.assertCounts(self.lego, 0, 1)
+        self.assertCounts(self.toys, 0, 1)
+        self.assertCounts(self.books, 1, 1)
+
+    def test_counts_in_list_endpoint(self):
+        """
+        Test that the category list exposes direct and subtree counts
+        """
+        Product.objects.create(name='Brick', category=self.duplo)
+        client = APIClient()
+        client.force_authenticate(user=get_user_model()(username='admin'))
+        response = client.get('/api/categories/', {'category_system_id': self.system.pk, 'page_size': 50})
+        self.assertEqual(response.status_code, 200)
+        results = response.json()
+        results = results.get('results', results)
+        toys = next(c for c in results if c['id'] == self.toys.pk)
+        self.assertEqual((toys['product_count'], toys['subtree_product_count']), (0, 1))
+
+class CategoryTreeRepairTest(CategoryTreeTestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = CategorySystem.objects.create(name='Supplier')
+        self.parts = Category.add_root(name='Parts', category_system=self.other)
+        self.fiction = self.add_child(self.books, 'Fiction')
+
+    def stored(self):
+        return {
+            c.name: (c.path, c.depth, c.numchild)
+            for c in Category.objects.filter(category_system=self.system)
+        }
+
+    def test_consistent_tree_is_left_alone(self):
+        """
+        Test that a consistent tree plans no changes in one query
+        """
+        with self.assertNumQueries(1):
+            repair = plan_tree_repair(self.system)
+        self.assertTrue(repair.is_consistent)
+        self.assertEqual(repair.total, 5)
+
+    def test_rebuilds_paths_from_parent_links(self):
+        """
+        Test that swapped paths and a re-parented node are repaired with only the changed rows
+        """
+        expected = self.stored()
+        expected_parts = Category.objects.get(pk=self.parts.pk).path
+        # swap the two roots' subtrees and point Duplo at Books
+        lego_path = Category.objects.get(pk=self.lego.pk).path
+        fiction_path = Category.objects.get(pk=self.fiction.pk).path
+        Category.objects.filter(pk=self.lego.pk).update(path=lego_path.replace(lego_path[:4], '0009'))
+        Category.objects.filter(pk=self.fiction.pk).update(path=lego_path)
+        Category.objects.filter(pk=self.lego.pk).update(path=fiction_path)
+        Category.objects.filter(pk=self.duplo.pk).update(parent=self.books)
+
+        dry = repair_category_tree(self.system, dry_run=True)
+        self.assertEqual(len(dry.changes), 4)
+        self.assertEqual(Category.objects.get(pk=self.lego.pk).path, fiction_path)
+
+        repair_category_tree(self.system)
+        books_path = Category.objects.get(pk=self.books.pk).path
+        stored = self.stored()
+        self.assertEqual(stored['Lego'], (expected['Lego'][0], 2, 0))
+        self.assertEqual(stored['Toys'], (expected['Toys'][0], 1, 1))
+        self.assertEqual(stored['Books'][2], 2)
+        self.assertEqual([stored['Duplo'][0][:4], stored['Duplo'][1]], [books_path, 2])
+        self.assertEqual(Category.objects.get(pk=self.parts.pk).path, expected_parts)
+        self.assertTrue(plan_tree_repair(self.system).is_consistent)
+        self.assertEqual(Category.find_problems(), ([], [], [], [], []))
+
+    def test_breaks_parent_cycles(self):
+        """
+        Test that a parent cycle is broken at its lowest id
+        """
+        Category.objects.filter(pk=self.toys.pk).update(parent=self.duplo)
+        repair = repair_category_tree(self.system)
+        self.assertIn(f"{self.toys.pk} 'Toys': parent cycle, made a root", repair.problems)
+        self.assertIsNone(Category.objects.get(pk=self.toys.pk).parent_id)
+        self.assertTrue(plan_tree_repair(self.system).is_consistent)
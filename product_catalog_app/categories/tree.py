@@ -0,0 +1,67 @@
+from collections import defaultdict
+from typing import Dict, List, Optional
+from .models import Category, CategorySystem
+from .serializers import CategoryNodeSerializer, CategorySerializer
+
+DEFAULT_TREE_DEPTH = 2
+
+# CategorySerializer's output fields, in order
+TREE_FIELDS = [
+    f for f in CategorySerializer.Meta.fields
+    if f not in ('nested_children_data',)
+]
+
+def load_tree_nodes(category_system: CategorySystem, root: Optional[Category] = None) -> List[Category]:
+    """Loads a whole system, or the subtree under ``root``, with one query in path order."""
+    queryset = Category.objects.filter(category_system=category_system)
+    if root is not None:
+        queryset = queryset.filter(path__startswith=root.path)
+    return list(queryset.select_related('category_system').order_by('path'))
+
+def build_category_tree(nodes: List[Category], depth: int = DEFAULT_TREE_DEPTH) -> List[dict]:
+    """Renders ``nodes`` in the shape ``CategorySerializer`` gives the tree endpoint.
+
+    Every node is listed in path order with its ``children`` nested
+    ``depth`` levels deep. Children are found from the materialized
+    ``path`` (a child's path is its parent's plus one step) and
+    ``parent_name`` from the ``parent`` FK, both in memory, so rendering
+    issues no queries beyond the one that loaded ``nodes`` (and one for
+    parents outside of them when rendering a subtree).
+
+    Args:
+        nodes (List[Category]): Categories of one system ordered by path,
+            e.g. from ``load_tree_nodes``.
+        depth (int): Levels of ``children`` to nest under each node.
+
+    Returns:
+        List[dict]: One serialized node per category.
+
+    Example:
+        build_category_tree(load_tree_nodes(system, root=category), depth=5)
+    """
+    flat = {node.pk: data for node, data in zip(nodes, CategoryNodeSerializer(nodes, many=True).data)}
+    by_path = {node.path: node for node in nodes}
+    names = {node.pk: node.name for node in nodes}
+    missing_parents = {node.parent_id for node in nodes if node.parent_id and node.parent_id not in names}
+    if missing_parents:
+        names.update(Category.objects.filter(pk__in=missing_parents).values_list('pk', 'name'))
+
+    children: Dict[int, List[Category]] = defaultdict(list)
+    for node in nodes:
+        parent = by_path.get(node.path[:-Category.steplen])
+        if parent is not None and node.depth == parent.depth + 1:
+            children[parent.pk].append(node)
+
+    def render(node: Category, remaining: int) -> dict:
+        fields = flat[node.pk]
+        data = {}
+        for field in TREE_FIELDS:
+            if field == 'parent_name':
+                data[field] = names.get(node.parent_id)
+            elif field == 'children':
+                data[field] = [render(child, remaining - 1) for child in children[node.pk]] if remaining > 0 else []
+            else:
+                data[field] = fields[field]
+        return data
+
+    return [render(node, depth) for node in nodes]
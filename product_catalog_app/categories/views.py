@@ -2,24 +2,26 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.filters import SearchFilter, OrderingFilter
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from django.http import HttpResponse, HttpResponseNotModified
 from django.shortcuts import get_object_or_404
+from core.pagination import StandardResultsSetPagination
+from .bulk import CategoryTreeLoadError, load_category_tree
 from .models import CategorySystem, Category
 from .serializers import CategorySystemSerializer, CategorySerializer
+from .snapshots import get_tree_snapshot, get_tree_version, tree_etag
+from .tree import DEFAULT_TREE_DEPTH
 
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
+class CategoryResultsSetPagination(StandardResultsSetPagination):
     max_page_size = 1000
     
 class CategorySystemViewSet(viewsets.ModelViewSet):
     queryset = CategorySystem.objects.all().order_by('name')
     serializer_class = CategorySystemSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = CategoryResultsSetPagination
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filter_fields = ['name']
     search_fields = ['name']
@@ -33,7 +35,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
     queryset = Category.objects.all().order_by('category_system__name', 'path')
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = StandardResultsSetPagination
+    pagination_class = CategoryResultsSetPagination
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['name']
     search_fields = ['name', 'description']
@@ -88,6 +90,41 @@ class CategoryViewSet(viewsets.ModelViewSet):
 
         return Response(response_data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=['post'], url_path='bulk-tree')
+    def bulk_tree(self, request, *args, **kwargs):
+        """Loads a nested or flat (``ref``/``parent_ref``) tree in one transaction."""
+        if not request.user.has_perm('categories.add_category'):
+            raise PermissionDenied('You do not have permission to bulk create categories')
+        categories = request.data.get('categories') if isinstance(request.data, dict) else None
+        if not isinstance(categories, list):
+            return Response(
+                {
+                    "status": "error",
+                    "message": "Expected category_system_id and a categories list"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        category_system = get_object_or_404(CategorySystem, pk=request.data.get('category_system_id'))
+        try:
+            ids = load_category_tree(category_system, categories)
+        except CategoryTreeLoadError as e:
+            return Response(
+                {
+                    "status": "error",
+                    "message": str(e),
+                    "errors": e.errors,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(
+            {
+                "status": "success",
+                "message": f"Successfully processed {len(ids)} categories",
+                "ids": ids,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
     @action(detail=False, methods=['get'])
     def tree(self, request):
         system_id = request.query_params.get('system_id', None)
@@ -103,6 +140,24 @@ class CategoryViewSet(viewsets.ModelViewSet):
             category_system = get_object_or_404(CategorySystem, pk=system_id)
         elif system_slug:
             category_system = get_object_or_404(CategorySystem, slug=system_slug)
-        categories = Category.objects.filter(category_system=category_system).order_by('path')
-        serializer = self.get_serializer(categories, many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        root = None
+        root_id = request.query_params.get('root_id', None)
+        if root_id:
+            root = get_object_or_404(Category, pk=root_id, category_system=category_system)
+        try:
+            depth = int(request.query_params.get('depth', DEFAULT_TREE_DEPTH))
+        except ValueError:
+            return Response(
+                {"detail": "depth must be an integer."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        depth = max(depth, 0)
+        version = get_tree_version(category_system.pk)
+        etag = tree_etag(category_system.pk, version, root.pk if root else None, depth)
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+        else:
+            content = get_tree_snapshot(category_system, version, root=root, depth=depth)
+            response = HttpResponse(content, content_type='application/json')
+        response['ETag'] = etag
+        return response
\ No newline at end of file
@@ -0,0 +1,79 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from core.models import OutboxEvent
+from core.outbox import RELAY_BATCH_SIZE, RELAY_MAX_ATTEMPTS, purge_published_events, relay_outbox_batch
+from messaging.factory import get_messenger
+
+
+class Command(BaseCommand):
+    help = 'Publish pending outbox events to the messenger in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=RELAY_BATCH_SIZE,
+            help='Maximum events claimed per batch',
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=RELAY_MAX_ATTEMPTS,
+            help='Stop retrying events that failed this many times',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the pending events and exit instead of polling',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between polls when the outbox is empty',
+        )
+        parser.add_argument(
+            '--purge-after-days',
+            type=int,
+            default=7,
+            help='Delete events published more than this many days ago (0 disables)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show how many events are pending without publishing them',
+        )
+
+    def handle(self, *args, **options):
+        pending = OutboxEvent.objects.filter(published_at__isnull=True)
+        if options['dry_run']:
+            retrying = pending.filter(attempts__gt=0).count()
+            self.stdout.write(f'Pending events: {pending.count()} ({retrying} retrying)')
+            return
+
+        messenger = get_messenger()
+        self.stdout.write(self.style.SUCCESS('Starting outbox relay...'))
+        try:
+            while True:
+                results = relay_outbox_batch(
+                    messenger,
+                    batch_size=options['batch_size'],
+                    max_attempts=options['max_attempts'],
+                )
+                if results.claimed:
+                    self.stdout.write(str(results))
+                    if results.published:
+                        continue
+                if options['once']:
+                    break
+                if options['purge_after_days']:
+                    purge_published_events(timedelta(days=options['purge_after_days']))
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+        if options['purge_after_days']:
+            deleted = purge_published_events(timedelta(days=options['purge_after_days']))
+            self.stdout.write(f'Purged {deleted} published events')
+        self.stdout.write(self.style.SUCCESS('Outbox relay stopped.'))
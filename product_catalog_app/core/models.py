@@ -0,0 +1,30 @@
+from django.db import models
+
+class OutboxEvent(models.Model):
+    """Message waiting to be relayed to the messenger.
+
+    Rows are written in the same transaction as the model change that
+    produced them and drained by the ``relay_outbox`` management command,
+    so a rollback never leaves a sent event and request latency does not
+    depend on the broker. Pending events sharing an ``event_key`` on the
+    same topic are collapsed into a single publish of the latest payload.
+    """
+    topic = models.CharField(max_length=255)
+    event_key = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, null=True)
+    published_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Outbox Event'
+        verbose_name_plural = 'Outbox Events'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['published_at', 'id'], name='outbox_pending_idx'),
+            models.Index(fields=['topic', 'event_key'], name='outbox_event_key_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.topic} ({self.event_key})"
@@ -0,0 +1,136 @@
+import logging
+from datetime import timedelta
+from typing import Any, Dict, Iterable, Tuple
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+RELAY_BATCH_SIZE = 500
+RELAY_MAX_ATTEMPTS = 10
+
+def enqueue_event(topic: str, event_key: str, payload: Dict[str, Any]) -> OutboxEvent:
+    """Records an event to be published once the current transaction commits.
+
+    Args:
+        topic (str): The messenger topic to publish to.
+        event_key (str): Identifies the event; pending events with the same
+            key on the same topic are published once.
+        payload (Dict[str, Any]): The message body.
+
+    Returns:
+        OutboxEvent: The stored event.
+
+    Example:
+        with transaction.atomic():
+            attribute_set.save()
+            enqueue_event(PRODUCT_ATTRIBUTES_SET_UPDATES_TOPIC, f"attribute-set:{attribute_set.pk}", message)
+    """
+    return OutboxEvent.objects.create(topic=topic, event_key=event_key, payload=payload)
+
+def enqueue_events(topic: str, events: Iterable[Tuple[str, Dict[str, Any]]], batch_size: int = RELAY_BATCH_SIZE) -> int:
+    """Records many ``(event_key, payload)`` events with batched INSERTs.
+
+    Returns:
+        int: The number of events stored.
+    """
+    rows = [OutboxEvent(topic=topic, event_key=key, payload=payload) for key, payload in events]
+    OutboxEvent.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+class RelayResults():
+    """Counts from one ``relay_outbox_batch`` call."""
+    def __init__(self, claimed: int = 0, published: int = 0, deduplicated: int = 0, failed: int = 0):
+        self.claimed = claimed
+        self.published = published
+        self.deduplicated = deduplicated
+        self.failed = failed
+
+    def __str__(self):
+        return (
+            f"RelayResults(claimed={self.claimed}, published={self.published}, "
+            f"deduplicated={self.deduplicated}, failed={self.failed})"
+        )
+
+def relay_outbox_batch(messenger, batch_size: int = RELAY_BATCH_SIZE, max_attempts: int = RELAY_MAX_ATTEMPTS) -> RelayResults:
+    """Publishes the oldest pending outbox events and marks them as sent.
+
+    The batch is claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` so several
+    relays can run side by side without publishing the same rows. Within the
+    batch, events sharing a topic and ``event_key`` are collapsed into one
+    message carrying the latest payload; all of them are marked published
+    when it is acknowledged. Failed events keep their row with ``attempts``
+    incremented and are retried until ``max_attempts`` is reached.
+
+    Args:
+        messenger: Any messenger exposing ``publish_many`` (see ``messaging.base``).
+        batch_size (int): Maximum events claimed per call.
+        max_attempts (int): Events that failed this many times are skipped.
+
+    Returns:
+        RelayResults: What happened to the claimed events.
+    """
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.select_for_update(skip_locked=True)
+            .filter(published_at__isnull=True, attempts__lt=max_attempts)
+            .order_by('id')[:batch_size]
+        )
+        if not events:
+            return RelayResults()
+
+        # (topic, event_key) -> ids of every claimed row for that event, and
+        # the newest row whose payload is sent.
+        groups = {}
+        latest = {}
+        for event in events:
+            group = (event.topic, event.event_key)
+            groups.setdefault(group, []).append(event.pk)
+            latest[group] = event
+
+        by_topic = {}
+        for (topic, _), event in latest.items():
+            by_topic.setdefault(topic, []).append(event)
+
+        published_ids = []
+        failed_ids = []
+        errors = []
+        for topic, topic_events in by_topic.items():
+            results = messenger.publish_many(
+                topic,
+                (event.payload for event in topic_events),
+                keys=[event.event_key for event in topic_events],
+            )
+            for key in results.published:
+                published_ids.extend(groups[(topic, key)])
+            for key in results.failed:
+                failed_ids.extend(groups[(topic, key)])
+            errors.extend(results.errors)
+
+        if published_ids:
+            OutboxEvent.objects.filter(pk__in=published_ids).update(published_at=timezone.now())
+        if failed_ids:
+            OutboxEvent.objects.filter(pk__in=failed_ids).update(
+                attempts=F('attempts') + 1,
+                last_error='\n'.join(errors)[:2000],
+            )
+            logger.warning(f"Failed relaying {len(failed_ids)} outbox events: {errors[:5]}")
+
+    return RelayResults(
+        claimed=len(events),
+        published=len(published_ids),
+        deduplicated=len(events) - len(latest),
+        failed=len(failed_ids),
+    )
+
+def purge_published_events(older_than: timedelta) -> int:
+    """Deletes events published more than ``older_than`` ago.
+
+    Returns:
+        int: The number of rows deleted.
+    """
+    cutoff = timezone.now() - older_than
+    deleted, _ = OutboxEvent.objects.filter(published_at__lt=cutoff).delete()
+    return deleted
@@ -0,0 +1,156 @@
+import base64
+import binascii
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+def keyset_filter(fields, values, ascending: bool = True) -> Q:
+    """Builds the row-value comparison ``(f1, f2, ...) > (v1, v2, ...)``.
+
+    Expanded into OR'd prefix equalities so it can use a composite index on
+    backends without row-value comparison support.
+
+    Example:
+        keyset_filter(('name', 'id'), ['Acme', 12])
+        # Q(name__gt='Acme') | Q(name='Acme', id__gt=12)
+    """
+    lookup = 'gt' if ascending else 'lt'
+    condition = Q()
+    for i, field in enumerate(fields):
+        clause = Q(**{f'{field}__{lookup}': values[i]})
+        for prev_field, prev_value in zip(fields[:i], values[:i]):
+            clause &= Q(**{prev_field: prev_value})
+        condition |= clause
+    return condition
+
+class StandardResultsSetPagination(PageNumberPagination):
+    """Page number pagination with an opt-in keyset (cursor) mode.
+
+    Passing ``?cursor=`` switches the request to keyset pagination: pages
+    are fetched with a ``WHERE (keys) > (last seen)`` seek instead of an
+    OFFSET, no ``COUNT(*)`` is issued, and the response carries opaque
+    ``next``/``previous`` tokens instead of ``count``. ``?ordering=`` picks
+    one of ``cursor_orderings``; a leading ``-`` sorts descending. Views
+    whose model has no unique-able ``name`` set their own
+    ``cursor_orderings``.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    cursor_query_param = 'cursor'
+    cursor_ordering_param = 'ordering'
+    cursor_orderings = {
+        'id': ('id',),
+        'name': ('name', 'id'),
+    }
+    default_cursor_ordering = 'id'
+    invalid_cursor_message = 'Invalid cursor'
+
+    cursor_mode = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+        self.cursor_orderings = getattr(view, 'cursor_orderings', self.cursor_orderings)
+        return self.paginate_cursor_queryset(queryset, request)
+
+    def get_paginated_response(self, data):
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.next_link,
+            'previous': self.previous_link,
+            'results': data,
+        })
+
+    def get_cursor_ordering(self, request):
+        requested = request.query_params.get(self.cursor_ordering_param, '')
+        if not requested:
+            return self.default_cursor_ordering, False
+        descending = requested.startswith('-')
+        key = requested.lstrip('-')
+        if key not in self.cursor_orderings:
+            # falling back would page in an order the client did not ask for
+            supported = ', '.join(sorted(self.cursor_orderings))
+            raise ValidationError({
+                self.cursor_ordering_param: f"Cursor pagination supports ordering by {supported}, not '{requested}'."
+            })
+        return key, descending
+
+    def paginate_cursor_queryset(self, queryset, request):
+        self.request = request
+        page_size = self.get_page_size(request) or self.page_size
+        ordering, descending = self.get_cursor_ordering(request)
+        fields = self.cursor_orderings[ordering]
+
+        token = request.query_params.get(self.cursor_query_param)
+        position, backwards = None, False
+        if token:
+            position, backwards = self.decode_cursor(token, ordering, descending, len(fields))
+
+        ascending = descending == backwards
+        if position is not None:
+            queryset = queryset.filter(keyset_filter(fields, position, ascending))
+        queryset = queryset.order_by(*[f if ascending else f'-{f}' for f in fields])
+
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+
+        self.next_link = None
+        self.previous_link = None
+        if rows:
+            if has_next:
+                last = [getattr(rows[-1], f) for f in fields]
+                self.next_link = self.encode_link(ordering, descending, last, False)
+            if has_previous:
+                first = [getattr(rows[0], f) for f in fields]
+                self.previous_link = self.encode_link(ordering, descending, first, True)
+        elif position is not None:
+            if backwards:
+                self.next_link = replace_query_param(
+                    request.build_absolute_uri(), self.cursor_query_param, ''
+                )
+            else:
+                self.previous_link = self.encode_link(ordering, descending, position, True)
+        return rows
+
+    def encode_link(self, ordering, descending, position, backwards):
+        payload = json.dumps(
+            {'o': ordering, 'd': descending, 'p': position, 'r': backwards},
+            cls=DjangoJSONEncoder,
+            separators=(',', ':'),
+        )
+        token = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, token
+        )
+
+    def decode_cursor(self, token, ordering, descending, size):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8'))
+            position = payload['p']
+            backwards = bool(payload['r'])
+            matches = payload['o'] == ordering and bool(payload['d']) == descending
+        except (TypeError, ValueError, KeyError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if not matches or not isinstance(position, list) or len(position) != size:
+            raise NotFound(self.invalid_cursor_message)
+        return position, backwards
+
+class SearchResultsSetPagination(PageNumberPagination):
+    """Page number pagination for ranked results, which have no stable keyset."""
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 200
@@ -0,0 +1,77 @@
+from concurrent.futures import Future
+from django.test import TestCase
+from core.models import OutboxEvent
+from core.outbox import enqueue_event, enqueue_events, relay_outbox_batch
+from messaging.base import AbstractMessenger
+
+class RecordingMessenger(AbstractMessenger):
+    def __init__(self, fail_keys=()):
+        super().__init__()
+        self.sent = []
+        self.fail_keys = set(fail_keys)
+
+    def publish(self, topic, data):
+        future = Future()
+        if data.get('key') in self.fail_keys:
+            future.set_exception(RuntimeError('broker unavailable'))
+        else:
+            self.sent.append((topic, data))
+            future.set_result(str(len(self.sent)))
+        return self._counters.track(future)
+
+    def subscribe(self, subscription_id, callback):
+        pass
+
+class MessengerStatsTest(TestCase):
+    def test_counters_are_per_instance(self):
+        """
+        Test that each messenger keeps its own publish counts
+        """
+        first, second = RecordingMessenger(), RecordingMessenger()
+        first.publish_many('topic-a', [{'key': 'a'}, {'key': 'b'}])
+        self.assertEqual(first.stats['published'], 2)
+        self.assertEqual(second.stats['published'], 0)
+
+class RelayOutboxTest(TestCase):
+    def test_relay_publishes_and_marks_events(self):
+        """
+        Test that pending events are published once and marked as sent
+        """
+        enqueue_events('topic-a', [(f'k{i}', {'key': f'k{i}'}) for i in range(3)])
+        messenger = RecordingMessenger()
+        results = relay_outbox_batch(messenger)
+        self.assertEqual(results.published, 3)
+        self.assertEqual(len(messenger.sent), 3)
+        self.assertFalse(OutboxEvent.objects.filter(published_at__isnull=True).exists())
+        self.assertEqual(relay_outbox_batch(messenger).claimed, 0)
+
+    def test_relay_deduplicates_by_event_key(self):
+        """
+        Test that events sharing a key are sent once with the latest payload
+        """
+        enqueue_event('topic-a', 'set:1', {'key': 'set:1', 'version': 1})
+        enqueue_event('topic-a', 'set:1', {'key': 'set:1', 'version': 2})
+        enqueue_event('topic-b', 'set:1', {'key': 'set:1', 'version': 3})
+        messenger = RecordingMessenger()
+        results = relay_outbox_batch(messenger)
+        self.assertEqual(results.deduplicated, 1)
+        self.assertEqual(results.published, 3)
+        self.assertCountEqual(
+            messenger.sent,
+            [('topic-a', {'key': 'set:1', 'version': 2}), ('topic-b', {'key': 'set:1', 'version': 3})],
+        )
+
+    def test_relay_retries_failed_events(self):
+        """
+        Test that failed events stay pending until max attempts are used up
+        """
+        enqueue_events('topic-a', [('ok', {'key': 'ok'}), ('bad', {'key': 'bad'})])
+        messenger = RecordingMessenger(fail_keys={'bad'})
+        results = relay_outbox_batch(messenger, max_attempts=2)
+        self.assertEqual((results.published, results.failed), (1, 1))
+        failed = OutboxEvent.objects.get(event_key='bad')
+        self.assertIsNone(failed.published_at)
+        self.assertEqual(failed.attempts, 1)
+        self.assertIn('broker unavailable', failed.last_error)
+        self.assertEqual(relay_outbox_batch(messenger, max_attempts=2).failed, 1)
+        self.assertEqual(relay_outbox_batch(messenger, max_attempts=2).claimed, 0)
@@ -0,0 +1,15 @@
+from itertools import islice
+from typing import Iterable, Iterator, List, TypeVar
+
+T = TypeVar('T')
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Yields lists of up to ``size`` items, pulling one list at a time from ``items``."""
+    if size < 1:
+        raise ValueError(f"Chunk size must be at least 1, got {size}")
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
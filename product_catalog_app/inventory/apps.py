@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_save
 
 
 class InventoryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'inventory'
+
+    def ready(self):
+        from .models import InventoryItem
+        from .signals import inventory_item_saved
+
+        post_save.connect(
+            receiver=inventory_item_saved,
+            sender=InventoryItem
+        )
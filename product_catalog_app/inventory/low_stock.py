@@ -0,0 +1,83 @@
+import logging
+from typing import Dict, Iterable, List
+from django.db.models import F, Q
+from django.utils import timezone
+from core.outbox import enqueue_events
+from messaging.constants import INVENTORY_LOW_STOCK_TOPIC
+from .models import InventoryItem
+
+logger = logging.getLogger(__name__)
+
+# available stock (quantity - reserved) at or below the item's threshold
+LOW_STOCK = Q(is_active=True, quantity__lte=F('reserved') + F('low_stock_threshold'))
+
+def low_stock_after(reserved_delta: int) -> Q:
+    """``LOW_STOCK`` as it will be once ``reserved`` changes by ``reserved_delta``.
+
+    Written against the current column values so it can filter the same
+    UPDATE that changes ``reserved``.
+    """
+    return Q(is_active=True, quantity__lte=F('reserved') + reserved_delta + F('low_stock_threshold'))
+
+EVENT_FIELDS = ('id', 'product_id', 'sku', 'quantity', 'reserved', 'low_stock_threshold')
+
+def _event(item: dict, event_type: str, at) -> tuple:
+    return (
+        f"inventory:{item['id']}:{event_type}:{at.isoformat()}",
+        {
+            "item_id": item['id'],
+            "product_id": item['product_id'],
+            "sku": item['sku'],
+            "type": event_type,
+            "available": item['quantity'] - item['reserved'],
+            "low_stock_threshold": item['low_stock_threshold'],
+        },
+    )
+
+def sync_low_stock(item_ids: Iterable[int]) -> int:
+    """Brings ``is_low_stock`` of ``item_ids`` in line with their stock.
+
+    Call it in the transaction that changed the stock. Only items whose
+    flag flips are written, and each flip queues one outbox event:
+    ``low_stock`` when available stock drops to the threshold or below,
+    ``restocked`` when it rises above it again.
+
+    Returns:
+        int: The number of items that crossed their threshold.
+    """
+    item_ids = list(item_ids)
+    if not item_ids:
+        return 0
+    items = InventoryItem.objects.filter(pk__in=item_ids)
+    dropped = list(items.filter(LOW_STOCK, is_low_stock=False).values(*EVENT_FIELDS))
+    recovered = list(items.filter(~LOW_STOCK, is_low_stock=True).values(*EVENT_FIELDS))
+    if not dropped and not recovered:
+        return 0
+    now = timezone.now()
+    if dropped:
+        InventoryItem.objects.filter(pk__in=[item['id'] for item in dropped]).update(is_low_stock=True)
+    if recovered:
+        InventoryItem.objects.filter(pk__in=[item['id'] for item in recovered]).update(is_low_stock=False)
+    events: List[tuple] = [_event(item, 'low_stock', now) for item in dropped]
+    events.extend(_event(item, 'restocked', now) for item in recovered)
+    enqueue_events(INVENTORY_LOW_STOCK_TOPIC, events)
+    logger.info(f"{len(dropped)} items dropped to low stock, {len(recovered)} restocked")
+    return len(events)
+
+def queue_low_stock_events(crossed: Dict[int, str]) -> int:
+    """Queues the events for items whose ``is_low_stock`` flag was just flipped.
+
+    For callers that flip the flag in their own UPDATE: one query reads the
+    event fields of the flipped items, nothing is read when none flipped.
+
+    Args:
+        crossed (Dict[int, str]): Event type (``low_stock`` or ``restocked``) by item id.
+
+    Returns:
+        int: The number of events queued.
+    """
+    if not crossed:
+        return 0
+    now = timezone.now()
+    items = InventoryItem.objects.filter(pk__in=list(crossed)).values(*EVENT_FIELDS)
+    return enqueue_events(INVENTORY_LOW_STOCK_TOPIC, [_event(item, crossed[item['id']], now) for item in items])
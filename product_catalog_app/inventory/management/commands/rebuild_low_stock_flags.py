@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from inventory.low_stock import LOW_STOCK
+from inventory.models import InventoryItem
+
+
+class Command(BaseCommand):
+    help = 'Recompute is_low_stock for every inventory item without emitting events'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report how many flags are stale without saving them',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            dropped = InventoryItem.objects.filter(LOW_STOCK, is_low_stock=False)
+            recovered = InventoryItem.objects.filter(~LOW_STOCK, is_low_stock=True)
+            if options['dry_run']:
+                self.stdout.write(
+                    f'{dropped.count()} items should be flagged low stock, {recovered.count()} unflagged'
+                )
+                return
+            flagged = dropped.update(is_low_stock=True)
+            cleared = recovered.update(is_low_stock=False)
+        self.stdout.write(self.style.SUCCESS(f'Flagged {flagged} items as low stock and cleared {cleared}.'))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-18 02:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0001_initial'),
+        ('products', '0023_productmonitorjob_is_below_target_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='is_low_stock',
+            field=models.BooleanField(default=False, help_text='Whether available stock is at or below the low stock threshold'),
+        ),
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['is_low_stock', 'id'], name='inventory_low_stock_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 02:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_inventoryitem_is_low_stock_and_more'),
+        ('products', '0023_productmonitorjob_is_below_target_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventoryitem',
+            index=models.Index(fields=['sku'], name='inventory_sku_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-18 02:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_inventoryitem_inventory_sku_idx'),
+        ('products', '0023_productmonitorjob_is_below_target_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='inventoryitem',
+            unique_together={('product', 'sku')},
+        ),
+        migrations.AddField(
+            model_name='inventoryitem',
+            name='variant_key',
+            field=models.CharField(blank=True, help_text='Canonical key of the variant attribute values', max_length=255, null=True),
+        ),
+        migrations.AlterUniqueTogether(
+            name='inventoryitem',
+            unique_together={('product', 'sku'), ('product', 'variant_key')},
+        ),
+    ]
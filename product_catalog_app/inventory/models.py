@@ -19,6 +19,13 @@ class InventoryItem(models.Model):
         default=dict,
         help_text='Attributes data for the inventory item',
     )
+    # canonical "code=value|..." key of the variant's attributes, see inventory.variants
+    variant_key = models.CharField(
+        max_length=255,
+        blank=True,
+        null=True,
+        help_text='Canonical key of the variant attribute values',
+    )
     quantity = models.PositiveIntegerField(
         default=0,
         help_text='The quantity of the product in stock',
@@ -35,6 +42,12 @@ class InventoryItem(models.Model):
         default=True,
         help_text='Whether the inventory item is active',
     )
+    # maintained by inventory.low_stock.sync_low_stock on saves and stocktakes
+    # and flipped by the reservation UPDATEs themselves
+    is_low_stock = models.BooleanField(
+        default=False,
+        help_text='Whether available stock is at or below the low stock threshold',
+    )
     last_stocktake = models.DateTimeField(
         null=True,
         blank=True,
@@ -46,6 +59,11 @@ class InventoryItem(models.Model):
     class Meta:
         verbose_name = "Inventory Item"
         verbose_name_plural = "Inventory Items"
-        unique_together = ('product', 'sku')
+        unique_together = [('product', 'sku'), ('product', 'variant_key')]
         ordering = ['product', 'sku']
+        indexes = [
+            models.Index(fields=['is_low_stock', 'id'], name='inventory_low_stock_idx'),
+            # stocktakes resolve items by SKU alone
+            models.Index(fields=['sku'], name='inventory_sku_idx'),
+        ]
     
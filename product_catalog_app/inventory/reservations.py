@@ -0,0 +1,148 @@
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .low_stock import low_stock_after, queue_low_stock_events
+from .models import InventoryItem
+
+logger = logging.getLogger(__name__)
+
+RESERVE = 'reserve'
+RELEASE = 'release'
+COMMIT = 'commit'
+
+class StockReservationError(ValueError):
+    """Raised when some lines of a stock operation cannot be applied; nothing is written."""
+    def __init__(self, operation: str, errors: List[dict]):
+        super().__init__(f"Could not {operation} {len(errors)} inventory items")
+        self.operation = operation
+        self.errors = errors
+
+def _conditional_update(operation: str, item_id: int, quantity: int) -> Tuple[int, Optional[str]]:
+    # Each operation is one UPDATE whose WHERE clause re-checks the stock, so
+    # the row lock is held only for the statement and concurrent callers
+    # can never push ``reserved`` above ``quantity`` or below zero.
+    #
+    # A reserve can only drop an item to low stock and a release can only
+    # restock it, so the update that leaves ``is_low_stock`` alone is tried
+    # first and the one that flips it only when that matched nothing. The
+    # flip is a constant, not a CASE over the new stock, because MySQL
+    # evaluates SET clauses against the columns already updated.
+    items = InventoryItem.objects.filter(pk=item_id)
+    if operation == COMMIT:
+        # quantity and reserved drop together, so available stock is unchanged
+        return items.filter(reserved__gte=quantity, quantity__gte=quantity).update(
+            quantity=F('quantity') - quantity,
+            reserved=F('reserved') - quantity,
+            updated_at=timezone.now(),
+        ), None
+    if operation == RESERVE:
+        items = items.filter(is_active=True, quantity__gte=F('reserved') + quantity)
+        changes = {'reserved': F('reserved') + quantity}
+        crossing = Q(is_low_stock=False) & low_stock_after(quantity)
+        event_type = 'low_stock'
+    elif operation == RELEASE:
+        items = items.filter(reserved__gte=quantity)
+        changes = {'reserved': F('reserved') - quantity}
+        crossing = Q(is_low_stock=True) & ~low_stock_after(-quantity)
+        event_type = 'restocked'
+    else:
+        raise ValueError(f"Unknown stock operation {operation!r}")
+    now = timezone.now()
+    if items.exclude(crossing).update(updated_at=now, **changes):
+        return 1, None
+    if items.filter(crossing).update(is_low_stock=event_type == 'low_stock', updated_at=now, **changes):
+        return 1, event_type
+    return 0, None
+
+def _shortage(operation: str, item: Optional[dict], quantity: int) -> Optional[str]:
+    if item is None:
+        return "Inventory item not found"
+    if operation == RESERVE:
+        if not item['is_active']:
+            return "Inventory item is not active"
+        if item['quantity'] - item['reserved'] < quantity:
+            return f"Only {item['quantity'] - item['reserved']} available"
+    elif item['reserved'] < quantity:
+        return f"Only {item['reserved']} reserved"
+    elif operation == COMMIT and item['quantity'] < quantity:
+        return f"Only {item['quantity']} in stock"
+    return None
+
+def _failures(operation: str, lines: List[Tuple[int, int]]) -> List[dict]:
+    """Explains which of ``lines`` cannot be applied, reading their rows in one query."""
+    items = {
+        item['id']: item
+        for item in InventoryItem.objects.filter(pk__in=[item_id for item_id, _ in lines]).values(
+            'id', 'quantity', 'reserved', 'is_active',
+        )
+    }
+    errors = []
+    for item_id, quantity in lines:
+        reason = _shortage(operation, items.get(item_id), quantity)
+        if reason is not None:
+            errors.append({"item": item_id, "quantity": quantity, "error": reason})
+    return errors
+
+def _raced(item_id: int, quantity: int) -> dict:
+    # the row changed between the failed UPDATE and the read that explains it
+    return {"item": item_id, "quantity": quantity, "error": "Stock changed, try again"}
+
+def apply_stock_operation(operation: str, item_id: int, quantity: int) -> None:
+    """Reserves, releases or commits ``quantity`` units of one item.
+
+    ``reserve`` holds stock for a pending order, ``release`` gives it
+    back and ``commit`` ships it, taking it off both ``reserved`` and
+    ``quantity``.
+
+    Raises:
+        StockReservationError: If the item lacks the stock (or reservation).
+    """
+    with transaction.atomic():
+        updated, crossed = _conditional_update(operation, item_id, quantity)
+        if updated:
+            if crossed:
+                queue_low_stock_events({item_id: crossed})
+            return
+    errors = _failures(operation, [(item_id, quantity)])
+    raise StockReservationError(operation, errors or [_raced(item_id, quantity)])
+
+def apply_stock_batch(operation: str, lines: Iterable[Tuple[int, int]]) -> List[int]:
+    """Applies one operation to many ``(item_id, quantity)`` lines, all or nothing.
+
+    Lines for the same item are merged and the updates run in item id
+    order, so concurrent batches take their row locks in the same order
+    and cannot deadlock. The first line that fails rolls the whole batch
+    back; the error lists every line that could not be applied.
+
+    Returns:
+        List[int]: The ids of the updated items.
+
+    Example:
+        try:
+            apply_stock_batch(RESERVE, [(12, 2), (40, 1)])
+        except StockReservationError as e:
+            e.errors  # [{"item": 40, "quantity": 1, "error": "Only 0 available"}]
+    """
+    merged: Dict[int, int] = defaultdict(int)
+    for item_id, quantity in lines:
+        merged[item_id] += quantity
+    ordered = sorted(merged.items())
+    crossed: Dict[int, str] = {}
+    with transaction.atomic():
+        for position, (item_id, quantity) in enumerate(ordered):
+            updated, event_type = _conditional_update(operation, item_id, quantity)
+            if updated:
+                if event_type:
+                    crossed[item_id] = event_type
+                continue
+            # report every remaining line that would fail too
+            errors = _failures(operation, ordered[position:])
+            if not errors or errors[0]["item"] != item_id:
+                errors.insert(0, _raced(item_id, quantity))
+            raise StockReservationError(operation, errors)
+        queue_low_stock_events(crossed)
+    logger.info(f"Applied {operation} to {len(ordered)} inventory items")
+    return [item_id for item_id, _ in ordered]
@@ -17,15 +17,76 @@ class InventoryItemSerializer(serializers.ModelSerializer):
             'product',
             'sku',
             'attributes_data',
+            'variant_key',
             'quantity',
             'reserved',
             'low_stock_threshold',
+            'is_low_stock',
             'is_active',
             'created_at',
             'updated_at',
         ]
         read_only_fields = [
             'product_name',
+            # changed only through the reserve/release/commit actions
+            'reserved',
+            'is_low_stock',
+            'variant_key',
             'created_at',
             'updated_at',
-        ]
\ No newline at end of file
+        ]
+
+class StockQuantitySerializer(serializers.Serializer):
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class StockLineSerializer(serializers.Serializer):
+    item = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
+
+
+class StockBatchSerializer(serializers.Serializer):
+    lines = StockLineSerializer(many=True, allow_empty=False)
+
+
+class StockLevelSerializer(serializers.ModelSerializer):
+    available = serializers.SerializerMethodField()
+
+    class Meta:
+        model = InventoryItem
+        fields = [
+            'id',
+            'sku',
+            'quantity',
+            'reserved',
+            'available',
+            'is_low_stock',
+        ]
+
+    def get_available(self, obj):
+        return obj.quantity - obj.reserved
+
+
+class StocktakeSerializer(serializers.Serializer):
+    counts = serializers.ListField(child=serializers.JSONField(), required=False)
+    file = serializers.FileField(required=False)
+    format = serializers.ChoiceField(choices=['csv', 'jsonl'], required=False)
+    dry_run = serializers.BooleanField(default=False)
+    clamp_reserved = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if ('counts' in attrs) == ('file' in attrs):
+            raise serializers.ValidationError('Send either a counts list or a file.')
+        if 'file' in attrs and 'format' not in attrs:
+            attrs['format'] = 'jsonl' if attrs['file'].name.endswith(('.jsonl', '.ndjson')) else 'csv'
+        return attrs
+
+
+class VariantMatrixSerializer(serializers.Serializer):
+    product = serializers.PrimaryKeyRelatedField(queryset=Product.objects.select_related('attribute_set'))
+    attributes = serializers.DictField(
+        child=serializers.ListField(child=serializers.JSONField(), allow_null=True, required=False),
+        allow_empty=False,
+    )
+    sku_prefix = serializers.CharField(max_length=40, required=False, allow_blank=True)
+    dry_run = serializers.BooleanField(default=False)
@@ -0,0 +1,7 @@
+from .low_stock import sync_low_stock
+from .models import InventoryItem
+
+# Saves through the API or admin can change quantity, the threshold or
+# is_active; bulk paths call sync_low_stock themselves.
+def inventory_item_saved(sender, instance: InventoryItem, **kwargs):
+    sync_low_stock([instance.pk])
@@ -0,0 +1,193 @@
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from django.db import transaction
+from django.utils import timezone
+from core.utils.iterables import chunked
+from products.imports import ImportRow
+from .low_stock import sync_low_stock
+from .models import InventoryItem
+
+logger = logging.getLogger(__name__)
+
+STOCKTAKE_CHUNK_SIZE = 1000
+
+# (row number, sku, product id or None, counted quantity)
+CountRow = Tuple[int, str, Optional[int], int]
+
+class StocktakeReport():
+    """What a stocktake found and changed.
+
+    ``discrepancies`` has one entry per counted item whose ``quantity``
+    differed from the count; ``errors`` one per row that was not applied.
+    """
+    def __init__(self, dry_run: bool = False, clamp_reserved: bool = False):
+        self.dry_run = dry_run
+        self.clamp_reserved = clamp_reserved
+        self.counted = 0
+        self.matched = 0
+        self.adjusted = 0
+        self.net_change = 0
+        self.discrepancies: List[dict] = []
+        self.errors: List[dict] = []
+
+    def __str__(self):
+        return f"StocktakeReport(counted={self.counted}, matched={self.matched}, adjusted={self.adjusted})"
+
+    def as_dict(self) -> dict:
+        return {
+            "dry_run": self.dry_run,
+            "clamp_reserved": self.clamp_reserved,
+            "counted": self.counted,
+            "matched": self.matched,
+            "adjusted": self.adjusted,
+            "net_change": self.net_change,
+            "discrepancies": self.discrepancies,
+            "errors": self.errors,
+        }
+
+def _to_int(value: Any) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    try:
+        return int(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+def parse_count_rows(rows: Iterable[ImportRow], report: StocktakeReport) -> Iterator[CountRow]:
+    """Validates ``(row number, data, parse error)`` rows.
+
+    Bad rows are recorded on ``report``. Rows come from
+    ``iter_import_rows`` or a JSON list. Each row needs a ``sku`` and a
+    non-negative ``counted_quantity``; a ``product`` id picks the item when
+    the SKU is used by several products.
+    """
+    for number, data, error in rows:
+        report.counted += 1
+        if error is not None:
+            report.errors.append({"row": number, "error": error})
+            continue
+        if not isinstance(data, dict):
+            report.errors.append({"row": number, "error": "Each row must be an object"})
+            continue
+        sku = str(data.get('sku') or '').strip()
+        counted = _to_int(data.get('counted_quantity'))
+        product = data.get('product')
+        product_id = _to_int(product) if product not in (None, '') else None
+        if not sku:
+            report.errors.append({"row": number, "error": "sku is required"})
+        elif counted is None or counted < 0:
+            report.errors.append({"row": number, "sku": sku, "error": "counted_quantity must be a non-negative integer"})
+        elif product not in (None, '') and product_id is None:
+            report.errors.append({"row": number, "sku": sku, "error": "product must be an id"})
+        else:
+            yield number, sku, product_id, counted
+
+def _resolve(chunk: List[CountRow], report: StocktakeReport, lock: bool) -> List[Tuple[CountRow, InventoryItem]]:
+    queryset = InventoryItem.objects.filter(sku__in={sku for _, sku, _, _ in chunk}).only(
+        'id', 'product_id', 'sku', 'quantity', 'reserved',
+    )
+    if lock:
+        queryset = queryset.select_for_update().order_by('id')
+    by_sku: Dict[str, List[InventoryItem]] = defaultdict(list)
+    for item in queryset:
+        by_sku[item.sku].append(item)
+    resolved = []
+    for row in chunk:
+        number, sku, product_id, _ = row
+        candidates = by_sku.get(sku, [])
+        if product_id is not None:
+            candidates = [item for item in candidates if item.product_id == product_id]
+        if not candidates:
+            report.errors.append({"row": number, "sku": sku, "error": "Unknown SKU"})
+        elif len(candidates) > 1:
+            report.errors.append({"row": number, "sku": sku, "error": "SKU is used by several products; pass product"})
+        else:
+            resolved.append((row, candidates[0]))
+    return resolved
+
+def _apply_chunk(chunk: List[CountRow], report: StocktakeReport, seen: set, at) -> None:
+    counted_items = []
+    for (number, sku, _, counted), item in _resolve(chunk, report, lock=not report.dry_run):
+        if item.pk in seen:
+            report.errors.append({"row": number, "sku": sku, "error": "Item already counted in this stocktake"})
+            continue
+        seen.add(item.pk)
+        # quantity may never drop below reserved: reservations assume it
+        if counted < item.reserved and not report.clamp_reserved:
+            report.errors.append({
+                "row": number,
+                "sku": sku,
+                "error": f"Counted {counted} but {item.reserved} are reserved; pass clamp_reserved to release the excess",
+            })
+            continue
+        report.matched += 1
+        delta = counted - item.quantity
+        if delta:
+            report.adjusted += 1
+            report.net_change += delta
+            discrepancy = {
+                "item": item.pk,
+                "product": item.product_id,
+                "sku": sku,
+                "quantity": item.quantity,
+                "counted_quantity": counted,
+                "delta": delta,
+            }
+            if counted < item.reserved:
+                discrepancy["reserved"] = item.reserved
+                discrepancy["released"] = item.reserved - counted
+                item.reserved = counted
+            report.discrepancies.append(discrepancy)
+        item.quantity = counted
+        item.last_stocktake = at
+        item.updated_at = at
+        counted_items.append(item)
+    if report.dry_run or not counted_items:
+        return
+    InventoryItem.objects.bulk_update(counted_items, ['quantity', 'reserved', 'last_stocktake', 'updated_at'])
+    sync_low_stock(item.pk for item in counted_items)
+
+def run_stocktake(
+    rows: Iterable[ImportRow],
+    dry_run: bool = False,
+    chunk_size: int = STOCKTAKE_CHUNK_SIZE,
+    at=None,
+    clamp_reserved: bool = False,
+) -> StocktakeReport:
+    """Sets the quantity of every counted item and reports the differences.
+
+    Rows are read lazily and handled ``chunk_size`` at a time: the chunk's
+    SKUs are resolved in one query on the SKU index, the counted rows are
+    locked, and every counted item gets its new ``quantity`` and
+    ``last_stocktake`` with one ``bulk_update``. Each chunk commits on its
+    own, so a large stocktake never holds more than one chunk of locks.
+
+    A count below an item's ``reserved`` units would leave less stock than
+    is promised to pending orders, so such rows are rejected unless
+    ``clamp_reserved`` is set; then ``reserved`` is lowered to the count in
+    the same write and the released units are reported.
+
+    Args:
+        rows (Iterable[ImportRow]): ``(row number, {"sku", "counted_quantity", "product"}, error)`` rows.
+        dry_run (bool): Build the report without writing anything.
+        chunk_size (int): Rows resolved and written per transaction.
+        at (datetime): The stocktake time; defaults to now.
+        clamp_reserved (bool): Lower ``reserved`` to counts below it instead of rejecting them.
+
+    Returns:
+        StocktakeReport: Counts, discrepancies and row errors.
+
+    Example:
+        with open('counts.csv', 'rb') as f:
+            report = run_stocktake(iter_import_rows(f, 'csv'))
+        report.as_dict()['discrepancies']
+    """
+    at = at or timezone.now()
+    report = StocktakeReport(dry_run, clamp_reserved)
+    seen = set()
+    for chunk in chunked(parse_count_rows(rows, report), chunk_size):
+        with transaction.atomic():
+            _apply_chunk(chunk, report, seen, at)
+    logger.info(str(report))
+    return report
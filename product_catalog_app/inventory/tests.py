@@ -1,3 +1,329 @@
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.models import OutboxEvent
+from inventory.models import InventoryItem
+from inventory.reservations import COMMIT, RELEASE, RESERVE, StockReservationError, apply_stock_batch, apply_stock_operation
+from inventory.stocktake import run_stocktake
+from inventory.variants import VariantMatrixError, find_variant, generate_variants
+from messaging.constants import INVENTORY_LOW_STOCK_TOPIC
+from products.models import Product, ProductAttribute, ProductAttributeSet
 
-# Create your tests here.
+class StockReservationTest(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(name='Shirt')
+        self.small = InventoryItem.objects.create(product=self.product, sku='S', quantity=5)
+        self.large = InventoryItem.objects.create(product=self.product, sku='L', quantity=2)
+        self.client = APIClient()
+        self.client.force_authenticate(user=get_user_model()(username='admin'))
+
+    def assertStock(self, item, quantity, reserved):
+        item.refresh_from_db()
+        self.assertEqual((item.quantity, item.reserved), (quantity, reserved))
+
+    def test_reserve_release_commit(self):
+        """
+        Test that reserved stock can be released or committed but never oversold
+        """
+        apply_stock_operation(RESERVE, self.small.pk, 4)
+        self.assertStock(self.small, 5, 4)
+        with self.assertRaises(StockReservationError) as raised:
+            apply_stock_operation(RESERVE, self.small.pk, 2)
+        self.assertEqual(raised.exception.errors[0]['error'], 'Only 1 available')
+        apply_stock_operation(RELEASE, self.small.pk, 1)
+        apply_stock_operation(COMMIT, self.small.pk, 3)
+        self.assertStock(self.small, 2, 0)
+        with self.assertRaises(StockReservationError):
+            apply_stock_operation(COMMIT, self.small.pk, 1)
+
+    def test_inactive_item_cannot_be_reserved(self):
+        """
+        Test that an inactive item rejects reservations
+        """
+        self.small.is_active = False
+        self.small.save()
+        with self.assertRaises(StockReservationError) as raised:
+            apply_stock_operation(RESERVE, self.small.pk, 1)
+        self.assertEqual(raised.exception.errors[0]['error'], 'Inventory item is not active')
+
+    def test_batch_is_all_or_nothing(self):
+        """
+        Test that a batch with one short line reserves nothing and reports every short line
+        """
+        with self.assertRaises(StockReservationError) as raised:
+            apply_stock_batch(RESERVE, [(self.small.pk, 3), (self.large.pk, 3), (0, 1)])
+        self.assertEqual([e['item'] for e in raised.exception.errors], [0, self.large.pk])
+        self.assertStock(self.small, 5, 0)
+        self.assertStock(self.large, 2, 0)
+
+        updated = apply_stock_batch(RESERVE, [(self.large.pk, 1), (self.small.pk, 3), (self.large.pk, 1)])
+        self.assertEqual(updated, [self.small.pk, self.large.pk])
+        self.assertStock(self.small, 5, 3)
+        self.assertStock(self.large, 2, 2)
+
+    def test_reservation_endpoints(self):
+        """
+        Test the reserve, batch and conflict responses of the API
+        """
+        response = self.client.post(f'/api/inventory/{self.small.pk}/reserve/', {'quantity': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['available'], 3)
+
+        response = self.client.post(f'/api/inventory/{self.large.pk}/reserve/', {'quantity': 3}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        response = self.client.post('/api/inventory/commit-batch/', {
+            'lines': [{'item': self.small.pk, 'quantity': 2}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]['quantity'], 3)
+
+        response = self.client.post('/api/inventory/reserve-batch/', {'lines': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reserved_is_read_only(self):
+        """
+        Test that reserved cannot be overwritten through the generic update
+        """
+        apply_stock_operation(RESERVE, self.small.pk, 2)
+        response = self.client.patch(f'/api/inventory/{self.small.pk}/', {'reserved': 0}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertStock(self.small, 5, 2)
+
+class LowStockTest(TestCase):
+    def setUp(self):
+        self.product = Product.objects.create(name='Shirt')
+        self.item = InventoryItem.objects.create(product=self.product, sku='S', quantity=10, low_stock_threshold=5)
+        self.client = APIClient()
+        self.client.force_authenticate(user=get_user_model()(username='admin'))
+
+    def alerts(self):
+        return list(
+            OutboxEvent.objects.filter(topic=INVENTORY_LOW_STOCK_TOPIC).order_by('id').values_list('payload__type', flat=True)
+        )
+
+    def test_events_only_on_crossing(self):
+        """
+        Test that reservations flag the item and emit one event per threshold crossing
+        """
+        apply_stock_operation(RESERVE, self.item.pk, 4)
+        self.item.refresh_from_db()
+        self.assertFalse(self.item.is_low_stock)
+        apply_stock_operation(RESERVE, self.item.pk, 1)
+        apply_stock_operation(RESERVE, self.item.pk, 2)
+        self.item.refresh_from_db()
+        self.assertTrue(self.item.is_low_stock)
+        self.assertEqual(self.alerts(), ['low_stock'])
+        apply_stock_operation(RELEASE, self.item.pk, 7)
+        self.assertEqual(self.alerts(), ['low_stock', 'restocked'])
+
+    def test_reserve_without_crossing_is_one_statement(self):
+        """
+        Test that a reservation that keeps the item above its threshold runs a single UPDATE
+        """
+        with CaptureQueriesContext(connection) as queries:
+            apply_stock_operation(RESERVE, self.item.pk, 2)
+            apply_stock_operation(COMMIT, self.item.pk, 2)
+        statements = [q['sql'].split()[0] for q in queries.captured_queries]
+        self.assertEqual([s for s in statements if s in ('SELECT', 'UPDATE', 'INSERT')], ['UPDATE', 'UPDATE'])
+        apply_stock_batch(RESERVE, [(self.item.pk, 4)])
+        self.item.refresh_from_db()
+        self.assertTrue(self.item.is_low_stock)
+        self.assertEqual(self.alerts(), ['low_stock'])
+
+    def test_saves_update_the_flag(self):
+        """
+        Test that saving the quantity, threshold or active state re-evaluates the flag
+        """
+        self.item.quantity = 3
+        self.item.save()
+        self.item.refresh_from_db()
+        self.assertTrue(self.item.is_low_stock)
+        self.item.is_active = False
+        self.item.save()
+        self.item.refresh_from_db()
+        self.assertFalse(self.item.is_low_stock)
+        self.assertEqual(self.alerts(), ['low_stock', 'restocked'])
+
+    def test_low_stock_endpoint(self):
+        """
+        Test that the endpoint lists only flagged items
+        """
+        low = InventoryItem.objects.create(product=self.product, sku='L', quantity=1)
+        response = self.client.get('/api/inventory/low-stock/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data['results']], [low.pk])
+
+class StocktakeTest(TestCase):
+    def setUp(self):
+        self.shirt = Product.objects.create(name='Shirt')
+        self.mug = Product.objects.create(name='Mug')
+        self.small = InventoryItem.objects.create(product=self.shirt, sku='S', quantity=10, reserved=2)
+        self.large = InventoryItem.objects.create(product=self.shirt, sku='L', quantity=4)
+        self.mug_s = InventoryItem.objects.create(product=self.mug, sku='S', quantity=1)
+        self.client = APIClient()
+        self.client.force_authenticate(user=get_user_model()(username='admin', is_superuser=True, is_active=True))
+
+    def assertStock(self, item, quantity, reserved):
+        item.refresh_from_db()
+        self.assertEqual((item.quantity, item.reserved), (quantity, reserved))
+
+    def test_applies_counts_in_chunks(self):
+        """
+        Test that counts are applied across chunks and mismatches are reported
+        """
+        rows = [
+            (1, {'sku': 'S', 'product': self.shirt.pk, 'counted_quantity': 7}, None),
+            (2, {'sku': 'L', 'counted_quantity': '4'}, None),
+            (3, {'sku': 'S', 'counted_quantity': 1}, None),
+            (4, {'sku': 'XL', 'counted_quantity': 1}, None),
+            (5, {'sku': 'L', 'counted_quantity': -1}, None),
+            (6, {'sku': 'L', 'counted_quantity': 3}, None),
+        ]
+        report = run_stocktake(rows, chunk_size=2)
+        self.assertEqual((report.counted, report.matched, report.adjusted, report.net_change), (6, 2, 1, -3))
+        self.assertEqual(report.discrepancies, [{
+            'item': self.small.pk, 'product': self.shirt.pk, 'sku': 'S',
+            'quantity': 10, 'counted_quantity': 7, 'delta': -3,
+        }])
+        self.assertEqual([e['row'] for e in report.errors], [3, 4, 5, 6])
+        self.small.refresh_from_db()
+        self.large.refresh_from_db()
+        self.mug_s.refresh_from_db()
+        self.assertEqual((self.small.quantity, self.large.quantity, self.mug_s.quantity), (7, 4, 1))
+        self.assertIsNotNone(self.large.last_stocktake)
+        self.assertIsNone(self.mug_s.last_stocktake)
+
+    def test_count_below_reserved(self):
+        """
+        Test that a count below the reserved units is rejected unless reserved is clamped
+        """
+        row = (1, {'sku': 'S', 'product': self.shirt.pk, 'counted_quantity': 1}, None)
+        report = run_stocktake([row])
+        self.assertEqual((report.matched, report.errors[0]['row']), (0, 1))
+        self.assertStock(self.small, 10, 2)
+
+        report = run_stocktake([row], clamp_reserved=True)
+        self.assertEqual(report.discrepancies[0]['released'], 1)
+        self.assertStock(self.small, 1, 1)
+
+    def test_dry_run_writes_nothing(self):
+        """
+        Test that a dry run reports discrepancies without saving them
+        """
+        report = run_stocktake([(1, {'sku': 'L', 'counted_quantity': 0}, None)], dry_run=True)
+        self.assertEqual(report.adjusted, 1)
+        self.large.refresh_from_db()
+        self.assertEqual(self.large.quantity, 4)
+        self.assertIsNone(self.large.last_stocktake)
+
+    def test_stocktake_endpoint(self):
+        """
+        Test that the endpoint accepts a counts list or a CSV file and flags low stock
+        """
+        response = self.client.post('/api/inventory/stocktake/', {
+            'counts': [{'sku': 'L', 'counted_quantity': 2}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['discrepancies'][0]['delta'], -2)
+        self.large.refresh_from_db()
+        self.assertTrue(self.large.is_low_stock)
+
+        upload = SimpleUploadedFile('counts.csv', b'sku,product,counted_quantity\nS,%d,12\n' % self.mug.pk)
+        response = self.client.post('/api/inventory/stocktake/', {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['discrepancies'][0]['item'], self.mug_s.pk)
+
+        response = self.client.post('/api/inventory/stocktake/', {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class VariantMatrixTest(TestCase):
+    def setUp(self):
+        self.size = ProductAttribute.objects.create(
+            name='Size', type='select', options=[{'value': 'S', 'label': 'Small'}, {'value': 'M', 'label': 'Medium'}],
+        )
+        self.color = ProductAttribute.objects.create(
+            name='Color', type='multiselect', options=[{'value': 'red', 'label': 'Red'}, {'value': 'blue', 'label': 'Blue'}],
+        )
+        self.fabric = ProductAttribute.objects.create(name='Fabric', type='text')
+        self.attribute_set = ProductAttributeSet.objects.create(name='Shirts')
+        self.attribute_set.attributes.set([self.size, self.color, self.fabric])
+        self.shirt = Product.objects.create(name='Shirt', attribute_set=self.attribute_set)
+        self.client = APIClient()
+        self.client.force_authenticate(user=get_user_model()(username='admin', is_superuser=True, is_active=True))
+
+    def test_generates_matrix_once(self):
+        """
+        Test that every combination gets one item and a second run matches them
+        """
+        matrix = generate_variants(self.shirt, {'size': None, 'color': ['blue', 'red']}, sku_prefix='tee')
+        self.assertEqual(
+            [item.sku for item in matrix.items],
+            ['TEE-M-BLUE', 'TEE-M-RED', 'TEE-S-BLUE', 'TEE-S-RED'],
+        )
+        self.assertTrue(all(item.pk for item in matrix.created))
+        variant = find_variant(self.shirt.pk, {'color': 'red', 'size': 'M'})
+        self.assertEqual(variant.sku, 'TEE-M-RED')
+        self.assertEqual(variant.attributes_data, {'size': 'M', 'color': 'red'})
+        self.assertTrue(variant.is_low_stock)
+
+        variant.quantity = 20
+        variant.save()
+        again = generate_variants(self.shirt, {'color': ['blue', 'red'], 'size': None}, sku_prefix='tee')
+        self.assertEqual((len(again.created), len(again.updated), len(again.unchanged)), (0, 0, 4))
+        self.assertEqual(InventoryItem.objects.get(pk=variant.pk).quantity, 20)
+
+    def test_adopts_items_by_sku(self):
+        """
+        Test that a hand-made item with the generated SKU becomes the variant
+        """
+        item = InventoryItem.objects.create(product=self.shirt, sku='P%d-S' % self.shirt.pk, quantity=3)
+        matrix = generate_variants(self.shirt, {'size': ['S', 'M']})
+        self.assertEqual((len(matrix.created), len(matrix.updated)), (1, 1))
+        self.assertEqual(find_variant(self.shirt.pk, {'size': 'S'}).pk, item.pk)
+
+    def test_long_values_fit_the_key(self):
+        """
+        Test that variants with long option values get distinct keys that fit the column
+        """
+        long_values = ['x' * 300 + str(i) for i in range(2)]
+        finish = ProductAttribute.objects.create(
+            name='Finish', type='select', options=[{'value': v, 'label': v} for v in long_values],
+        )
+        self.attribute_set.attributes.add(finish)
+        matrix = generate_variants(self.shirt, {'finish': None, 'color': None, 'size': None})
+        keys = [item.variant_key for item in matrix.created]
+        self.assertEqual(len(set(keys)), 8)
+        self.assertTrue(all(len(key) <= 255 for key in keys))
+        attributes = {'finish': long_values[1], 'color': 'red', 'size': 'S'}
+        self.assertEqual(find_variant(self.shirt.pk, attributes).attributes_data, attributes)
+
+    def test_rejects_bad_axes(self):
+        """
+        Test that unknown attributes, non-select types and unknown options are reported together
+        """
+        with self.assertRaises(VariantMatrixError) as raised:
+            generate_variants(self.shirt, {'size': ['XL'], 'fabric': None, 'weight': None})
+        self.assertEqual(set(raised.exception.errors), {'size', 'fabric', 'weight'})
+        self.assertFalse(InventoryItem.objects.exists())
+
+    def test_variant_endpoints(self):
+        """
+        Test generating variants and looking one up through the API
+        """
+        response = self.client.post('/api/inventory/variants/', {
+            'product': self.shirt.pk, 'attributes': {'size': ['S'], 'color': None}, 'sku_prefix': 'TEE',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['created'], 2)
+
+        response = self.client.get(f'/api/inventory/variant/?product={self.shirt.pk}&attr.size=S&attr.color=blue')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['sku'], 'TEE-S-BLUE')
+
+        response = self.client.get(f'/api/inventory/variant/?product={self.shirt.pk}&attr.size=M&attr.color=blue')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,195 @@
+import hashlib
+import logging
+from itertools import product as cartesian_product
+from typing import Any, Dict, List, Optional, Sequence
+from django.db import transaction
+from django.db.models import Q
+from django.utils.text import slugify
+from products.attribute_index import to_text
+from products.models import Product, ProductAttribute
+from .models import InventoryItem
+
+logger = logging.getLogger(__name__)
+
+VARIANT_ATTRIBUTE_TYPES = ('select', 'multiselect')
+MAX_VARIANTS = 1000
+SKU_MAX_LENGTH = 100
+VARIANT_KEY_MAX_LENGTH = 255
+
+class VariantMatrixError(ValueError):
+    """Raised when the requested axes cannot produce variants; nothing is written."""
+    def __init__(self, errors: Dict[str, str]):
+        super().__init__("; ".join(f"{code}: {error}" for code, error in errors.items()))
+        self.errors = errors
+
+def _key_text(value: Any) -> str:
+    # to_text cuts values at the index length; keys and SKUs need them whole
+    return to_text(value) if isinstance(value, bool) else str(value)
+
+def variant_key(attributes: Dict[str, Any]) -> str:
+    """The canonical ``code=value|...`` key of a variant, independent of key order.
+
+    Keys too long for the column are cut and suffixed with a SHA-1 of the
+    full key, so they stay unique and the same values always give the
+    same key.
+
+    Example:
+        variant_key({'size': 'M', 'color': 'red'})  # 'color=red|size=M'
+    """
+    key = '|'.join(f"{code}={_key_text(attributes[code])}" for code in sorted(attributes))
+    if len(key) > VARIANT_KEY_MAX_LENGTH:
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        key = f"{key[:VARIANT_KEY_MAX_LENGTH - len(digest) - 1]}#{digest}"
+    return key
+
+def variant_sku(prefix: str, values: Sequence[Any]) -> str:
+    """Builds ``PREFIX-VALUE-VALUE`` from the axis values, in axis order.
+
+    The same prefix and values always give the same SKU; SKUs too long for
+    the column are cut and suffixed with a hash of the full SKU so they
+    stay unique.
+    """
+    parts = [prefix] + [slugify(_key_text(value)).upper() or 'X' for value in values]
+    sku = '-'.join(parts)
+    if len(sku) > SKU_MAX_LENGTH:
+        digest = hashlib.sha1(sku.encode('utf-8')).hexdigest()[:8].upper()
+        sku = f"{sku[:SKU_MAX_LENGTH - len(digest) - 1]}-{digest}"
+    return sku
+
+class VariantMatrix():
+    """The outcome of ``generate_variants`` for one product."""
+    def __init__(self, product: Product, dry_run: bool = False):
+        self.product = product
+        self.dry_run = dry_run
+        self.created: List[InventoryItem] = []
+        self.updated: List[InventoryItem] = []
+        self.unchanged: List[InventoryItem] = []
+
+    def __str__(self):
+        return (
+            f"VariantMatrix(product={self.product.pk}, created={len(self.created)}, "
+            f"updated={len(self.updated)}, unchanged={len(self.unchanged)})"
+        )
+
+    @property
+    def items(self) -> List[InventoryItem]:
+        return sorted(self.created + self.updated + self.unchanged, key=lambda item: item.sku or '')
+
+def load_axes(product: Product, axes: Dict[str, Optional[List[Any]]]) -> List[tuple]:
+    """Resolves ``{code: values}`` to ``(code, values)`` pairs in request order.
+
+    Every code must be a select or multiselect attribute (of the product's
+    attribute set, when it has one) and every value one of its options;
+    ``None`` or an empty list selects all options.
+
+    Raises:
+        VariantMatrixError: With one message per bad axis.
+    """
+    attributes = {a.code: a for a in ProductAttribute.objects.filter(code__in=list(axes))}
+    allowed = None
+    if product.attribute_set_id is not None:
+        allowed = set(product.attribute_set.attributes.values_list('code', flat=True))
+    errors = {}
+    resolved = []
+    for code, values in axes.items():
+        attribute = attributes.get(code)
+        if attribute is None:
+            errors[code] = "Unknown attribute"
+            continue
+        if attribute.type not in VARIANT_ATTRIBUTE_TYPES:
+            errors[code] = "Only select and multiselect attributes can be variant axes"
+            continue
+        if allowed is not None and code not in allowed:
+            errors[code] = "Attribute is not in the product's attribute set"
+            continue
+        options = [option['value'] for option in attribute.options or []]
+        if not values:
+            values = options
+        unknown = [value for value in values if value not in options]
+        if unknown:
+            errors[code] = f"Not an option: {', '.join(to_text(value) for value in unknown)}"
+            continue
+        # keep request order, drop repeats
+        resolved.append((code, list(dict.fromkeys(values))))
+    if not resolved and not errors:
+        errors['attributes'] = "At least one axis is required"
+    if errors:
+        raise VariantMatrixError(errors)
+    return resolved
+
+def _assign_missing_pks(product: Product, items: List[InventoryItem]) -> None:
+    # MySQL cannot return ids from a multi-row INSERT; (product, variant_key) is unique
+    missing = {item.variant_key: item for item in items if item.pk is None}
+    if not missing:
+        return
+    found = InventoryItem.objects.filter(product=product, variant_key__in=list(missing)).values_list('variant_key', 'id')
+    for key, pk in found:
+        missing[key].pk = pk
+
+def generate_variants(
+    product: Product,
+    axes: Dict[str, Optional[List[Any]]],
+    sku_prefix: Optional[str] = None,
+    dry_run: bool = False,
+) -> VariantMatrix:
+    """Creates or updates one ``InventoryItem`` per combination of axis values.
+
+    The combinations are the cartesian product of the chosen options. Each
+    variant gets its axis values as ``attributes_data``, a ``variant_key``
+    for indexed lookups and a deterministic SKU, so running the generator
+    again matches the existing items instead of duplicating them. Items
+    are matched by ``variant_key`` first, then by SKU (adopting items made
+    by hand); stock quantities are never touched. New items are written
+    with one ``bulk_create`` and changed ones with one ``bulk_update``.
+
+    Example:
+        matrix = generate_variants(shirt, {'size': ['S', 'M'], 'color': None}, sku_prefix='TEE')
+        [item.sku for item in matrix.created]  # ['TEE-S-RED', 'TEE-S-BLUE', ...]
+    """
+    resolved = load_axes(product, axes)
+    total = 1
+    for _, values in resolved:
+        total *= len(values)
+    if total > MAX_VARIANTS:
+        raise VariantMatrixError({'attributes': f"{total} variants exceed the limit of {MAX_VARIANTS}"})
+    prefix = slugify(sku_prefix or '').upper() or f"P{product.pk}"
+    codes = [code for code, _ in resolved]
+    wanted = {}
+    for combination in cartesian_product(*(values for _, values in resolved)):
+        attributes = dict(zip(codes, combination))
+        wanted[variant_key(attributes)] = (variant_sku(prefix, combination), attributes)
+
+    matrix = VariantMatrix(product, dry_run)
+    with transaction.atomic():
+        existing = InventoryItem.objects.select_for_update().filter(product=product).filter(
+            Q(variant_key__in=list(wanted)) | Q(sku__in=[sku for sku, _ in wanted.values()])
+        )
+        by_key = {}
+        by_sku = {}
+        for item in existing:
+            if item.variant_key:
+                by_key[item.variant_key] = item
+            by_sku[item.sku] = item
+        for key, (sku, attributes) in wanted.items():
+            item = by_key.get(key) or by_sku.get(sku)
+            if item is None:
+                item = InventoryItem(product=product, sku=sku, attributes_data=attributes, variant_key=key)
+                # a new item has no stock yet; flag it without a crossing event
+                item.is_low_stock = item.is_active and item.quantity - item.reserved <= item.low_stock_threshold
+                matrix.created.append(item)
+            elif item.variant_key != key or item.attributes_data != attributes:
+                item.variant_key = key
+                item.attributes_data = attributes
+                matrix.updated.append(item)
+            else:
+                matrix.unchanged.append(item)
+        if not dry_run:
+            InventoryItem.objects.bulk_create(matrix.created)
+            _assign_missing_pks(product, matrix.created)
+            InventoryItem.objects.bulk_update(matrix.updated, ['variant_key', 'attributes_data'])
+    logger.info(str(matrix))
+    return matrix
+
+def find_variant(product_id: int, attributes: Dict[str, Any]) -> Optional[InventoryItem]:
+    """The variant of a product with exactly these attribute values, via the ``(product, variant_key)`` index."""
+    return InventoryItem.objects.filter(product_id=product_id, variant_key=variant_key(attributes)).first()
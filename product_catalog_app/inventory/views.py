@@ -1,22 +1,181 @@
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import permissions, status, viewsets
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.response import Response
+from core.pagination import StandardResultsSetPagination
+from products.imports import iter_import_rows
 from .models import InventoryItem
-from .serializers import InventoryItemSerializer
-
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 200
+from .reservations import COMMIT, RELEASE, RESERVE, StockReservationError, apply_stock_batch, apply_stock_operation
+from .serializers import (
+    InventoryItemSerializer,
+    StockBatchSerializer,
+    StockLevelSerializer,
+    StockQuantitySerializer,
+    StocktakeSerializer,
+    VariantMatrixSerializer,
+)
+from .stocktake import run_stocktake
+from .variants import VariantMatrixError, find_variant, generate_variants
 
 class InventoryItemViewSet(viewsets.ModelViewSet):
     queryset = InventoryItem.objects.all().order_by('-created_at')
     serializer_class = InventoryItemSerializer
     pagination_class = StandardResultsSetPagination
+    cursor_orderings = {'id': ('id',)}
+    lookup_value_regex = r'\d+'
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['product', 'is_active']
     search_fields = ['product_name', 'sku']
     ordering_fields = ['id', 'sku', 'created_at', 'updated_at']
-    ordering = ['id']
\ No newline at end of file
+    ordering = ['id']
+
+    def _stock_error(self, e: StockReservationError) -> Response:
+        return Response(
+            {
+                "error": str(e),
+                "errors": e.errors,
+            },
+            status=status.HTTP_409_CONFLICT,
+        )
+
+    def _stock_operation(self, request, pk, operation: str) -> Response:
+        query = StockQuantitySerializer(data=request.data)
+        if not query.is_valid():
+            return Response({"error": query.errors}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            apply_stock_operation(operation, int(pk), query.validated_data['quantity'])
+        except StockReservationError as e:
+            return self._stock_error(e)
+        return Response(StockLevelSerializer(self.get_object()).data)
+
+    def _stock_batch(self, request, operation: str) -> Response:
+        query = StockBatchSerializer(data=request.data)
+        if not query.is_valid():
+            return Response({"error": query.errors}, status=status.HTTP_400_BAD_REQUEST)
+        lines = [(line['item'], line['quantity']) for line in query.validated_data['lines']]
+        try:
+            item_ids = apply_stock_batch(operation, lines)
+        except StockReservationError as e:
+            return self._stock_error(e)
+        items = InventoryItem.objects.filter(pk__in=item_ids).order_by('id')
+        return Response(StockLevelSerializer(items, many=True).data)
+
+    @action(detail=False, methods=['get'], url_path='low-stock')
+    def low_stock(self, request):
+        """Active items whose available stock is at or below their threshold.
+
+        Served from the ``is_low_stock`` index; the usual filters,
+        ordering and pagination apply.
+        """
+        queryset = self.filter_queryset(self.get_queryset().filter(is_low_stock=True).select_related('product'))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        return Response(self.get_serializer(queryset, many=True).data)
+
+    @action(detail=True, methods=['post'])
+    def reserve(self, request, pk=None):
+        """Holds ``quantity`` units for a pending order; 409 if not enough are available."""
+        return self._stock_operation(request, pk, RESERVE)
+
+    @action(detail=True, methods=['post'])
+    def release(self, request, pk=None):
+        """Returns ``quantity`` reserved units to the available stock."""
+        return self._stock_operation(request, pk, RELEASE)
+
+    @action(detail=True, methods=['post'])
+    def commit(self, request, pk=None):
+        """Ships ``quantity`` reserved units, taking them off ``reserved`` and ``quantity``."""
+        return self._stock_operation(request, pk, COMMIT)
+
+    @action(detail=False, methods=['post'], url_path='reserve-batch')
+    def reserve_batch(self, request):
+        """Reserves every ``{"item", "quantity"}`` line of ``lines`` or none of them."""
+        return self._stock_batch(request, RESERVE)
+
+    @action(detail=False, methods=['post'], url_path='release-batch')
+    def release_batch(self, request):
+        return self._stock_batch(request, RELEASE)
+
+    @action(detail=False, methods=['post'], url_path='commit-batch')
+    def commit_batch(self, request):
+        return self._stock_batch(request, COMMIT)
+
+    @action(detail=False, methods=['post'], url_path='stocktake')
+    def stocktake(self, request):
+        """Sets counted quantities from ``counts`` or an uploaded CSV/JSONL ``file``.
+
+        Each row is ``{"sku", "counted_quantity"}`` with an optional
+        ``product`` id; the response lists the discrepancies found and the
+        rows that could not be applied. ``dry_run`` only reports; counts
+        below an item's reserved units are rejected unless ``clamp_reserved``.
+        """
+        if not request.user.has_perm('inventory.change_inventoryitem'):
+            raise PermissionDenied('You do not have permission to run a stocktake.')
+        query = StocktakeSerializer(data=request.data)
+        if not query.is_valid():
+            return Response({"error": query.errors}, status=status.HTTP_400_BAD_REQUEST)
+        params = query.validated_data
+        if 'file' in params:
+            rows = iter_import_rows(params['file'], params['format'])
+        else:
+            rows = ((number, data, None) for number, data in enumerate(params['counts'], start=1))
+        report = run_stocktake(rows, dry_run=params['dry_run'], clamp_reserved=params['clamp_reserved'])
+        return Response(report.as_dict())
+
+    @action(detail=False, methods=['post'], url_path='variants')
+    def variants(self, request):
+        """Creates one item per combination of ``attributes`` options for ``product``.
+
+        ``attributes`` maps select/multiselect attribute codes to the option
+        values to combine (``null`` for all options). Existing variants are
+        matched and kept; ``dry_run`` only reports.
+        """
+        if not request.user.has_perm('inventory.add_inventoryitem'):
+            raise PermissionDenied('You do not have permission to generate variants.')
+        query = VariantMatrixSerializer(data=request.data)
+        if not query.is_valid():
+            return Response({"error": query.errors}, status=status.HTTP_400_BAD_REQUEST)
+        params = query.validated_data
+        try:
+            matrix = generate_variants(
+                params['product'],
+                params['attributes'],
+                sku_prefix=params.get('sku_prefix'),
+                dry_run=params['dry_run'],
+            )
+        except VariantMatrixError as e:
+            return Response({"error": e.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {
+                "dry_run": matrix.dry_run,
+                "created": len(matrix.created),
+                "updated": len(matrix.updated),
+                "unchanged": len(matrix.unchanged),
+                "items": InventoryItemSerializer(matrix.items, many=True).data,
+            },
+            status=status.HTTP_201_CREATED if matrix.created and not matrix.dry_run else status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=['get'], url_path='variant')
+    def variant(self, request):
+        """The item of ``?product=`` whose attributes are exactly the ``?attr.<code>=`` values."""
+        product_id = request.query_params.get('product', '')
+        attributes = {
+            key[len('attr.'):]: value
+            for key, value in request.query_params.items()
+            if key.startswith('attr.')
+        }
+        if not product_id.isdigit() or not attributes:
+            return Response(
+                {"error": "Expected ?product=<id> and at least one ?attr.<code>=<value>"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        item = find_variant(int(product_id), attributes)
+        if item is None:
+            raise NotFound('No variant with these attributes.')
+        return Response(self.get_serializer(item).data)
@@ -1,11 +1,46 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Optional
+from pubsub.publisher import DEFAULT_PUBLISHER_SETTINGS, PublishCounters, PublishResults, publish_all
 
 class AbstractMessenger(ABC):
+    _publisher_settings = None
+
+    def __init__(self, *args, **kwargs):
+        # per instance, so messengers never share counts; singletons run
+        # __init__ on every construction and keep the counters they have
+        if '_counters' not in self.__dict__:
+            self._counters = PublishCounters()
+
     @abstractmethod
     def publish(self, topic: str, data: Dict[str, Any]):
         pass
 
+    def publish_many(
+        self,
+        topic: str,
+        messages: Iterable[Dict[str, Any]],
+        keys: Optional[Iterable[Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> PublishResults:
+        """Publishes a batch of messages and collects their futures into one result."""
+        max_in_flight = (
+            self._publisher_settings.max_in_flight_messages
+            if self._publisher_settings
+            else DEFAULT_PUBLISHER_SETTINGS['PUBSUB_MAX_IN_FLIGHT_MESSAGES']
+        )
+        return publish_all(
+            lambda message: self.publish(topic, message),
+            messages,
+            keys=keys,
+            max_in_flight=max_in_flight,
+            timeout=timeout,
+        )
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Counts of messages queued (awaiting ack), published and failed."""
+        return self._counters.snapshot()
+
     @abstractmethod
     def subscribe(self, subscription_id: str, callback):
-        pass
\ No newline at end of file
+        pass
@@ -1,4 +1,6 @@
 PRODUCT_CREATION_TOPIC = "product-create"
 PRODUCT_CREATION_SUBSCRIPTION_ID = "product-create-sub"
 PRODUCT_ATTRIBUTES_SET_UPDATES_TOPIC = "product-attribute-set-updates"
-PRODUCT_ATTRIBUTES_SET_UPDATE_SUBSCRIPTION_ID = "product-attribute-set-updates-sub"
\ No newline at end of file
+PRODUCT_ATTRIBUTES_SET_UPDATE_SUBSCRIPTION_ID = "product-attribute-set-updates-sub"
+PRODUCT_PRICE_ALERTS_TOPIC = "product-price-alerts"
+INVENTORY_LOW_STOCK_TOPIC = "inventory-low-stock"
\ No newline at end of file
@@ -1,8 +1,9 @@
-import json
 from typing import Dict, Any
 from .base import AbstractMessenger
 from google.cloud import pubsub_v1
 from django.conf import settings
+from pubsub.google import make_publisher_client
+from pubsub.publisher import PublisherSettings, encode_message
 
 class GooglePubSubClient(AbstractMessenger):
     _instance = None
@@ -13,7 +14,8 @@ class GooglePubSubClient(AbstractMessenger):
     def __new__(cls, *args, **kwargs):
         if not cls._instance:
             cls._instance = super(GooglePubSubClient, cls).__new__(cls)
-            cls._publisher = pubsub_v1.PublisherClient()
+            cls._publisher_settings = PublisherSettings(lambda name: getattr(settings, name, None))
+            cls._publisher = make_publisher_client(cls._publisher_settings)
             cls._subscriber = pubsub_v1.SubscriberClient()
             cls._project_id = getattr(settings, 'PUBSUB_PROJECT_ID', '')
             if not cls._project_id:
@@ -28,8 +30,7 @@ class GooglePubSubClient(AbstractMessenger):
     
     def publish(self, topic: str, data: Dict[str, Any]):
         topic_path = self._publisher.topic_path(self._project_id, topic)
-        send = json.dumps(data).encode('utf-8')
-        self._publisher.publish(topic_path, data=send)
+        return self._counters.track(self._publisher.publish(topic_path, data=encode_message(data)))
         
     def subscribe(self, subscription_id: str, callback):
         path = self._subscriber.subscription_path(self._project_id, subscription_id)
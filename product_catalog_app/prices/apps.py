@@ -1,6 +1,64 @@
 from django.apps import AppConfig
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
 
 
 class PricesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'prices'
+
+    def ready(self):
+        from categories.models import Category
+        from categories.signals import category_moved as category_moved_signal
+        from .models import Price, PriceModifier, PriceRule
+        from .signals import (
+            category_moved,
+            modifier_deleting,
+            modifier_rules_changed,
+            modifier_saved,
+            modifier_saving,
+            price_changed,
+            price_deleted,
+            price_modifiers_changed,
+            rule_changed,
+        )
+
+        post_save.connect(
+            receiver=price_changed,
+            sender=Price
+        )
+        post_delete.connect(
+            receiver=price_deleted,
+            sender=Price
+        )
+        m2m_changed.connect(
+            receiver=price_modifiers_changed,
+            sender=Price.price_modifiers.through
+        )
+        pre_save.connect(
+            receiver=modifier_saving,
+            sender=PriceModifier
+        )
+        post_save.connect(
+            receiver=modifier_saved,
+            sender=PriceModifier
+        )
+        pre_delete.connect(
+            receiver=modifier_deleting,
+            sender=PriceModifier
+        )
+        m2m_changed.connect(
+            receiver=modifier_rules_changed,
+            sender=PriceModifier.price_rules.through
+        )
+        post_save.connect(
+            receiver=rule_changed,
+            sender=PriceRule
+        )
+        pre_delete.connect(
+            receiver=rule_changed,
+            sender=PriceRule
+        )
+        category_moved_signal.connect(
+            receiver=category_moved,
+            sender=Category
+        )
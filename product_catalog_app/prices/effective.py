@@ -0,0 +1,257 @@
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from categories.models import Category
+from products.models import Product
+from .engine import load_modifier_index, load_pricing_scopes, price_products, resolve_effective_prices
+from .lookup import DEFAULT_CURRENCY_CODE, DEFAULT_REGION_CODE, select_base_price
+from .models import EffectivePriceRefresh, Price, PriceModifier, ProductEffectivePrice
+from .serializers import AppliedModifierSerializer, EffectivePriceSerializer, MaterializedPriceSerializer
+
+logger = logging.getLogger(__name__)
+
+REFRESH_BATCH_SIZE = 500
+QUEUE_BATCH_SIZE = 1000
+
+def queue_price_refresh(product_ids: Iterable[int], batch_size: int = QUEUE_BATCH_SIZE) -> int:
+    """Marks products for effective-price recomputation.
+
+    Call it inside the transaction that changes their pricing inputs;
+    ``refresh_queued_prices`` picks them up once it has committed. A
+    product already queued has its ``queued_at`` moved forward so a
+    refresh running concurrently does not drop it.
+
+    Returns:
+        int: The number of products queued.
+    """
+    queued = 0
+    batch = []
+    for product_id in product_ids:
+        batch.append(EffectivePriceRefresh(product_id=product_id))
+        if len(batch) >= batch_size:
+            queued += _queue(batch)
+            batch = []
+    if batch:
+        queued += _queue(batch)
+    return queued
+
+def _queue(batch: List[EffectivePriceRefresh]) -> int:
+    EffectivePriceRefresh.objects.bulk_create(
+        batch,
+        update_conflicts=True,
+        unique_fields=['product'],
+        update_fields=['queued_at'],
+    )
+    return len(batch)
+
+def priced_product_ids(prices) -> Iterable[int]:
+    """Distinct product ids of a ``Price`` queryset, streamed."""
+    return prices.order_by().values_list('product_id', flat=True).distinct().iterator()
+
+def modifier_scope(modifier: PriceModifier) -> tuple:
+    attribute_code = None
+    if modifier.product_attribute_id is not None and modifier.product_attribute_value is not None:
+        attribute_code = modifier.product_attribute.code
+    return (modifier.category_id, modifier.product_attribute_set_id, attribute_code)
+
+def queue_modifier_scope(modifier_id: Optional[int], scope: tuple) -> int:
+    """Queues the priced products a modifier can apply to.
+
+    Scoped modifiers reach products in the category's subtree, with the
+    attribute set, or with a value for the attribute (a superset of the
+    products the value matches); attached modifiers reach their prices'
+    products.
+    """
+    category_id, attribute_set_id, attribute_code = scope
+    prices = Price.objects.none()
+    if category_id is not None:
+        path = Category.objects.filter(pk=category_id).values_list('path', flat=True).first()
+        if path is not None:
+            prices = Price.objects.filter(product__category__path__startswith=path)
+    elif attribute_set_id is not None:
+        prices = Price.objects.filter(product__attribute_set_id=attribute_set_id)
+    elif attribute_code is not None:
+        prices = Price.objects.filter(product__attributes_data__has_key=attribute_code)
+    if modifier_id is not None:
+        prices = prices | Price.objects.filter(price_modifiers=modifier_id)
+    return queue_price_refresh(priced_product_ids(prices))
+
+def _markets(prices: List[Price]) -> set:
+    return {
+        (price.region_code or DEFAULT_REGION_CODE, price.currency_code or DEFAULT_CURRENCY_CODE)
+        for price in prices
+    }
+
+def _next_start(prices: List[Price], region_code: str, currency_code: str, at):
+    starts = [
+        price.valid_from
+        for price in prices
+        if price.valid_from is not None and price.valid_from > at
+        and price.region_code in (None, region_code) and price.currency_code in (None, currency_code)
+    ]
+    return min(starts, default=None)
+
+def refresh_effective_prices(product_ids: List[int], at=None) -> int:
+    """Recomputes the materialized effective prices of ``product_ids``.
+
+    Every market (region and currency) a product has an active price in
+    gets one row. Products, prices, category ancestry and modifiers are
+    each loaded once for the batch.
+
+    Returns:
+        int: The number of rows written.
+    """
+    at = at or timezone.now()
+    products = list(
+        Product.objects.filter(pk__in=product_ids).only('id', 'category_id', 'attribute_set_id', 'attributes_data')
+    )
+    by_product = defaultdict(list)
+    prices = Price.objects.filter(product_id__in=product_ids, is_active=True).prefetch_related(
+        'price_modifiers__price_rules',
+        'price_modifiers__product_attribute',
+    )
+    for price in prices:
+        by_product[price.product_id].append(price)
+    scopes = load_pricing_scopes(products)
+    index = load_modifier_index(scopes.values())
+
+    by_market = defaultdict(dict)
+    for product in products:
+        for market in _markets(by_product[product.pk]):
+            by_market[market][product.pk] = select_base_price(by_product[product.pk], *market, at=at)
+
+    rows = []
+    for (region_code, currency_code), market_prices in by_market.items():
+        effective = price_products(
+            [p for p in products if p.pk in market_prices], market_prices, at, scopes=scopes, index=index,
+        )
+        for product_id, price in market_prices.items():
+            next_start = _next_start(by_product[product_id], region_code, currency_code, at)
+            row = ProductEffectivePrice(
+                product_id=product_id,
+                region_code=region_code,
+                currency_code=currency_code,
+                computed_at=at,
+                expires_at=next_start,
+            )
+            result = effective.get(product_id)
+            if result is not None:
+                row.price = price
+                row.base_price = result.base_price
+                row.amount = result.amount
+                row.applied_modifiers = AppliedModifierSerializer(result.applied, many=True).data
+                row.expires_at = min(
+                    (moment for moment in (next_start, result.expires_at) if moment is not None),
+                    default=None,
+                )
+            rows.append(row)
+
+    with transaction.atomic():
+        ProductEffectivePrice.objects.filter(product_id__in=product_ids).delete()
+        ProductEffectivePrice.objects.bulk_create(rows, batch_size=QUEUE_BATCH_SIZE)
+    return len(rows)
+
+def refresh_queued_prices(batch_size: int = REFRESH_BATCH_SIZE) -> int:
+    """Recomputes the oldest queued products and takes them off the queue.
+
+    The batch is claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` so
+    several workers can drain the queue. Products queued again while the
+    batch was being computed stay queued.
+
+    Returns:
+        int: The number of products refreshed.
+    """
+    with transaction.atomic():
+        started = timezone.now()
+        product_ids = list(
+            EffectivePriceRefresh.objects.select_for_update(skip_locked=True)
+            .order_by('queued_at')
+            .values_list('product_id', flat=True)[:batch_size]
+        )
+        if not product_ids:
+            return 0
+        refresh_effective_prices(product_ids, at=started)
+        EffectivePriceRefresh.objects.filter(product_id__in=product_ids, queued_at__lte=started).delete()
+    logger.info(f"Refreshed effective prices of {len(product_ids)} products")
+    return len(product_ids)
+
+def queue_expired_prices(at=None) -> int:
+    """Queues the products whose materialized prices have passed ``expires_at``."""
+    at = at or timezone.now()
+    expired = ProductEffectivePrice.objects.filter(expires_at__lte=at)
+    return queue_price_refresh(expired.order_by().values_list('product_id', flat=True).distinct().iterator())
+
+def fresh_effective_prices(at=None):
+    at = at or timezone.now()
+    return ProductEffectivePrice.objects.filter(Q(expires_at__isnull=True) | Q(expires_at__gt=at))
+
+def lookup_effective_prices(
+    product_ids: List[int],
+    region_code: str = DEFAULT_REGION_CODE,
+    currency_code: str = DEFAULT_CURRENCY_CODE,
+) -> Dict[int, ProductEffectivePrice]:
+    """Reads the current materialized prices of many products in one query.
+
+    Products that have no price in the market, or whose row is stale or
+    not yet computed, are left out.
+    """
+    rows = fresh_effective_prices().filter(
+        product_id__in=product_ids,
+        region_code=region_code,
+        currency_code=currency_code,
+        price__isnull=False,
+    )
+    return {row.product_id: row for row in rows}
+
+def current_effective_amounts(
+    product_ids: List[int],
+    region_code: str = DEFAULT_REGION_CODE,
+    currency_code: str = DEFAULT_CURRENCY_CODE,
+) -> Dict[int, Decimal]:
+    """Current effective price amounts of many products in one market.
+
+    Read from the materialized table in one query; products whose row is
+    missing or stale are priced by the engine in one more batch.
+    """
+    amounts = {
+        product_id: row.amount
+        for product_id, row in lookup_effective_prices(product_ids, region_code, currency_code).items()
+    }
+    missing = [product_id for product_id in product_ids if product_id not in amounts]
+    if missing:
+        products = Product.objects.filter(pk__in=missing).only('id', 'category_id', 'attribute_set_id', 'attributes_data')
+        for product_id, effective in resolve_effective_prices(products, region_code, currency_code).items():
+            amounts[product_id] = effective.amount
+    return amounts
+
+def effective_price_data(products: Iterable[Product], prices: Dict[int, Optional[Price]], at=None) -> Dict[int, dict]:
+    """Serialized effective prices for products whose base price is known.
+
+    Materialized rows for those exact prices are used when fresh; the
+    rest, and every product when pricing another moment ``at``, are
+    computed on the spot by the pricing engine.
+
+    Returns:
+        Dict[int, dict]: ``EffectivePriceSerializer`` data by product id.
+    """
+    prices = {product_id: price for product_id, price in prices.items() if price is not None}
+    if not prices:
+        return {}
+    data = {}
+    rows = ProductEffectivePrice.objects.none()
+    if at is None:
+        rows = fresh_effective_prices().filter(price_id__in=[price.pk for price in prices.values()])
+    for row in rows:
+        price = prices[row.product_id]
+        market = (price.region_code or DEFAULT_REGION_CODE, price.currency_code or DEFAULT_CURRENCY_CODE)
+        if (row.region_code, row.currency_code) == market:
+            data[row.product_id] = MaterializedPriceSerializer(row).data
+    missing = [p for p in products if p.pk in prices and p.pk not in data]
+    if missing:
+        for product_id, effective in price_products(missing, prices, at).items():
+            data[product_id] = EffectivePriceSerializer(effective).data
+    return data
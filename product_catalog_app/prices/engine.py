@@ -0,0 +1,274 @@
+import logging
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Callable, Dict, Iterable, List, Optional
+from django.db.models import Q
+from django.utils import timezone
+from categories.counts import ancestor_paths
+from categories.models import Category
+from products.attribute_index import to_text
+from products.models import Product
+from .lookup import DEFAULT_CURRENCY_CODE, DEFAULT_REGION_CODE, prices_at
+from .models import Price, PriceModifier, PriceRule
+
+logger = logging.getLogger(__name__)
+
+CENT = Decimal('0.01')
+HUNDRED = Decimal('100')
+
+class PricingContext():
+    """What a rule can look at when deciding whether a modifier applies."""
+    def __init__(self, region_code: Optional[str], currency_code: Optional[str], at):
+        self.region_code = region_code
+        self.currency_code = currency_code
+        self.at = at
+
+# A rule check returns True when the rule lets its modifiers apply.
+RuleCheck = Callable[[dict, PricingContext], bool]
+
+def _check_schedule(config: dict, context: PricingContext) -> bool:
+    return True
+
+def _check_codes(key: str, attribute: str) -> RuleCheck:
+    def check(config: dict, context: PricingContext) -> bool:
+        codes = config.get(key) or []
+        return getattr(context, attribute) in codes
+    return check
+
+RULE_CHECKS: Dict[str, RuleCheck] = {
+    '': _check_schedule,
+    'schedule': _check_schedule,
+    'region': _check_codes('region_codes', 'region_code'),
+    'currency': _check_codes('currency_codes', 'currency_code'),
+}
+
+def rule_applies(rule: PriceRule, context: PricingContext) -> bool:
+    """Whether ``rule`` is active at ``context.at`` and its ``rule_config`` matches.
+
+    Unknown rule types never match, so a modifier is not applied on the
+    strength of a rule the engine cannot evaluate.
+    """
+    if not rule.is_active:
+        return False
+    if rule.active_from is not None and context.at < rule.active_from:
+        return False
+    if rule.active_to is not None and context.at >= rule.active_to:
+        return False
+    check = RULE_CHECKS.get(rule.rule_type or '')
+    if check is None:
+        logger.warning(f"Price rule {rule.pk} has unknown rule_type {rule.rule_type!r}")
+        return False
+    return check(rule.rule_config or {}, context)
+
+def apply_modifier(amount: Decimal, modifier: PriceModifier) -> Decimal:
+    if modifier.type == 'percentage':
+        return amount + amount * modifier.amount / HUNDRED
+    if modifier.type == 'fixed_price':
+        return modifier.amount
+    return amount + modifier.amount
+
+class EffectivePrice():
+    """A product's base price with the modifiers that applied to it."""
+    def __init__(self, product_id: int, price: Price, amount: Decimal, applied: List[PriceModifier], expires_at=None):
+        self.product_id = product_id
+        self.price = price
+        self.amount = amount
+        self.applied = applied
+        # the next moment a price or rule window opens or closes
+        self.expires_at = expires_at
+
+    def __str__(self):
+        return f"EffectivePrice(product={self.product_id}, amount={self.amount})"
+
+    @property
+    def base_price(self) -> Decimal:
+        return self.price.price
+
+    @property
+    def currency_code(self) -> Optional[str]:
+        return self.price.currency_code
+
+    @property
+    def region_code(self) -> Optional[str]:
+        return self.price.region_code
+
+class ProductPricingScope():
+    """The category ancestry, attribute set and attribute values of one product."""
+    def __init__(self, product: Product, category_ids: Iterable[int]):
+        self.product_id = product.pk
+        self.category_ids = frozenset(category_ids)
+        self.attribute_set_id = product.attribute_set_id
+        self.attributes_data = product.attributes_data if isinstance(product.attributes_data, dict) else {}
+
+    def values(self, code: str) -> List[str]:
+        value = self.attributes_data.get(code)
+        if value is None:
+            return []
+        if isinstance(value, list):
+            return [to_text(item) for item in value]
+        return [to_text(value)]
+
+    def has_value(self, code: str, expected: str) -> bool:
+        return expected in self.values(code)
+
+class ModifierIndex():
+    """Active scoped modifiers, indexed by what they target.
+
+    Modifiers are looked up by category, attribute set and attribute
+    value through dicts, so pricing a product only touches the modifiers
+    that can apply to it. A modifier that targets several things applies
+    only when all of them match.
+    """
+    def __init__(self, modifiers: Iterable[PriceModifier]):
+        self.by_category = defaultdict(list)
+        self.by_attribute_set = defaultdict(list)
+        self.by_attribute_value = defaultdict(lambda: defaultdict(list))
+        for modifier in modifiers:
+            if modifier.category_id is not None:
+                self.by_category[modifier.category_id].append(modifier)
+            elif modifier.product_attribute_set_id is not None:
+                self.by_attribute_set[modifier.product_attribute_set_id].append(modifier)
+            elif modifier.product_attribute_id is not None and modifier.product_attribute_value is not None:
+                code = modifier.product_attribute.code
+                self.by_attribute_value[code][modifier.product_attribute_value].append(modifier)
+
+    def candidates(self, scope: ProductPricingScope) -> List[PriceModifier]:
+        found = []
+        for category_id in scope.category_ids:
+            found.extend(self.by_category.get(category_id, ()))
+        found.extend(self.by_attribute_set.get(scope.attribute_set_id, ()))
+        for code, by_value in self.by_attribute_value.items():
+            for value in set(scope.values(code)):
+                found.extend(by_value.get(value, ()))
+        return [m for m in found if modifier_matches(m, scope)]
+
+def modifier_matches(modifier: PriceModifier, scope: ProductPricingScope) -> bool:
+    if modifier.category_id is not None and modifier.category_id not in scope.category_ids:
+        return False
+    if modifier.product_attribute_set_id is not None and modifier.product_attribute_set_id != scope.attribute_set_id:
+        return False
+    if modifier.product_attribute_id is not None and modifier.product_attribute_value is not None:
+        return scope.has_value(modifier.product_attribute.code, modifier.product_attribute_value)
+    return True
+
+def load_pricing_scopes(products: List[Product]) -> Dict[int, ProductPricingScope]:
+    """Resolves the category ancestry of every product in two queries."""
+    category_ids = {p.category_id for p in products if p.category_id is not None}
+    paths = dict(Category.objects.filter(pk__in=category_ids).values_list('pk', 'path'))
+    # treebeard paths are unique across systems
+    wanted = {ancestor for path in paths.values() for ancestor in ancestor_paths(path)}
+    by_path = {}
+    if wanted:
+        by_path = dict(Category.objects.filter(path__in=wanted).values_list('path', 'pk'))
+    lineage = {
+        pk: [by_path[p] for p in ancestor_paths(path) if p in by_path]
+        for pk, path in paths.items()
+    }
+    return {p.pk: ProductPricingScope(p, lineage.get(p.category_id, ())) for p in products}
+
+def load_modifier_index(scopes: Iterable[ProductPricingScope]) -> ModifierIndex:
+    """Loads the active modifiers that can target ``scopes``, with their rules."""
+    scopes = list(scopes)
+    category_ids = set().union(*(s.category_ids for s in scopes)) if scopes else set()
+    attribute_set_ids = {s.attribute_set_id for s in scopes if s.attribute_set_id is not None}
+    modifiers = PriceModifier.objects.filter(is_active=True).filter(
+        Q(category_id__in=category_ids)
+        | Q(product_attribute_set_id__in=attribute_set_ids)
+        | Q(product_attribute__isnull=False, product_attribute_value__isnull=False)
+    ).select_related('product_attribute').prefetch_related('price_rules')
+    return ModifierIndex(modifiers)
+
+def price_products(
+    products: Iterable[Product],
+    prices: Dict[int, Price],
+    at=None,
+    scopes: Optional[Dict[int, ProductPricingScope]] = None,
+    index: Optional[ModifierIndex] = None,
+) -> Dict[int, EffectivePrice]:
+    """Applies modifiers to already chosen base prices for a batch of products.
+
+    Modifiers attached to the price and those targeting the product's
+    category (or an ancestor of it), attribute set or attribute values are
+    merged, filtered through their rules and applied in ``priority``
+    order. The lookups for the whole batch take a fixed number of
+    queries; ``prices`` should have ``price_modifiers__price_rules``
+    prefetched.
+
+    Args:
+        products (Iterable[Product]): The products being priced.
+        prices (Dict[int, Price]): The base price of each product, by id.
+        at (datetime): The moment rules are evaluated at; defaults to now.
+        scopes (Dict[int, ProductPricingScope]): Preloaded scopes, if any.
+        index (ModifierIndex): Preloaded modifiers, if any.
+
+    Returns:
+        Dict[int, EffectivePrice]: Effective prices keyed by product id;
+        products without a base price are left out.
+    """
+    at = at or timezone.now()
+    products = [p for p in products if prices.get(p.pk) is not None]
+    if not products:
+        return {}
+    if scopes is None:
+        scopes = load_pricing_scopes(products)
+    if index is None:
+        index = load_modifier_index(scopes.values())
+    results = {}
+    for product in products:
+        price = prices[product.pk]
+        context = PricingContext(price.region_code, price.currency_code, at)
+        modifiers = {m.pk: m for m in index.candidates(scopes[product.pk])}
+        for modifier in price.price_modifiers.all():
+            if modifier.is_active and modifier_matches(modifier, scopes[product.pk]):
+                modifiers.setdefault(modifier.pk, modifier)
+        boundaries = [price.valid_to] + [
+            moment
+            for modifier in modifiers.values()
+            for rule in modifier.price_rules.all()
+            for moment in (rule.active_from, rule.active_to)
+        ]
+        expires_at = min((moment for moment in boundaries if moment is not None and moment > at), default=None)
+        applied = sorted(
+            (m for m in modifiers.values() if all(rule_applies(r, context) for r in m.price_rules.all())),
+            key=lambda m: (m.priority, m.pk),
+        )
+        amount = price.price
+        for modifier in applied:
+            amount = apply_modifier(amount, modifier)
+        amount = max(amount, Decimal('0')).quantize(CENT, rounding=ROUND_HALF_UP)
+        results[product.pk] = EffectivePrice(product.pk, price, amount, applied, expires_at)
+    return results
+
+def resolve_effective_prices(
+    products: Iterable[Product],
+    region_code: Optional[str] = DEFAULT_REGION_CODE,
+    currency_code: Optional[str] = DEFAULT_CURRENCY_CODE,
+    at=None,
+) -> Dict[int, EffectivePrice]:
+    """Resolves the effective price of many products for a region and currency.
+
+    Base prices, category ancestry, modifiers and rules are each loaded
+    once for the batch, then every product is priced in memory.
+
+    Example:
+        effective = resolve_effective_prices(products, 'DEU', 'EUR')
+        effective[product.pk].amount  # Decimal('17.99')
+    """
+    at = at or timezone.now()
+    products = list(products)
+    prices = prices_at(
+        [p.pk for p in products],
+        at,
+        region_code,
+        currency_code,
+        queryset=Price.objects.prefetch_related('price_modifiers__price_rules', 'price_modifiers__product_attribute'),
+    )
+    return price_products(products, prices, at)
+
+def resolve_effective_price(
+    product: Product,
+    region_code: Optional[str] = DEFAULT_REGION_CODE,
+    currency_code: Optional[str] = DEFAULT_CURRENCY_CODE,
+    at=None,
+) -> Optional[EffectivePrice]:
+    return resolve_effective_prices([product], region_code, currency_code, at).get(product.pk)
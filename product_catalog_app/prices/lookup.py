@@ -0,0 +1,120 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from .models import Price
+
+DEFAULT_REGION_CODE = Price._meta.get_field('region_code').default
+DEFAULT_CURRENCY_CODE = Price._meta.get_field('currency_code').default
+
+def valid_at(at) -> Q:
+    """Prices whose ``[valid_from, valid_to)`` window contains ``at``; open ends are unbounded."""
+    return (
+        (Q(valid_from__isnull=True) | Q(valid_from__lte=at))
+        & (Q(valid_to__isnull=True) | Q(valid_to__gt=at))
+    )
+
+def _market(field: str, code: Optional[str]) -> Q:
+    if code is None:
+        return Q()
+    return Q(**{field: code}) | Q(**{f'{field}__isnull': True})
+
+def prices_valid_at(
+    product_ids: List[int],
+    at=None,
+    region_code: Optional[str] = None,
+    currency_code: Optional[str] = None,
+    queryset: Optional[QuerySet] = None,
+) -> QuerySet:
+    """Active prices of ``product_ids`` valid at ``at`` in a market.
+
+    The filter follows the ``(product, region_code, currency_code,
+    valid_from, valid_to)`` index, so each product is a short range scan
+    rather than a pass over all of its historical prices.
+    """
+    at = at or timezone.now()
+    queryset = Price.objects.all() if queryset is None else queryset
+    return queryset.filter(
+        _market('region_code', region_code),
+        _market('currency_code', currency_code),
+        valid_at(at),
+        product_id__in=product_ids,
+        is_active=True,
+    )
+
+def select_base_price(
+    prices: Iterable[Price],
+    region_code: Optional[str] = DEFAULT_REGION_CODE,
+    currency_code: Optional[str] = DEFAULT_CURRENCY_CODE,
+    at=None,
+) -> Optional[Price]:
+    """Picks the price that applies at ``at`` from a product's prices.
+
+    Active prices for the region and currency whose validity window
+    contains ``at`` are considered; a price without a region or currency
+    matches any, but an exact match wins. A ``None`` region or currency
+    accepts every market, preferring the default one. Among equals the one
+    that became valid last (then the newest) wins, so overlapping windows
+    resolve to the most recent price instead of an error.
+    """
+    at = at or timezone.now()
+    wanted_region = region_code or DEFAULT_REGION_CODE
+    wanted_currency = currency_code or DEFAULT_CURRENCY_CODE
+    best, best_key = None, None
+    for price in prices:
+        if not price.is_active:
+            continue
+        if region_code is not None and price.region_code not in (None, region_code):
+            continue
+        if currency_code is not None and price.currency_code not in (None, currency_code):
+            continue
+        if price.valid_from is not None and price.valid_from > at:
+            continue
+        if price.valid_to is not None and price.valid_to <= at:
+            continue
+        key = (
+            price.region_code == wanted_region,
+            price.currency_code == wanted_currency,
+            price.region_code is not None,
+            price.currency_code is not None,
+            price.valid_from is not None,
+            price.valid_from,
+            price.created_at,
+            price.pk,
+        )
+        if best_key is None or key > best_key:
+            best, best_key = price, key
+    return best
+
+def prices_at(
+    product_ids: List[int],
+    at=None,
+    region_code: Optional[str] = None,
+    currency_code: Optional[str] = None,
+    queryset: Optional[QuerySet] = None,
+) -> Dict[int, Price]:
+    """The price each product had at ``at``, for many products in one query.
+
+    Args:
+        product_ids (List[int]): The products to look up.
+        at (datetime): The instant; defaults to now.
+        region_code (str): ISO 3166-1 alpha-3 code, or ``None`` for any.
+        currency_code (str): ISO 4217 code, or ``None`` for any.
+        queryset (QuerySet): ``Price`` queryset to start from, e.g. with
+            prefetches.
+
+    Returns:
+        Dict[int, Price]: Prices keyed by product id; products without a
+        valid price are left out.
+
+    Example:
+        prices = prices_at([p.pk for p in page], at=parse_datetime('2025-01-01T00:00:00Z'))
+    """
+    at = at or timezone.now()
+    candidates = defaultdict(list)
+    for price in prices_valid_at(product_ids, at, region_code, currency_code, queryset):
+        candidates[price.product_id].append(price)
+    return {
+        product_id: select_base_price(product_prices, region_code, currency_code, at)
+        for product_id, product_prices in candidates.items()
+    }
@@ -0,0 +1,70 @@
+import time
+from django.core.management.base import BaseCommand
+from prices.effective import (
+    REFRESH_BATCH_SIZE,
+    priced_product_ids,
+    queue_expired_prices,
+    queue_price_refresh,
+    refresh_queued_prices,
+)
+from prices.models import EffectivePriceRefresh, Price
+
+
+class Command(BaseCommand):
+    help = 'Recompute the materialized effective prices of queued products'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=REFRESH_BATCH_SIZE,
+            help='Maximum products recomputed per transaction',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Drain the queue and exit instead of polling',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Seconds to wait between polls when the queue is empty',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Queue every priced product first (initial build)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show how many products are queued without recomputing them',
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            self.stdout.write(f'Queued products: {EffectivePriceRefresh.objects.count()}')
+            return
+
+        if options['all']:
+            queued = queue_price_refresh(priced_product_ids(Price.objects.all()))
+            self.stdout.write(f'Queued {queued} priced products')
+
+        self.stdout.write(self.style.SUCCESS('Starting effective price refresh...'))
+        total = 0
+        try:
+            while True:
+                # rows whose price or rule windows have passed go back on the queue
+                queue_expired_prices()
+                refreshed = refresh_queued_prices(batch_size=options['batch_size'])
+                total += refreshed
+                if refreshed:
+                    self.stdout.write(f'  refreshed {total} products')
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f'Effective price refresh stopped after {total} products.'))
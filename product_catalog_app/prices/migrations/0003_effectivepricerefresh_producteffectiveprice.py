@@ -0,0 +1,46 @@
+# Generated by Django 5.2.3 on 2026-10-18 01:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prices', '0002_price_price_modifiers'),
+        ('products', '0022_productimportjob_productimporterror'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EffectivePriceRefresh',
+            fields=[
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='products.product')),
+                ('queued_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Effective Price Refresh',
+                'verbose_name_plural': 'Effective Price Refreshes',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductEffectivePrice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('region_code', models.CharField(max_length=3)),
+                ('currency_code', models.CharField(max_length=3)),
+                ('base_price', models.DecimalField(blank=True, decimal_places=2, max_digits=20, null=True)),
+                ('amount', models.DecimalField(blank=True, decimal_places=2, max_digits=20, null=True)),
+                ('applied_modifiers', models.JSONField(blank=True, default=list)),
+                ('computed_at', models.DateTimeField()),
+                ('expires_at', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('price', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='effective_prices', to='prices.price')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='effective_prices', to='products.product')),
+            ],
+            options={
+                'verbose_name': 'Product Effective Price',
+                'verbose_name_plural': 'Product Effective Prices',
+                'unique_together': {('product', 'region_code', 'currency_code')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 01:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prices', '0003_effectivepricerefresh_producteffectiveprice'),
+        ('products', '0022_productimportjob_productimporterror'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='price',
+            index=models.Index(fields=['product', 'region_code', 'currency_code', 'valid_from', 'valid_to'], name='price_validity_idx'),
+        ),
+    ]
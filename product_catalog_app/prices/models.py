@@ -32,6 +32,13 @@ class Price(models.Model):
         verbose_name = 'Price'
         verbose_name_plural = 'Prices'
         ordering = ['created_at']
+        indexes = [
+            # point-in-time lookups (prices.lookup.prices_valid_at)
+            models.Index(
+                fields=['product', 'region_code', 'currency_code', 'valid_from', 'valid_to'],
+                name='price_validity_idx',
+            ),
+        ]
         
 class PriceModifier(models.Model):
     name = models.CharField(max_length=100)
@@ -100,4 +107,55 @@ class PriceRule(models.Model):
     class Meta:
         verbose_name = 'Price Rule'
         verbose_name_plural = 'Price Rules'
-        ordering = ['priority']
\ No newline at end of file
+        ordering = ['priority']
+
+class ProductEffectivePrice(models.Model):
+    """Materialized effective price of a product in one market.
+
+    Rows are rewritten by ``prices.effective.refresh_effective_prices``;
+    ``expires_at`` is the next moment a price or rule window changes the
+    result, after which the row must be recomputed before it is used.
+    """
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='effective_prices',
+    )
+    region_code = models.CharField(max_length=3)
+    currency_code = models.CharField(max_length=3)
+    # empty while no price is valid in the market; expires_at is then the
+    # moment the next one becomes valid
+    price = models.ForeignKey(
+        Price,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='effective_prices',
+    )
+    base_price = models.DecimalField(decimal_places=2, max_digits=20, null=True, blank=True)
+    amount = models.DecimalField(decimal_places=2, max_digits=20, null=True, blank=True)
+    applied_modifiers = models.JSONField(blank=True, default=list)
+    computed_at = models.DateTimeField()
+    expires_at = models.DateTimeField(blank=True, null=True, db_index=True)
+
+    class Meta:
+        verbose_name = 'Product Effective Price'
+        verbose_name_plural = 'Product Effective Prices'
+        unique_together = ('product', 'region_code', 'currency_code')
+
+    def __str__(self):
+        return f"{self.product_id} {self.region_code}/{self.currency_code}: {self.amount}"
+
+class EffectivePriceRefresh(models.Model):
+    """A product whose effective prices must be recomputed."""
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='+',
+    )
+    queued_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Effective Price Refresh'
+        verbose_name_plural = 'Effective Price Refreshes'
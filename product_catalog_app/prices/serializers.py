@@ -1,7 +1,8 @@
 from rest_framework import serializers
 from categories.models import Category
 from products.models import Product, ProductAttribute, ProductAttributeSet
-from .models import Price, PriceModifier, PriceRule
+from .lookup import DEFAULT_CURRENCY_CODE, DEFAULT_REGION_CODE
+from .models import Price, PriceModifier, PriceRule, ProductEffectivePrice
 
 class PriceRuleSerializer(serializers.ModelSerializer):
     class Meta:
@@ -132,5 +133,70 @@ class PriceSerializer(serializers.ModelSerializer):
             'updated_at',
         ]
 
+MAX_EFFECTIVE_PRICE_PRODUCTS = 500
 
+class ProductIdListField(serializers.CharField):
+    """A comma separated list of product ids, e.g. ``?product_ids=1,2,3``."""
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        try:
+            ids = list(dict.fromkeys(int(pk) for pk in value.split(',') if pk.strip()))
+        except ValueError:
+            raise serializers.ValidationError("Must be a comma separated list of product ids.")
+        if not ids:
+            raise serializers.ValidationError("At least one product id is required.")
+        if len(ids) > MAX_EFFECTIVE_PRICE_PRODUCTS:
+            raise serializers.ValidationError(f"At most {MAX_EFFECTIVE_PRICE_PRODUCTS} products per request.")
+        return ids
+
+class EffectivePriceQuerySerializer(serializers.Serializer):
+    product_ids = ProductIdListField()
+    region_code = serializers.CharField(max_length=3, default=DEFAULT_REGION_CODE)
+    currency_code = serializers.CharField(max_length=3, default=DEFAULT_CURRENCY_CODE)
+    at = serializers.DateTimeField(required=False)
+
+class PriceLookupQuerySerializer(serializers.Serializer):
+    """``?at=``, ``?region_code=`` and ``?currency_code=`` of a point-in-time price lookup.
+
+    Omitted values mean now and any market (preferring the default one).
+    """
+    at = serializers.DateTimeField(required=False)
+    region_code = serializers.CharField(max_length=3, required=False)
+    currency_code = serializers.CharField(max_length=3, required=False)
+
+class PriceBatchLookupQuerySerializer(PriceLookupQuerySerializer):
+    product_ids = ProductIdListField()
+
+class AppliedModifierSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PriceModifier
+        fields = ['id', 'name', 'type', 'amount', 'priority']
+
+class EffectivePriceSerializer(serializers.Serializer):
+    product_id = serializers.IntegerField()
+    price_id = serializers.IntegerField(source='price.pk')
+    base_price = serializers.DecimalField(decimal_places=2, max_digits=20)
+    effective_price = serializers.DecimalField(source='amount', decimal_places=2, max_digits=20)
+    currency_code = serializers.CharField()
+    region_code = serializers.CharField()
+    applied_modifiers = AppliedModifierSerializer(source='applied', many=True)
+
+class MaterializedPriceSerializer(serializers.ModelSerializer):
+    """Renders a ``ProductEffectivePrice`` row like ``EffectivePriceSerializer``."""
+    product_id = serializers.IntegerField()
+    price_id = serializers.IntegerField()
+    effective_price = serializers.DecimalField(source='amount', decimal_places=2, max_digits=20)
+    applied_modifiers = serializers.JSONField()
+
+    class Meta:
+        model = ProductEffectivePrice
+        fields = [
+            'product_id',
+            'price_id',
+            'base_price',
+            'effective_price',
+            'currency_code',
+            'region_code',
+            'applied_modifiers',
+        ]
 
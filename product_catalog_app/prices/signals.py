@@ -0,0 +1,70 @@
+from django.db import transaction
+from categories.models import Category
+from products.models import Product
+from .effective import modifier_scope, priced_product_ids, queue_modifier_scope, queue_price_refresh
+from .models import Price, PriceModifier, PriceRule
+
+# Every change to a pricing input queues only the products it can affect;
+# the refresh_effective_prices command recomputes them.
+
+def price_changed(sender, instance: Price, **kwargs):
+    queue_price_refresh([instance.product_id])
+
+def price_deleted(sender, instance: Price, **kwargs):
+    # A product delete cascades to its prices; queueing then would leave a
+    # refresh row pointing at the deleted product, so wait for the commit
+    # and queue only products that still exist.
+    product_id = instance.product_id
+    transaction.on_commit(
+        lambda: queue_price_refresh(Product.objects.filter(pk=product_id).values_list('pk', flat=True)),
+        robust=True,
+    )
+
+def price_modifiers_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        queue_price_refresh([instance.product_id])
+    elif action == 'pre_clear':
+        queue_price_refresh(priced_product_ids(Price.objects.filter(price_modifiers=instance)))
+    else:
+        queue_price_refresh(priced_product_ids(Price.objects.filter(pk__in=pk_set or [])))
+
+def modifier_saving(sender, instance: PriceModifier, **kwargs):
+    # the products the modifier stops applying to need a refresh too
+    previous = None
+    if instance.pk is not None:
+        previous = PriceModifier.objects.select_related('product_attribute').filter(pk=instance.pk).first()
+    instance._previous_scope = modifier_scope(previous) if previous is not None else None
+
+def modifier_saved(sender, instance: PriceModifier, **kwargs):
+    previous = getattr(instance, '_previous_scope', None)
+    current = modifier_scope(instance)
+    queue_modifier_scope(instance.pk, current)
+    if previous is not None and previous != current:
+        queue_modifier_scope(None, previous)
+
+def modifier_deleting(sender, instance: PriceModifier, **kwargs):
+    queue_modifier_scope(instance.pk, modifier_scope(instance))
+
+def modifier_rules_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        modifiers = [instance]
+    elif action == 'pre_clear':
+        modifiers = PriceModifier.objects.filter(price_rules=instance)
+    else:
+        modifiers = PriceModifier.objects.filter(pk__in=pk_set or [])
+    for modifier in modifiers:
+        queue_modifier_scope(modifier.pk, modifier_scope(modifier))
+
+def rule_changed(sender, instance: PriceRule, **kwargs):
+    for modifier in PriceModifier.objects.filter(price_rules=instance).select_related('product_attribute'):
+        queue_modifier_scope(modifier.pk, modifier_scope(modifier))
+
+def category_moved(sender, instance: Category, **kwargs):
+    # category-scoped modifiers follow the subtree to its new ancestors
+    path = Category.objects.filter(pk=instance.pk).values_list('path', flat=True).first()
+    if path is not None:
+        queue_price_refresh(priced_product_ids(Price.objects.filter(product__category__path__startswith=path)))
@@ -1,3 +1,240 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from categories.models import Category, CategorySystem
+from products.models import Product, ProductAttribute, ProductAttributeSet
+from products.prefetch import prefetch_product_relations
+from products.serializers import ProductSerializer
+from .effective import lookup_effective_prices, refresh_queued_prices
+from .engine import resolve_effective_price, resolve_effective_prices
+from .lookup import prices_at
+from .models import EffectivePriceRefresh, Price, PriceModifier, PriceRule, ProductEffectivePrice
 
-# Create your tests here.
+class EffectivePriceTest(TestCase):
+    def setUp(self):
+        system = CategorySystem.objects.create(name='Storefront')
+        self.toys = Category.add_root(name='Toys', category_system=system)
+        self.lego = self.toys.add_child(name='Lego', category_system=system)
+        self.color = ProductAttribute.objects.create(
+            name='Color', type='select', options=[{'value': 'red', 'label': 'Red'}, {'value': 'blue', 'label': 'Blue'}],
+        )
+        self.attribute_set = ProductAttributeSet.objects.create(name='Bricks')
+        self.brick = Product.objects.create(
+            name='Brick', category=self.lego, attribute_set=self.attribute_set,
+            attributes_data={'color': 'red'},
+        )
+        self.plain = Product.objects.create(name='Plain')
+        self.brick_price = Price.objects.create(product=self.brick, price=Decimal('100.00'))
+        Price.objects.create(product=self.plain, price=Decimal('10.00'))
+
+    def test_modifiers_apply_in_priority_order(self):
+        """
+        Test that category, attribute set and attribute value modifiers stack by priority
+        """
+        PriceModifier.objects.create(name='Toy markup', category=self.toys, type='percentage', amount=10, priority=1)
+        PriceModifier.objects.create(
+            name='Red surcharge', product_attribute=self.color, product_attribute_value='red',
+            type='flat_amount', amount=5, priority=2,
+        )
+        PriceModifier.objects.create(
+            name='Set discount', product_attribute_set=self.attribute_set,
+            type='flat_amount', amount=-15, priority=3,
+        )
+        PriceModifier.objects.create(name='Blue surcharge', product_attribute=self.color, product_attribute_value='blue', amount=50)
+        PriceModifier.objects.create(name='Disabled', category=self.lego, type='fixed_price', amount=1, is_active=False)
+
+        effective = resolve_effective_price(self.brick)
+        self.assertEqual(effective.amount, Decimal('100.00'))
+        self.assertEqual([m.name for m in effective.applied], ['Toy markup', 'Red surcharge', 'Set discount'])
+
+    def test_rules_gate_modifiers(self):
+        """
+        Test that rule windows and region rules decide whether a modifier applies
+        """
+        now = timezone.now()
+        sale = PriceModifier.objects.create(name='Sale', category=self.lego, type='fixed_price', amount=60)
+        sale.price_rules.add(PriceRule.objects.create(name='Sale window', active_from=now + timedelta(days=1)))
+        local = PriceModifier.objects.create(name='Local', type='flat_amount', amount=-20)
+        local.price_rules.add(PriceRule.objects.create(name='US only', rule_type='region', rule_config={'region_codes': ['USA']}))
+        self.brick_price.price_modifiers.add(local)
+
+        self.assertEqual(resolve_effective_price(self.brick).amount, Decimal('80.00'))
+        later = resolve_effective_price(self.brick, at=now + timedelta(days=2))
+        self.assertEqual(later.amount, Decimal('40.00'))
+        Price.objects.create(product=self.brick, price=Decimal('90.00'), region_code='DEU', currency_code='EUR')
+        self.assertEqual(resolve_effective_price(self.brick, 'DEU', 'EUR').amount, Decimal('90.00'))
+
+    def test_batch_matches_single_and_serializer(self):
+        """
+        Test that batch resolution, single resolution and ProductSerializer agree
+        """
+        PriceModifier.objects.create(name='Toy markup', category=self.toys, type='percentage', amount=10)
+        batch = resolve_effective_prices([self.brick, self.plain])
+        self.assertEqual({pk: e.amount for pk, e in batch.items()}, {
+            self.brick.pk: Decimal('110.00'),
+            self.plain.pk: Decimal('10.00'),
+        })
+        products = [self.brick, self.plain]
+        batched = ProductSerializer(products, many=True, context=prefetch_product_relations(products)).data
+        single = ProductSerializer(products, many=True).data
+        self.assertEqual([p['price']['effective_price'] for p in batched], ['110.00', '10.00'])
+        self.assertEqual(batched[0]['price'], single[0]['price'])
+
+    def test_effective_endpoint(self):
+        """
+        Test that the effective price endpoint resolves a list of products
+        """
+        client = APIClient()
+        client.force_authenticate(user=get_user_model()(username='admin'))
+        response = client.get('/api/prices/effective/', {'product_ids': f'{self.plain.pk},{self.brick.pk}'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['product_id'] for row in response.json()], [self.plain.pk, self.brick.pk])
+        self.assertEqual(response.json()[1]['effective_price'], '100.00')
+        bad = client.get('/api/prices/effective/', {'product_ids': 'x'})
+        self.assertEqual(bad.status_code, 400)
+
+class MaterializedEffectivePriceTest(TestCase):
+    def setUp(self):
+        system = CategorySystem.objects.create(name='Storefront')
+        self.toys = Category.add_root(name='Toys', category_system=system)
+        self.books = Category.add_root(name='Books', category_system=system)
+        self.toys.refresh_from_db()
+        self.lego = self.toys.add_child(name='Lego', category_system=system)
+        self.brick = Product.objects.create(name='Brick', category=self.lego)
+        self.novel = Product.objects.create(name='Novel', category=self.books)
+        Price.objects.create(product=self.brick, price=Decimal('100.00'))
+        Price.objects.create(product=self.brick, price=Decimal('80.00'), region_code='DEU', currency_code='EUR')
+        Price.objects.create(product=self.novel, price=Decimal('20.00'))
+        refresh_queued_prices()
+
+    def amounts(self, region_code='USA', currency_code='USD'):
+        rows = lookup_effective_prices([self.brick.pk, self.novel.pk], region_code, currency_code)
+        return {pk: row.amount for pk, row in rows.items()}
+
+    def test_rows_per_market(self):
+        """
+        Test that every market a product is priced in gets a row and reads take one query
+        """
+        self.assertFalse(EffectivePriceRefresh.objects.exists())
+        with self.assertNumQueries(1):
+            amounts = self.amounts()
+        self.assertEqual(amounts, {self.brick.pk: Decimal('100.00'), self.novel.pk: Decimal('20.00')})
+        self.assertEqual(self.amounts('DEU', 'EUR'), {self.brick.pk: Decimal('80.00')})
+
+    def test_deleting_priced_product(self):
+        """
+        Test that deleting a priced product leaves no refresh queued for it, while deleting a price does
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            self.novel.delete()
+        self.assertFalse(EffectivePriceRefresh.objects.exists())
+        self.assertFalse(ProductEffectivePrice.objects.filter(product_id=self.novel.pk).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Price.objects.filter(product=self.brick, region_code='DEU').delete()
+        self.assertEqual(list(EffectivePriceRefresh.objects.values_list('product_id', flat=True)), [self.brick.pk])
+
+    def test_category_modifier_queues_only_its_subtree(self):
+        """
+        Test that a category-scoped modifier queues the products under that category
+        """
+        modifier = PriceModifier.objects.create(name='Toy markup', category=self.toys, type='percentage', amount=10)
+        self.assertEqual(list(EffectivePriceRefresh.objects.values_list('product_id', flat=True)), [self.brick.pk])
+        refresh_queued_prices()
+        self.assertEqual(self.amounts()[self.brick.pk], Decimal('110.00'))
+        self.assertEqual(self.amounts('DEU', 'EUR')[self.brick.pk], Decimal('88.00'))
+
+        modifier.category = self.books
+        modifier.save()
+        self.assertEqual(
+            set(EffectivePriceRefresh.objects.values_list('product_id', flat=True)),
+            {self.brick.pk, self.novel.pk},
+        )
+        refresh_queued_prices()
+        self.assertEqual(self.amounts(), {self.brick.pk: Decimal('100.00'), self.novel.pk: Decimal('22.00')})
+
+    def test_rule_window_expires_rows(self):
+        """
+        Test that a row expires when a rule window opens and is recomputed after it
+        """
+        now = timezone.now()
+        sale = PriceModifier.objects.create(name='Sale', category=self.books, type='fixed_price', amount=5)
+        sale.price_rules.add(PriceRule.objects.create(name='Tomorrow', active_from=now + timedelta(days=1)))
+        refresh_queued_prices()
+        row = ProductEffectivePrice.objects.get(product=self.novel)
+        self.assertEqual(row.amount, Decimal('20.00'))
+        self.assertEqual(row.expires_at, now + timedelta(days=1))
+
+    def test_serializer_reads_materialized_rows(self):
+        """
+        Test that ProductSerializer uses a fresh materialized row for the product's price
+        """
+        ProductEffectivePrice.objects.filter(product=self.novel).update(amount=Decimal('19.00'))
+        products = [self.novel]
+        data = ProductSerializer(products, many=True, context=prefetch_product_relations(products)).data
+        self.assertEqual(data[0]['price']['effective_price'], '19.00')
+
+    def test_product_category_change_queues_product(self):
+        """
+        Test that moving a product to another category queues it
+        """
+        self.novel.category = self.lego
+        self.novel.save()
+        self.assertEqual(list(EffectivePriceRefresh.objects.values_list('product_id', flat=True)), [self.novel.pk])
+
+class PriceLookupTest(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.product = Product.objects.create(name='Brick')
+        self.other = Product.objects.create(name='Plate')
+        self.base = Price.objects.create(product=self.product, price=Decimal('10.00'))
+        self.summer = Price.objects.create(
+            product=self.product, price=Decimal('8.00'),
+            valid_from=self.now - timedelta(days=10), valid_to=self.now + timedelta(days=10),
+        )
+        self.euro = Price.objects.create(product=self.product, price=Decimal('9.00'), region_code='DEU', currency_code='EUR')
+        Price.objects.create(product=self.other, price=Decimal('3.00'), valid_to=self.now - timedelta(days=1))
+
+    def test_point_in_time(self):
+        """
+        Test that overlapping windows resolve to the latest price valid at the instant
+        """
+        with self.assertNumQueries(1):
+            prices = prices_at([self.product.pk, self.other.pk])
+        self.assertEqual(prices, {self.product.pk: self.summer})
+        later = prices_at([self.product.pk, self.other.pk], at=self.now + timedelta(days=30))
+        self.assertEqual(later, {self.product.pk: self.base})
+        earlier = prices_at([self.other.pk], at=self.now - timedelta(days=2))
+        self.assertEqual(earlier[self.other.pk].price, Decimal('3.00'))
+        self.assertEqual(prices_at([self.product.pk], region_code='DEU')[self.product.pk], self.euro)
+
+    def test_product_price_with_several_active_prices(self):
+        """
+        Test that ProductSerializer returns the valid price when several are active
+        """
+        self.assertEqual(ProductSerializer(self.product).data['price']['id'], self.summer.pk)
+        client = APIClient()
+        client.force_authenticate(user=get_user_model()(username='admin'))
+        at = (self.now + timedelta(days=30)).isoformat()
+        response = client.get(f'/api/products/{self.product.pk}/', {'at': at})
+        self.assertEqual(response.json()['price']['id'], self.base.pk)
+        self.assertEqual(client.get(f'/api/products/{self.product.pk}/', {'at': 'soon'}).status_code, 400)
+
+    def test_lookup_endpoint(self):
+        """
+        Test that the lookup endpoint returns prices for many products at an instant
+        """
+        client = APIClient()
+        client.force_authenticate(user=get_user_model()(username='admin'))
+        response = client.get('/api/prices/lookup/', {
+            'product_ids': f'{self.other.pk},{self.product.pk}',
+            'at': (self.now - timedelta(days=2)).isoformat(),
+            'region_code': 'USA',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['price'] for row in response.json()], ['3.00', '8.00'])
+        listed = client.get('/api/prices/', {'at': (self.now + timedelta(days=30)).isoformat()})
+        self.assertEqual({row['id'] for row in listed.json()['results']}, {self.base.pk, self.euro.pk})
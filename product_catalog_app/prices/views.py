@@ -1,9 +1,17 @@
 from rest_framework import permissions
+from rest_framework import status
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework.filters import SearchFilter, OrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
+from core.pagination import StandardResultsSetPagination
+from products.models import Product
+from .effective import lookup_effective_prices
+from .engine import resolve_effective_prices
+from .lookup import prices_at, valid_at
 from .models import Price, PriceModifier, PriceRule
-from .serializers import PriceSerializer, PriceModifierSerializer, PriceRuleSerializer
+from .serializers import EffectivePriceQuerySerializer, EffectivePriceSerializer, MaterializedPriceSerializer, PriceBatchLookupQuerySerializer, PriceLookupQuerySerializer, PriceSerializer, PriceModifierSerializer, PriceRuleSerializer
 
 class PriceRuleViewSet(viewsets.ModelViewSet):
     """
@@ -11,6 +19,7 @@ class PriceRuleViewSet(viewsets.ModelViewSet):
     """
     queryset = PriceRule.objects.all()
     serializer_class = PriceRuleSerializer
+    pagination_class = StandardResultsSetPagination
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['name', 'description', 'is_active']
@@ -24,6 +33,7 @@ class PriceModifierViewSet(viewsets.ModelViewSet):
     """
     queryset = PriceModifier.objects.all()
     serializer_class = PriceModifierSerializer
+    pagination_class = StandardResultsSetPagination
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['name', 'description', 'is_active']
@@ -36,9 +46,74 @@ class PriceViewSet(viewsets.ModelViewSet):
     """
     queryset = Price.objects.all()
     serializer_class = PriceSerializer
+    pagination_class = StandardResultsSetPagination
+    cursor_orderings = {'id': ('id',)}
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['price', 'currency_code', 'region_code', 'is_active']
     search_fields = ['price', 'currency_code', 'region_code']
     ordering_fields = ['id', 'price']
-    ordering = ['id']
\ No newline at end of file
+    ordering = ['id']
+
+    def get_queryset(self):
+        """``?at=`` limits the list to the active prices valid at that instant."""
+        queryset = super().get_queryset()
+        if 'at' in self.request.query_params:
+            lookup = PriceLookupQuerySerializer(data={'at': self.request.query_params['at']})
+            lookup.is_valid(raise_exception=True)
+            queryset = queryset.filter(valid_at(lookup.validated_data['at']), is_active=True)
+        return queryset
+
+    @action(detail=False, methods=['get'], url_path='lookup')
+    def lookup(self, request, *args, **kwargs):
+        """The price each of ``?product_ids=1,2,3`` had at ``?at=`` (default now).
+
+        ``?region_code=`` and ``?currency_code=`` narrow the market; products
+        without a valid price are left out of the response.
+        """
+        query = PriceBatchLookupQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response({"error": query.errors}, status=status.HTTP_400_BAD_REQUEST)
+        params = dict(query.validated_data)
+        product_ids = params.pop('product_ids')
+        queryset = Price.objects.select_related('product').prefetch_related(
+            'price_modifiers__category',
+            'price_modifiers__product_attribute',
+            'price_modifiers__product_attribute_set',
+            'price_modifiers__price_rules',
+        )
+        prices = prices_at(product_ids, queryset=queryset, **params)
+        ordered = [prices[pk] for pk in product_ids if pk in prices]
+        return Response(PriceSerializer(ordered, many=True).data)
+
+    @action(detail=False, methods=['get'], url_path='effective')
+    def effective(self, request, *args, **kwargs):
+        """Effective prices of ``?product_ids=1,2,3`` after modifiers and rules.
+
+        ``?region_code=``, ``?currency_code=`` and ``?at=`` (ISO 8601) pick
+        the market and moment; products without a matching base price are
+        left out of the response. Current prices are read from the
+        materialized table.
+        """
+        query = EffectivePriceQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response({"error": query.errors}, status=status.HTTP_400_BAD_REQUEST)
+        params = query.validated_data
+        results = {}
+        if 'at' not in params:
+            materialized = lookup_effective_prices(params['product_ids'], params['region_code'], params['currency_code'])
+            results = {pk: MaterializedPriceSerializer(row).data for pk, row in materialized.items()}
+        # rows not materialized yet, and past or future moments, are computed
+        missing = [pk for pk in params['product_ids'] if pk not in results]
+        if missing:
+            products = Product.objects.filter(pk__in=missing).only(
+                'id', 'category_id', 'attribute_set_id', 'attributes_data',
+            )
+            effective = resolve_effective_prices(
+                products,
+                region_code=params['region_code'],
+                currency_code=params['currency_code'],
+                at=params.get('at'),
+            )
+            results.update({pk: EffectivePriceSerializer(e).data for pk, e in effective.items()})
+        return Response([results[pk] for pk in params['product_ids'] if pk in results])
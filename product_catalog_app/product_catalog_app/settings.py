@@ -132,6 +132,10 @@ CACHES = {
 
 CACHALOT_ENABLED = True
 CACHALOT_TIMEOUT = 300
+# The outbox and the effective-price refresh queue are written on most
+# requests and polled by their workers (relay_outbox, refresh_effective_prices);
+# caching them would only churn invalidations.
+CACHALOT_UNCACHABLE_TABLES = frozenset(('django_migrations', 'core_outboxevent', 'prices_effectivepricerefresh'))
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -192,6 +196,13 @@ PUBSUB_EMULATOR_HOST = os.getenv('PUBSUB_EMULATOR_HOST', 'localhost:8085')
 PUBSUB_PROJECT_ID = os.getenv('PUBSUB_PROJECT_ID', 'my-project-id')
 PUBSUB_TIMEOUT = 300
 
+# Publisher batching (flush on whichever limit is hit first) and flow control
+PUBSUB_BATCH_MAX_MESSAGES = int(os.getenv('PUBSUB_BATCH_MAX_MESSAGES', 100))
+PUBSUB_BATCH_MAX_BYTES = int(os.getenv('PUBSUB_BATCH_MAX_BYTES', 1024 * 1024))
+PUBSUB_BATCH_MAX_LATENCY = float(os.getenv('PUBSUB_BATCH_MAX_LATENCY', 0.05))
+PUBSUB_MAX_IN_FLIGHT_MESSAGES = int(os.getenv('PUBSUB_MAX_IN_FLIGHT_MESSAGES', 1000))
+PUBSUB_MAX_IN_FLIGHT_BYTES = int(os.getenv('PUBSUB_MAX_IN_FLIGHT_BYTES', 10 * 1024 * 1024))
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -1,14 +1,50 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
 class ProductsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'products'
 
     def ready(self):
-        from .models import ProductAttributeSet
-        from .signals import attribute_set_updated
+        from .models import Product, ProductAttribute, ProductAttributeSet
+        from .signals import (
+            attribute_changed,
+            attribute_filterable_changed,
+            attribute_set_attributes_changed,
+            attribute_set_updated,
+            product_deleted,
+            product_saved,
+            product_saving,
+        )
 
         post_save.connect(
             receiver=attribute_set_updated,
             sender=ProductAttributeSet
-        )
\ No newline at end of file
+        )
+        post_save.connect(
+            receiver=attribute_changed,
+            sender=ProductAttribute
+        )
+        post_save.connect(
+            receiver=attribute_filterable_changed,
+            sender=ProductAttribute
+        )
+        pre_save.connect(
+            receiver=product_saving,
+            sender=Product
+        )
+        post_save.connect(
+            receiver=product_saved,
+            sender=Product
+        )
+        post_delete.connect(
+            receiver=product_deleted,
+            sender=Product
+        )
+        pre_delete.connect(
+            receiver=attribute_changed,
+            sender=ProductAttribute
+        )
+        m2m_changed.connect(
+            receiver=attribute_set_attributes_changed,
+            sender=ProductAttributeSet.attributes.through
+        )
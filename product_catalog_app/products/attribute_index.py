@@ -0,0 +1,103 @@
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from django.db import transaction
+from .models import Product, ProductAttribute, ProductAttributeIndex
+
+logger = logging.getLogger(__name__)
+
+INDEX_BATCH_SIZE = 1000
+TEXT_VALUE_MAX_LENGTH = 255
+
+NUMBER_TYPES = ('number',)
+
+def index_column(attribute: ProductAttribute) -> str:
+    """The ``ProductAttributeIndex`` column holding values of ``attribute``."""
+    return 'number_value' if attribute.type in NUMBER_TYPES else 'text_value'
+
+def to_text(value: Any) -> str:
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)[:TEXT_VALUE_MAX_LENGTH]
+
+def to_number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def index_values(attribute: ProductAttribute, value: Any) -> List[Tuple[Optional[str], Optional[float]]]:
+    """Returns the ``(text_value, number_value)`` rows for one attribute value.
+
+    Values that cannot be represented (None, nested JSON, non-numeric values
+    of number attributes) are not indexed.
+    """
+    values = value if isinstance(value, list) else [value]
+    rows = []
+    for item in values:
+        if item is None or isinstance(item, (dict, list)):
+            continue
+        if attribute.type in NUMBER_TYPES:
+            number = to_number(item)
+            if number is not None:
+                rows.append((None, number))
+        else:
+            rows.append((to_text(item), None))
+    return rows
+
+def get_filterable_attributes() -> Dict[str, ProductAttribute]:
+    return {attr.code: attr for attr in ProductAttribute.objects.filter(is_filterable=True)}
+
+def build_index_rows(product: Product, attributes: Dict[str, ProductAttribute]) -> List[ProductAttributeIndex]:
+    data = product.attributes_data if isinstance(product.attributes_data, dict) else {}
+    rows = []
+    for code, attribute in attributes.items():
+        if code not in data:
+            continue
+        for text_value, number_value in index_values(attribute, data[code]):
+            rows.append(ProductAttributeIndex(
+                product_id=product.pk,
+                attribute=attribute,
+                text_value=text_value,
+                number_value=number_value,
+            ))
+    return rows
+
+def reindex_products(
+    products: Iterable[Product],
+    attributes: Optional[Dict[str, ProductAttribute]] = None,
+    batch_size: int = INDEX_BATCH_SIZE,
+) -> int:
+    """Replaces the index rows of ``products`` with their current values.
+
+    Args:
+        products (Iterable[Product]): Saved products with ``attributes_data`` loaded.
+        attributes (Dict[str, ProductAttribute]): Filterable attributes by code;
+            restricts the rebuild to these attributes when given.
+        batch_size (int): Maximum rows per INSERT statement.
+
+    Returns:
+        int: The number of index rows written.
+
+    Example:
+        reindex_products(Product.objects.filter(attribute_set=attribute_set))
+    """
+    products = list(products)
+    if not products:
+        return 0
+    only_some = attributes is not None
+    if attributes is None:
+        attributes = get_filterable_attributes()
+    if not attributes:
+        return 0
+    rows = []
+    for product in products:
+        rows.extend(build_index_rows(product, attributes))
+    with transaction.atomic():
+        stale = ProductAttributeIndex.objects.filter(product_id__in=[p.pk for p in products])
+        if only_some:
+            stale = stale.filter(attribute__in=list(attributes.values()))
+        stale.delete()
+        ProductAttributeIndex.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
@@ -0,0 +1,80 @@
+import csv
+import json
+from typing import Iterator
+from cachalot.api import cachalot_disabled
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+from .indexing import iter_product_chunks
+from .prefetch import prefetch_product_relations
+from .serializers import ProductSerializer
+
+EXPORT_CHUNK_SIZE = 1000
+
+CSV_FIELDS = [
+    'id',
+    'uuid',
+    'name',
+    'description',
+    'brand',
+    'brand_name',
+    'category',
+    'category_name',
+    'attribute_set',
+    'attribute_set_name',
+    'attributes_data',
+    'price',
+    'assets',
+    'suggested_corrections',
+    'is_active',
+    'is_ai_generated',
+    'verification_status',
+    'created_at',
+    'updated_at',
+]
+
+class NDJSONRenderer(BaseRenderer):
+    """Lets ``?format=ndjson`` pass content negotiation; errors render as one JSON line."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, cls=JSONEncoder) + '\n'
+
+class CSVRenderer(NDJSONRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+
+def iter_serialized_products(queryset, context: dict, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[dict]:
+    """Yields ``ProductSerializer`` output with assets and prices loaded per chunk."""
+    # Export chunks are read once; caching them would only evict useful entries.
+    with cachalot_disabled():
+        for chunk in iter_product_chunks(queryset, chunk_size):
+            chunk_context = dict(context, **prefetch_product_relations(chunk, context.get('price_lookup')))
+            yield from ProductSerializer(chunk, many=True, context=chunk_context).data
+
+def export_ndjson(queryset, context: dict, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    for row in iter_serialized_products(queryset, context, chunk_size):
+        yield json.dumps(row, cls=JSONEncoder) + '\n'
+
+class _Echo:
+    """File-like object whose ``write`` hands the line back to ``csv.writer``."""
+    def write(self, value):
+        return value
+
+def _csv_value(value):
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, cls=JSONEncoder)
+    return value
+
+def export_csv(queryset, context: dict, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    """Yields a CSV header and one line per product; nested values are JSON encoded."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_FIELDS)
+    for row in iter_serialized_products(queryset, context, chunk_size):
+        yield writer.writerow([_csv_value(row.get(field)) for field in CSV_FIELDS])
+
+EXPORT_FORMATS = {
+    'ndjson': (export_ndjson, NDJSONRenderer.media_type),
+    'csv': (export_csv, CSVRenderer.media_type),
+}
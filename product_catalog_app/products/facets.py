@@ -0,0 +1,119 @@
+from typing import Dict, Iterable, List, Optional
+from django.db import transaction
+from django.db.models import Count
+from brands.models import Brand
+from categories.models import Category
+from .models import Product, ProductAttribute, ProductAttributeSet, ProductFacetValue
+
+FACET_BATCH_SIZE = 1000
+FACET_VALUE_MAX_LENGTH = 255
+
+ATTRIBUTE_FACET_PREFIX = 'attr.'
+ATTRIBUTE_FACET_TYPES = ('select', 'multiselect')
+
+# facet name -> Product field the value is read from
+PRODUCT_FACETS = {
+    'brand': 'brand_id',
+    'category': 'category_id',
+    'attribute_set': 'attribute_set_id',
+    'verification_status': 'verification_status',
+}
+
+def get_facet_attributes() -> Dict[str, ProductAttribute]:
+    return {
+        attr.code: attr
+        for attr in ProductAttribute.objects.filter(type__in=ATTRIBUTE_FACET_TYPES)
+    }
+
+def build_facet_rows(product: Product, attributes: Dict[str, ProductAttribute]) -> List[ProductFacetValue]:
+    rows = []
+    for facet, field in PRODUCT_FACETS.items():
+        value = getattr(product, field)
+        if value is not None:
+            rows.append(ProductFacetValue(product_id=product.pk, facet=facet, value=str(value)))
+    data = product.attributes_data if isinstance(product.attributes_data, dict) else {}
+    for code, attribute in attributes.items():
+        value = data.get(code)
+        values = value if isinstance(value, list) else [value]
+        seen = set()
+        for item in values:
+            if item is None or isinstance(item, (dict, list)):
+                continue
+            item = str(item)[:FACET_VALUE_MAX_LENGTH]
+            if item in seen:
+                continue
+            seen.add(item)
+            rows.append(ProductFacetValue(product_id=product.pk, facet=f"{ATTRIBUTE_FACET_PREFIX}{code}", value=item))
+    return rows
+
+def index_product_facets(products: Iterable[Product], batch_size: int = FACET_BATCH_SIZE) -> int:
+    """Replaces the facet postings of ``products`` with their current values.
+
+    Returns:
+        int: The number of postings written.
+    """
+    products = list(products)
+    if not products:
+        return 0
+    attributes = get_facet_attributes()
+    rows = []
+    for product in products:
+        rows.extend(build_facet_rows(product, attributes))
+    with transaction.atomic():
+        ProductFacetValue.objects.filter(product_id__in=[p.pk for p in products]).delete()
+        ProductFacetValue.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+def _labels(facet: str, values: List[str], attributes: Dict[str, ProductAttribute]) -> Dict[str, str]:
+    if facet == 'verification_status':
+        return {k: str(v) for k, v in Product.VERIFICATION_CHOICES}
+    models_by_facet = {'brand': Brand, 'category': Category, 'attribute_set': ProductAttributeSet}
+    if facet in models_by_facet:
+        ids = [int(v) for v in values if v.isdigit()]
+        return {str(pk): name for pk, name in models_by_facet[facet].objects.filter(pk__in=ids).values_list('pk', 'name')}
+    attribute = attributes.get(facet[len(ATTRIBUTE_FACET_PREFIX):])
+    if attribute is None:
+        return {}
+    return {str(opt.get('value')): opt.get('label') for opt in attribute.options or [] if isinstance(opt, dict)}
+
+def facet_counts(queryset, facets: Optional[List[str]] = None) -> Dict[str, List[dict]]:
+    """Counts the products of ``queryset`` per value of every facet.
+
+    All facets are counted by one grouped query over the facet postings of
+    the filtered products; labels are then resolved per facet. Values whose
+    brand, category or attribute set no longer exists are left out.
+
+    Args:
+        queryset: The filtered products, e.g. ``view.filter_queryset(...)``.
+        facets (List[str]): Facet names to count; all of them when omitted.
+
+    Returns:
+        Dict[str, List[dict]]: ``{'value', 'label', 'count'}`` entries per
+        facet, most frequent first.
+
+    Example:
+        facet_counts(Product.objects.filter(brand=brand), ['category', 'attr.color'])
+    """
+    postings = ProductFacetValue.objects.filter(product__in=queryset.order_by().values('pk'))
+    if facets:
+        postings = postings.filter(facet__in=facets)
+    rows = (
+        postings.values('facet', 'value')
+        .annotate(count=Count('id'))
+        .order_by('facet', '-count', 'value')
+    )
+    grouped = {}
+    for row in rows:
+        grouped.setdefault(row['facet'], []).append(row)
+
+    attributes = get_facet_attributes() if any(f.startswith(ATTRIBUTE_FACET_PREFIX) for f in grouped) else {}
+    results = {}
+    for facet, facet_rows in grouped.items():
+        labels = _labels(facet, [r['value'] for r in facet_rows], attributes)
+        keep_unlabelled = facet.startswith(ATTRIBUTE_FACET_PREFIX)
+        results[facet] = [
+            {'value': r['value'], 'label': labels.get(r['value'], r['value']), 'count': r['count']}
+            for r in facet_rows
+            if keep_unlabelled or r['value'] in labels
+        ]
+    return results
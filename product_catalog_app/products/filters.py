@@ -0,0 +1,65 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+from .attribute_index import get_filterable_attributes, index_column, to_number, to_text
+from .models import ProductAttributeIndex
+
+class AttributeFilterBackend(BaseFilterBackend):
+    """Filters products on indexed attribute values.
+
+    ``?attr.<code>=<value>`` matches products whose attribute equals the
+    value (any selected option for multiselect attributes). Suffix the code
+    with ``__in`` (comma separated values), ``__gt``, ``__gte``, ``__lt`` or
+    ``__lte`` for other comparisons, e.g. ``?attr.part_count__gte=500``.
+    Only attributes flagged ``is_filterable`` can be used; ``_`` in the code
+    also matches ``-`` so slugs can be written as Python-style names.
+    Filters are answered from ``ProductAttributeIndex`` instead of scanning
+    ``attributes_data``.
+    """
+    query_prefix = 'attr.'
+    lookups = ('exact', 'in', 'gt', 'gte', 'lt', 'lte')
+
+    def get_attribute_filters(self, request):
+        filters = []
+        for param in request.query_params:
+            if not param.startswith(self.query_prefix):
+                continue
+            code, _, lookup = param[len(self.query_prefix):].partition('__')
+            lookup = lookup or 'exact'
+            if lookup not in self.lookups:
+                raise ValidationError({param: f"Unsupported lookup '{lookup}'."})
+            for value in request.query_params.getlist(param):
+                filters.append((param, code, lookup, value))
+        return filters
+
+    def resolve_attribute(self, attributes, param, code):
+        attribute = attributes.get(code) or attributes.get(code.replace('_', '-'))
+        if attribute is None:
+            raise ValidationError({param: f"'{code}' is not a filterable attribute."})
+        return attribute
+
+    def convert(self, attribute, param, value):
+        if index_column(attribute) == 'text_value':
+            return to_text(value)
+        number = to_number(value)
+        if number is None:
+            raise ValidationError({param: f"'{value}' is not a valid number."})
+        return number
+
+    def filter_queryset(self, request, queryset, view):
+        filters = self.get_attribute_filters(request)
+        if not filters:
+            return queryset
+        attributes = get_filterable_attributes()
+        for param, code, lookup, value in filters:
+            attribute = self.resolve_attribute(attributes, param, code)
+            column = index_column(attribute)
+            if lookup == 'in':
+                converted = [self.convert(attribute, param, v) for v in value.split(',')]
+            else:
+                converted = self.convert(attribute, param, value)
+            matches = ProductAttributeIndex.objects.filter(
+                attribute=attribute,
+                **{f'{column}__{lookup}': converted},
+            ).values('product_id')
+            queryset = queryset.filter(pk__in=matches)
+        return queryset
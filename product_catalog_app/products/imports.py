@@ -0,0 +1,200 @@
+import csv
+import io
+import json
+import logging
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from django.db import transaction
+from django.utils import timezone
+from brands.models import Brand
+from categories.models import Category
+from core.utils.iterables import chunked
+from .ingest import bulk_create_products
+from .messaging import enqueue_validation_events
+from .models import ProductAttributeSet, ProductImportError, ProductImportJob
+from .serializers import ProductImportSerializer
+
+logger = logging.getLogger(__name__)
+
+IMPORT_CHUNK_SIZE = 500
+
+# CSV cells holding JSON objects
+JSON_COLUMNS = ('attributes_data', 'suggested_corrections')
+
+RELATED_FIELDS = {
+    'brand': Brand,
+    'category': Category,
+    'attribute_set': ProductAttributeSet,
+}
+
+# (row number, parsed row, parse error)
+ImportRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+class ImportJobUnavailable(ValueError):
+    """Raised when a job is already running or has completed."""
+    def __init__(self, job: ProductImportJob):
+        self.job = job
+        self.status = job.status
+        super().__init__(f"Import job {job.pk} is {job.status.lower()}")
+
+def _parse_csv_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    data = {k: v for k, v in row.items() if k is not None}
+    for column in JSON_COLUMNS:
+        value = data.get(column)
+        if value in (None, ''):
+            data.pop(column, None)
+        else:
+            data[column] = json.loads(value)
+    return data
+
+def iter_import_rows(stream, file_format: str) -> Iterator[ImportRow]:
+    """Reads rows from a binary file object one at a time.
+
+    Rows are numbered from 1, not counting the CSV header. A row that cannot
+    be parsed is yielded with an error instead of stopping the import.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if file_format == 'csv':
+        for number, row in enumerate(csv.DictReader(text), start=1):
+            try:
+                yield number, _parse_csv_row(row), None
+            except ValueError as e:
+                yield number, None, f"Invalid JSON: {e}"
+        return
+    number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield number, None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(data, dict):
+            yield number, None, "Each line must be a JSON object."
+            continue
+        yield number, data, None
+
+def load_related(rows: List[ImportRow]) -> Dict[Any, Dict[int, Any]]:
+    """Loads the brands, categories and attribute sets a chunk refers to, one query each."""
+    related = {}
+    for field, model in RELATED_FIELDS.items():
+        ids = set()
+        for _, data, _ in rows:
+            value = data.get(field) if data else None
+            try:
+                ids.add(int(value))
+            except (TypeError, ValueError):
+                continue
+        related[model] = model.objects.in_bulk(ids) if ids else {}
+    return related
+
+def import_chunk(job: ProductImportJob, rows: List[ImportRow]) -> Tuple[int, int]:
+    """Validates and inserts one chunk and advances the job checkpoint.
+
+    Valid rows are inserted with ``bulk_create_products``; invalid rows are
+    stored as ``ProductImportError``. As with ``ProductViewSet.bulk_create``,
+    a validation event is queued for every created product. All of it, and
+    the checkpoint, commit in one transaction, so a chunk is either fully
+    recorded or not at all.
+
+    Returns:
+        Tuple[int, int]: Products created and rows rejected.
+    """
+    context = {'related': load_related(rows)}
+    valid = []
+    errors = []
+    for number, data, parse_error in rows:
+        if parse_error:
+            errors.append(ProductImportError(job=job, row_number=number, errors={'non_field_errors': [parse_error]}))
+            continue
+        serializer = ProductImportSerializer(data=data, context=context)
+        if serializer.is_valid():
+            valid.append(serializer.validated_data)
+        else:
+            errors.append(ProductImportError(job=job, row_number=number, errors=serializer.errors, data=data))
+
+    with transaction.atomic():
+        created = bulk_create_products(valid)
+        if created:
+            enqueue_validation_events([p.pk for p in created])
+        ProductImportError.objects.bulk_create(errors)
+        job.rows_processed = rows[-1][0]
+        job.created_count += len(created)
+        job.error_count += len(errors)
+        job.save(update_fields=['rows_processed', 'created_count', 'error_count', 'updated_at'])
+    return len(created), len(errors)
+
+def _transition(job: ProductImportJob, status: str) -> ProductImportJob:
+    """Locks the job row and moves a pending or failed job to ``status``.
+
+    The lock makes the check and the update atomic, so two requests or
+    workers cannot both take the same job.
+
+    Raises:
+        ImportJobUnavailable: If the job is running or has completed.
+    """
+    with transaction.atomic():
+        job = ProductImportJob.objects.select_for_update().get(pk=job.pk)
+        if job.status not in ('PENDING', 'FAILED'):
+            raise ImportJobUnavailable(job)
+        job.status = status
+        job.last_error = None
+        update_fields = ['status', 'last_error', 'updated_at']
+        if status == 'RUNNING' and job.started_at is None:
+            job.started_at = timezone.now()
+            update_fields.append('started_at')
+        job.save(update_fields=update_fields)
+    return job
+
+def queue_import(job: ProductImportJob) -> ProductImportJob:
+    """Puts a failed job back in the queue for ``import_products --pending``.
+
+    Raises:
+        ImportJobUnavailable: If the job is running or has completed.
+    """
+    return _transition(job, 'PENDING')
+
+def run_import(job: ProductImportJob, progress=None) -> ProductImportJob:
+    """Claims a pending or failed job and streams its file into the catalog.
+
+    Rows are read ``job.chunk_size`` at a time, resuming after
+    ``job.rows_processed`` so a job that failed part way never imports a row
+    twice. Only one chunk of rows is held in memory.
+
+    Args:
+        job (ProductImportJob): The job to run or resume.
+        progress: Optional callable receiving the job after each chunk.
+
+    Returns:
+        ProductImportJob: The job with its final status and counts.
+
+    Raises:
+        ImportJobUnavailable: If the job is already running or has completed.
+
+    Example:
+        job = ProductImportJob.objects.create(source_path='/data/feed.csv', format='csv')
+        run_import(job)
+    """
+    job = _transition(job, 'RUNNING')
+    try:
+        with job.open_source() as stream:
+            rows = (row for row in iter_import_rows(stream, job.format) if row[0] > job.rows_processed)
+            for chunk in chunked(rows, job.chunk_size):
+                import_chunk(job, chunk)
+                logger.info(
+                    f"Import {job.pk}: {job.rows_processed} rows processed, "
+                    f"{job.created_count} created, {job.error_count} rejected"
+                )
+                if progress is not None:
+                    progress(job)
+    except Exception as e:
+        logger.exception(f"Import {job.pk} failed after row {job.rows_processed}")
+        job.status = 'FAILED'
+        job.last_error = str(e)
+        job.save(update_fields=['status', 'last_error', 'updated_at'])
+        return job
+    job.status = 'COMPLETED'
+    job.completed_at = timezone.now()
+    job.save(update_fields=['status', 'completed_at', 'updated_at'])
+    return job
@@ -0,0 +1,37 @@
+from typing import Iterator, List
+from prices.effective import priced_product_ids, queue_price_refresh
+from prices.models import Price
+from .attribute_index import reindex_products
+from .facets import index_product_facets
+from .models import Product
+from .search import index_products
+
+def refresh_product_indexes(products: List[Product]) -> None:
+    """Brings the attribute filter, search and facet indexes of ``products`` up to date.
+
+    Priced products are also queued for effective-price recomputation,
+    since their category, attribute set or attribute values may have
+    changed. Called for writes that bypass ``post_save`` (``bulk_create``,
+    ``bulk_update``); single saves go through ``signals.product_saved``.
+    """
+    reindex_products(products)
+    index_products(products)
+    index_product_facets(products)
+    queue_price_refresh(priced_product_ids(Price.objects.filter(product_id__in=[p.pk for p in products])))
+
+def iter_product_chunks(queryset, chunk_size: int) -> Iterator[List[Product]]:
+    """Yields the products of ``queryset`` in primary key order, a chunk at a time.
+
+    Each chunk is a separate ``WHERE id > last LIMIT chunk_size`` query read
+    with ``iterator()``, so neither the database driver nor the process
+    holds more than one chunk however many products there are. Used by
+    exports and by the index rebuild commands.
+    """
+    queryset = queryset.order_by('pk')
+    last_id = 0
+    while True:
+        chunk = list(queryset.filter(pk__gt=last_id)[:chunk_size].iterator(chunk_size=chunk_size))
+        if not chunk:
+            return
+        yield chunk
+        last_id = chunk[-1].pk
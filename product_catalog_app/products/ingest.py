@@ -0,0 +1,80 @@
+import logging
+from collections import Counter
+from typing import Iterable, List
+from django.db import transaction
+from categories.counts import adjust_category_counts
+from .indexing import refresh_product_indexes
+from .models import Product
+
+logger = logging.getLogger(__name__)
+
+BULK_CREATE_CHUNK_SIZE = 500
+
+PRODUCT_BULK_FIELDS = [
+    'name',
+    'description',
+    'is_active',
+    'is_ai_generated',
+    'verification_status',
+    'brand',
+    'category',
+    'attribute_set',
+    'attributes_data',
+    'suggested_corrections',
+]
+
+def build_product(data: dict) -> Product:
+    """Builds an unsaved Product from a validated serializer row.
+
+    Fields missing from the row fall back to the model defaults.
+    """
+    return Product(**{f: data[f] for f in PRODUCT_BULK_FIELDS if f in data})
+
+def _assign_missing_pks(products: List[Product]) -> None:
+    # MySQL cannot return ids from a multi-row INSERT, so the rows are found
+    # again by the uuid generated client-side, which is unique and indexed.
+    missing = {p.uuid: p for p in products if p.pk is None}
+    if not missing:
+        return
+    for uuid, pk in Product.objects.filter(uuid__in=list(missing)).values_list('uuid', 'id'):
+        missing[uuid].pk = pk
+
+def bulk_create_products(rows: Iterable[dict], chunk_size: int = BULK_CREATE_CHUNK_SIZE) -> List[Product]:
+    """Inserts validated product rows in chunks and returns them with their pks.
+
+    Each chunk is written with a single ``bulk_create``, added to the
+    attribute, search and facet indexes and to the category product
+    counts; the whole call runs in one transaction so a failed chunk
+    leaves no partial import behind.
+
+    Args:
+        rows (Iterable[dict]): Validated product data, e.g. ``serializer.validated_data``.
+        chunk_size (int): Maximum rows per INSERT statement.
+
+    Returns:
+        List[Product]: The created products, in input order, with ``pk`` set.
+
+    Example:
+        with transaction.atomic():
+            products = bulk_create_products(serializer.validated_data)
+            enqueue_validation_events([p.pk for p in products])
+    """
+    created = []
+    chunk = []
+    with transaction.atomic():
+        for row in rows:
+            chunk.append(build_product(row))
+            if len(chunk) >= chunk_size:
+                created.extend(_create_chunk(chunk))
+                chunk = []
+        if chunk:
+            created.extend(_create_chunk(chunk))
+    logger.info(f"Bulk created {len(created)} products")
+    return created
+
+def _create_chunk(chunk: List[Product]) -> List[Product]:
+    Product.objects.bulk_create(chunk)
+    _assign_missing_pks(chunk)
+    refresh_product_indexes(chunk)
+    adjust_category_counts(Counter(p.category_id for p in chunk if p.is_active))
+    return chunk
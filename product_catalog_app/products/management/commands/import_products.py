@@ -0,0 +1,101 @@
+import json
+import os
+from django.core.management.base import BaseCommand, CommandError
+from products.imports import IMPORT_CHUNK_SIZE, ImportJobUnavailable, run_import
+from products.models import ProductImportJob
+
+
+class Command(BaseCommand):
+    help = 'Import products from a CSV or NDJSON file in chunks, resume an import or run queued imports'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            nargs='?',
+            help='File to import',
+        )
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'ndjson'],
+            help='File format (defaults to the file extension)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=IMPORT_CHUNK_SIZE,
+            help='Rows validated and inserted per transaction',
+        )
+        parser.add_argument(
+            '--job',
+            type=int,
+            help='Resume this import job instead of starting a new one',
+        )
+        parser.add_argument(
+            '--pending',
+            action='store_true',
+            help='Run every import job queued through the API',
+        )
+        parser.add_argument(
+            '--error-report',
+            help='Write rejected rows to this file as NDJSON',
+        )
+
+    def run(self, job):
+        return run_import(job, progress=lambda j: self.stdout.write(
+            f'  {j.rows_processed} rows, {j.created_count} created, {j.error_count} rejected'
+        ))
+
+    def handle_pending(self):
+        pending = list(ProductImportJob.objects.filter(status='PENDING').order_by('id'))
+        for job in pending:
+            self.stdout.write(f'Running import {job.pk}')
+            try:
+                job = self.run(job)
+            except ImportJobUnavailable:
+                # claimed by another worker since the query
+                continue
+            if job.status == 'FAILED':
+                self.stderr.write(f'Import {job.pk} failed after row {job.rows_processed}: {job.last_error}')
+        self.stdout.write(self.style.SUCCESS(f'Processed {len(pending)} queued imports'))
+
+    def handle(self, *args, **options):
+        if options['pending']:
+            return self.handle_pending()
+        if options['job']:
+            try:
+                job = ProductImportJob.objects.get(pk=options['job'])
+            except ProductImportJob.DoesNotExist:
+                raise CommandError(f"Import job {options['job']} does not exist")
+            self.stdout.write(f'Resuming import {job.pk} after row {job.rows_processed}')
+        else:
+            path = options['path']
+            if not path or not os.path.isfile(path):
+                raise CommandError('A file path, --job or --pending is required')
+            file_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+            if file_format not in ('csv', 'ndjson'):
+                raise CommandError('Unable to detect the file format, pass --format')
+            job = ProductImportJob.objects.create(
+                source_path=os.path.abspath(path),
+                format=file_format,
+                chunk_size=options['chunk_size'],
+            )
+            self.stdout.write(f'Started import {job.pk} of {path}')
+
+        try:
+            job = self.run(job)
+        except ImportJobUnavailable as e:
+            raise CommandError(str(e))
+
+        if options['error_report']:
+            with open(options['error_report'], 'w') as report:
+                for error in job.row_errors.order_by('id').iterator():
+                    report.write(json.dumps({'row': error.row_number, 'errors': error.errors, 'data': error.data}) + '\n')
+
+        if job.status == 'FAILED':
+            raise CommandError(
+                f'Import {job.pk} failed after row {job.rows_processed}: {job.last_error}. '
+                f'Resume with --job {job.pk}'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Import {job.pk} completed: {job.created_count} created, {job.error_count} rejected'
+        ))
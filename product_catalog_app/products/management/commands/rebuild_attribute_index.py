@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from products.attribute_index import INDEX_BATCH_SIZE, get_filterable_attributes, reindex_products
+from products.indexing import iter_product_chunks
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the filterable attribute index for all products'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--attribute',
+            action='append',
+            dest='attributes',
+            help='Only rebuild this attribute code (repeatable)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=INDEX_BATCH_SIZE,
+            help='Products indexed per transaction',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show what would be rebuilt without making changes',
+        )
+
+    def handle(self, *args, **options):
+        attributes = get_filterable_attributes()
+        if options['attributes']:
+            unknown = set(options['attributes']) - set(attributes)
+            if unknown:
+                raise CommandError(f'Not filterable attributes: {", ".join(sorted(unknown))}')
+            attributes = {code: attributes[code] for code in options['attributes']}
+
+        if not attributes:
+            self.stdout.write(self.style.WARNING('No filterable attributes found.'))
+            return
+
+        total = Product.objects.count()
+        self.stdout.write(f'Rebuilding {", ".join(sorted(attributes))} for {total} products')
+        if options['dry_run']:
+            return
+
+        chunk_size = options['chunk_size']
+        products = Product.objects.only('id', 'attributes_data')
+        processed = 0
+        rows = 0
+        for chunk in iter_product_chunks(products, chunk_size):
+            rows += reindex_products(chunk, attributes=attributes)
+            processed += len(chunk)
+            self.stdout.write(f'  {processed}/{total} products')
+
+        self.stdout.write(self.style.SUCCESS(f'Indexed {rows} values for {processed} products'))
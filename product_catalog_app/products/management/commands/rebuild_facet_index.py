@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from products.facets import FACET_BATCH_SIZE, index_product_facets
+from products.indexing import iter_product_chunks
+from products.models import Product
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the product facet index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=FACET_BATCH_SIZE,
+            help='Products indexed per transaction',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        total = Product.objects.count()
+        self.stdout.write(f'Indexing facets of {total} products')
+        products = Product.objects.only(
+            'id', 'attributes_data', 'brand_id', 'category_id', 'attribute_set_id', 'verification_status',
+        )
+        processed = 0
+        postings = 0
+        for chunk in iter_product_chunks(products, chunk_size):
+            postings += index_product_facets(chunk)
+            processed += len(chunk)
+            self.stdout.write(f'  {processed}/{total} products')
+        self.stdout.write(self.style.SUCCESS(f'Indexed {postings} facet values for {processed} products'))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from products.indexing import iter_product_chunks
+from products.models import Product
+from products.search import SEARCH_BATCH_SIZE, index_products
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the product search index'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=SEARCH_BATCH_SIZE,
+            help='Products indexed per transaction',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        total = Product.objects.count()
+        self.stdout.write(f'Indexing {total} products')
+        products = Product.objects.only('id', 'name', 'description', 'attributes_data')
+        processed = 0
+        postings = 0
+        for chunk in iter_product_chunks(products, chunk_size):
+            postings += index_products(chunk)
+            processed += len(chunk)
+            self.stdout.write(f'  {processed}/{total} products')
+        self.stdout.write(self.style.SUCCESS(f'Indexed {postings} terms for {processed} products'))
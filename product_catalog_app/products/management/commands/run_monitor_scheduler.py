@@ -0,0 +1,72 @@
+import time
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from products.models import ProductMonitorJob
+from products.monitoring import MONITOR_BATCH_SIZE, MONITOR_LOOKAHEAD, MonitorScheduler, run_due_monitor_jobs
+
+
+class Command(BaseCommand):
+    help = 'Run due product price monitor jobs and notify on target crossings'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=MONITOR_BATCH_SIZE,
+            help='Maximum jobs claimed per transaction',
+        )
+        parser.add_argument(
+            '--lookahead',
+            type=int,
+            default=MONITOR_LOOKAHEAD,
+            help='Upcoming due times kept in memory to decide how long to sleep',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Run the jobs due now and exit instead of scheduling',
+        )
+        parser.add_argument(
+            '--max-sleep',
+            type=float,
+            default=60.0,
+            help='Longest sleep between checks; also how often due times are reloaded',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Show how many active jobs are due without running them',
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            due = ProductMonitorJob.objects.filter(is_active=True, next_run_at__lte=timezone.now()).count()
+            self.stdout.write(f'Due monitor jobs: {due}')
+            return
+
+        self.stdout.write(self.style.SUCCESS('Starting monitor scheduler...'))
+        claimed = notified = 0
+        try:
+            if options['once']:
+                while True:
+                    results = run_due_monitor_jobs(batch_size=options['batch_size'])
+                    claimed += results.claimed
+                    notified += results.notified
+                    if results.claimed < options['batch_size']:
+                        break
+            else:
+                scheduler = MonitorScheduler(
+                    batch_size=options['batch_size'],
+                    lookahead=options['lookahead'],
+                    refresh_interval=options['max_sleep'],
+                )
+                while True:
+                    results = scheduler.run_pending()
+                    if results.claimed:
+                        claimed += results.claimed
+                        notified += results.notified
+                        self.stdout.write(f'  checked {claimed} jobs, {notified} notifications')
+                    time.sleep(scheduler.seconds_until_due())
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f'Monitor scheduler stopped after {claimed} jobs, {notified} notifications.'))
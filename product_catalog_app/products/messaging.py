@@ -1,29 +1,36 @@
-from product_catalog_app.containers.django_container import DjangoContainer
+from core.outbox import enqueue_events
 from product_catalog_app.messaging.constants import PRODUCT_CREATION_TOPIC
 from typing import List
 
-container = DjangoContainer.get_instance()
+def enqueue_validation_events(product_ids: List[int]) -> int:
+    """Queues validation events for a list of product IDs in the outbox.
 
-def publish_validation_events(product_ids: List[int]) -> None:
-    """Publishes validation events for a list of product IDs.
-
-    Each product ID in the provided list is used to generate and publish a
-    "create" type message to the product creation topic, indicating the product
-    was generated by AI and requires verification.
+    Each product ID in the provided list is used to generate a "create" type
+    message for the product creation topic, indicating the product was
+    generated by AI and requires verification. Call it inside the transaction
+    that creates the products; the ``relay_outbox`` command publishes the
+    events in batches once it has committed.
 
     Args:
-        product_ids (List[int]): A list of product IDs to publish validation events for.
+        product_ids (List[int]): A list of product IDs to queue validation events for.
 
     Returns:
-        None
+        int: The number of events queued.
 
     Example:
-        publish_validation_events([1, 2, 3])
+        with transaction.atomic():
+            products = bulk_create_products(rows)
+            enqueue_validation_events([p.pk for p in products])
     """
-    for product_id in product_ids:
-        message_data = {
-            "product_id": product_id,
-            "type": "create",
-            "message": "Product Generated By AI for Verification",
-        }
-        future = container.pubsub_client.publish(PRODUCT_CREATION_TOPIC, message_data)
\ No newline at end of file
+    events = (
+        (
+            f"product-create:{product_id}",
+            {
+                "product_id": product_id,
+                "type": "create",
+                "message": "Product Generated By AI for Verification",
+            },
+        )
+        for product_id in product_ids
+    )
+    return enqueue_events(PRODUCT_CREATION_TOPIC, events)
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-18 01:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0017_productmonitorjob_created_at_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttributeSetPropagation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('schema_version', models.DateTimeField()),
+                ('last_product_id', models.PositiveBigIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('processed', models.PositiveIntegerField(default=0)),
+                ('updated', models.PositiveIntegerField(default=0)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('attribute_set', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='propagation', to='products.productattributeset')),
+            ],
+            options={
+                'verbose_name': 'Attribute Set Propagation',
+                'verbose_name_plural': 'Attribute Set Propagations',
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.3 on 2026-10-18 01:31
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0018_attributesetpropagation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productattribute',
+            name='is_filterable',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.CreateModel(
+            name='ProductAttributeIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text_value', models.CharField(blank=True, max_length=255, null=True)),
+                ('number_value', models.FloatField(blank=True, null=True)),
+                ('attribute', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_index', to='products.productattribute')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attribute_index', to='products.product')),
+            ],
+            options={
+                'verbose_name': 'Product Attribute Index',
+                'verbose_name_plural': 'Product Attribute Index',
+                'indexes': [models.Index(fields=['attribute', 'text_value', 'product'], name='product_attr_text_idx'), models.Index(fields=['attribute', 'number_value', 'product'], name='product_attr_number_idx')],
+            },
+        ),
+    ]
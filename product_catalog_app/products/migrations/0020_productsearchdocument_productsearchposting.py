@@ -0,0 +1,41 @@
+# Generated by Django 5.2.3 on 2026-10-18 01:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0019_productattribute_is_filterable_productattributeindex'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductSearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('length', models.PositiveIntegerField(default=0)),
+                ('product', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='search_document', to='products.product')),
+            ],
+            options={
+                'verbose_name': 'Product Search Document',
+                'verbose_name_plural': 'Product Search Documents',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductSearchPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('term_frequency', models.PositiveIntegerField(default=0)),
+                ('document_length', models.PositiveIntegerField(default=0)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_postings', to='products.product')),
+            ],
+            options={
+                'verbose_name': 'Product Search Posting',
+                'verbose_name_plural': 'Product Search Postings',
+                'unique_together': {('term', 'product')},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.3 on 2026-10-18 01:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0020_productsearchdocument_productsearchposting'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductFacetValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=110)),
+                ('value', models.CharField(max_length=255)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='facet_values', to='products.product')),
+            ],
+            options={
+                'verbose_name': 'Product Facet Value',
+                'verbose_name_plural': 'Product Facet Values',
+                'indexes': [models.Index(fields=['product', 'facet', 'value'], name='product_facet_product_idx'), models.Index(fields=['facet', 'value', 'product'], name='product_facet_value_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.3 on 2026-10-18 01:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0021_productfacetvalue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductImportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file', models.FileField(blank=True, max_length=500, null=True, upload_to='imports/products/')),
+                ('source_path', models.CharField(blank=True, max_length=500, null=True)),
+                ('format', models.CharField(choices=[('csv', 'CSV'), ('ndjson', 'NDJSON')], default='csv', max_length=10)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('chunk_size', models.PositiveIntegerField(default=500)),
+                ('rows_processed', models.PositiveIntegerField(default=0)),
+                ('created_count', models.PositiveIntegerField(default=0)),
+                ('error_count', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('user_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Product Import Job',
+                'verbose_name_plural': 'Product Import Jobs',
+                'ordering': ['-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProductImportError',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('row_number', models.PositiveIntegerField()),
+                ('errors', models.JSONField(default=dict)),
+                ('data', models.JSONField(blank=True, null=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='row_errors', to='products.productimportjob')),
+            ],
+            options={
+                'verbose_name': 'Product Import Error',
+                'verbose_name_plural': 'Product Import Errors',
+                'ordering': ['row_number'],
+                'indexes': [models.Index(fields=['job', 'row_number'], name='product_import_error_row_idx')],
+            },
+        ),
+    ]
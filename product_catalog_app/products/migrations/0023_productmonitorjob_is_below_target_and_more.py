@@ -0,0 +1,38 @@
+# Generated by Django 5.2.3 on 2026-10-18 01:59
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0022_productimportjob_productimporterror'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='productmonitorjob',
+            name='is_below_target',
+            field=models.BooleanField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='productmonitorjob',
+            name='last_checked_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='productmonitorjob',
+            name='last_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='productmonitorjob',
+            name='next_run_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddIndex(
+            model_name='productmonitorjob',
+            index=models.Index(fields=['is_active', 'next_run_at'], name='monitor_due_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-18 02:17
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0023_productmonitorjob_is_below_target_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='productimportjob',
+            name='chunk_size',
+            field=models.PositiveIntegerField(default=500, validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(5000)]),
+        ),
+    ]
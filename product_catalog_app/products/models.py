@@ -1,6 +1,8 @@
 import uuid
 from django.db import models
 from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.utils import timezone
 from django.utils.text import slugify
 from brands.models import Brand
 from categories.models import Category
@@ -32,6 +34,9 @@ class ProductAttribute(models.Model):
     display_name = models.CharField(max_length=100, blank=True, null=True)
     sample_values = models.CharField(max_length=255, blank=True, null=True)
     display_order = models.PositiveSmallIntegerField(blank=True, null=True)
+    # filterable attributes are copied into ProductAttributeIndex so products
+    # can be filtered on them with ?attr.<code>=
+    is_filterable = models.BooleanField(default=False)
 
     class Meta:
         verbose_name = 'Product Attribute'
@@ -225,6 +230,12 @@ class ProductMonitorJob(models.Model):
         null=True,
         blank=True,
     )
+    # scheduling state kept by products.monitoring
+    next_run_at = models.DateTimeField(default=timezone.now)
+    last_checked_at = models.DateTimeField(null=True, blank=True)
+    last_price = models.DecimalField(decimal_places=2, max_digits=20, null=True, blank=True)
+    # whether the last check was at or below target_price; None until checked
+    is_below_target = models.BooleanField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -232,5 +243,204 @@ class ProductMonitorJob(models.Model):
         unique_together = ('product', 'user_id')
         verbose_name = 'Product Monitor Job'
         verbose_name_plural = 'Product Monitor Jobs'
+        indexes = [
+            models.Index(fields=['is_active', 'next_run_at'], name='monitor_due_idx'),
+        ]
     
-    
\ No newline at end of file
+    
+class AttributeSetPropagation(models.Model):
+    """Checkpoint for pushing an attribute set's schema onto its products.
+
+    ``schema_version`` is the set's ``updated_at`` the run applies; a newer
+    version restarts the run from the first product.
+    """
+    attribute_set = models.OneToOneField(
+        ProductAttributeSet,
+        on_delete=models.CASCADE,
+        related_name='propagation',
+    )
+    schema_version = models.DateTimeField()
+    last_product_id = models.PositiveBigIntegerField(default=0)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    updated = models.PositiveIntegerField(default=0)
+    completed_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Attribute Set Propagation'
+        verbose_name_plural = 'Attribute Set Propagations'
+
+    def __str__(self):
+        return f"{self.attribute_set_id}: {self.processed}/{self.total}"
+
+class ProductAttributeIndex(models.Model):
+    """Indexed copy of a filterable attribute value of a product.
+
+    One row per value (multiselect attributes get one row per selected
+    option). Numbers are stored in ``number_value``, everything else in
+    ``text_value``; dates keep their ISO format so ranges compare correctly.
+    """
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='attribute_index',
+    )
+    attribute = models.ForeignKey(
+        ProductAttribute,
+        on_delete=models.CASCADE,
+        related_name='product_index',
+    )
+    text_value = models.CharField(max_length=255, blank=True, null=True)
+    number_value = models.FloatField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Product Attribute Index'
+        verbose_name_plural = 'Product Attribute Index'
+        indexes = [
+            models.Index(fields=['attribute', 'text_value', 'product'], name='product_attr_text_idx'),
+            models.Index(fields=['attribute', 'number_value', 'product'], name='product_attr_number_idx'),
+        ]
+
+    def __str__(self):
+        value = self.number_value if self.number_value is not None else self.text_value
+        return f"{self.product_id} {self.attribute_id}={value}"
+
+class ProductSearchDocument(models.Model):
+    """Per-product statistics of the search index (BM25 document length)."""
+    product = models.OneToOneField(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='search_document',
+    )
+    length = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Product Search Document'
+        verbose_name_plural = 'Product Search Documents'
+
+    def __str__(self):
+        return f"{self.product_id} ({self.length} terms)"
+
+class ProductSearchPosting(models.Model):
+    """Inverted index entry: how often a stemmed term occurs in a product.
+
+    ``document_length`` repeats ``ProductSearchDocument.length`` so queries
+    can rank from this table alone; both are rewritten together whenever a
+    product is reindexed.
+    """
+    term = models.CharField(max_length=64)
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='search_postings',
+    )
+    term_frequency = models.PositiveIntegerField(default=0)
+    document_length = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Product Search Posting'
+        verbose_name_plural = 'Product Search Postings'
+        unique_together = ('term', 'product')
+
+    def __str__(self):
+        return f"{self.term} -> {self.product_id} ({self.term_frequency})"
+
+class ProductFacetValue(models.Model):
+    """Posting of a product under one facet value.
+
+    ``facet`` is ``brand``, ``category``, ``attribute_set``,
+    ``verification_status`` or ``attr.<code>`` for select and multiselect
+    attributes; ``value`` is the id or option value as a string.
+    """
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='facet_values',
+    )
+    facet = models.CharField(max_length=110)
+    value = models.CharField(max_length=255)
+
+    class Meta:
+        verbose_name = 'Product Facet Value'
+        verbose_name_plural = 'Product Facet Values'
+        indexes = [
+            models.Index(fields=['product', 'facet', 'value'], name='product_facet_product_idx'),
+            models.Index(fields=['facet', 'value', 'product'], name='product_facet_value_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} {self.facet}={self.value}"
+
+class ProductImportJob(models.Model):
+    """A product file import, with the checkpoint used to resume it.
+
+    ``rows_processed`` counts the data rows of committed chunks; a resumed
+    import skips that many rows of the file.
+    """
+    FORMAT_CHOICES = (
+        ('csv', 'CSV'),
+        ('ndjson', 'NDJSON'),
+    )
+    STATUS_CHOICES = (
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('COMPLETED', 'Completed'),
+        ('FAILED', 'Failed'),
+    )
+
+    file = models.FileField(upload_to='imports/products/', max_length=500, blank=True, null=True)
+    source_path = models.CharField(max_length=500, blank=True, null=True)
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default='csv')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    # rows per transaction; bounded so a chunk's memory and locks stay small
+    chunk_size = models.PositiveIntegerField(
+        default=500,
+        validators=[MinValueValidator(1), MaxValueValidator(5000)],
+    )
+    rows_processed = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, null=True)
+    user_id = models.PositiveIntegerField(blank=True, null=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    completed_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Product Import Job'
+        verbose_name_plural = 'Product Import Jobs'
+        ordering = ['-id']
+
+    def open_source(self):
+        """Opens the imported file for binary reading."""
+        if self.file:
+            return self.file.open('rb')
+        return open(self.source_path, 'rb')
+
+    def __str__(self):
+        return f"Import {self.pk} ({self.status})"
+
+class ProductImportError(models.Model):
+    """A row of an import that failed validation."""
+    job = models.ForeignKey(
+        ProductImportJob,
+        on_delete=models.CASCADE,
+        related_name='row_errors',
+    )
+    row_number = models.PositiveIntegerField()
+    errors = models.JSONField(default=dict)
+    data = models.JSONField(blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Product Import Error'
+        verbose_name_plural = 'Product Import Errors'
+        ordering = ['row_number']
+        indexes = [
+            models.Index(fields=['job', 'row_number'], name='product_import_error_row_idx'),
+        ]
+
+    def __str__(self):
+        return f"Import {self.job_id} row {self.row_number}"
@@ -0,0 +1,192 @@
+import heapq
+import logging
+import re
+from datetime import timedelta
+from typing import List, Optional
+from django.db import transaction
+from django.utils import timezone
+from core.outbox import enqueue_events
+from messaging.constants import PRODUCT_PRICE_ALERTS_TOPIC
+from prices.effective import current_effective_amounts
+from .models import ProductMonitorJob
+
+logger = logging.getLogger(__name__)
+
+MONITOR_BATCH_SIZE = 500
+MONITOR_LOOKAHEAD = 10000
+
+MONITOR_FREQUENCIES = {
+    'hourly': timedelta(hours=1),
+    'daily': timedelta(days=1),
+    'weekly': timedelta(weeks=1),
+}
+DEFAULT_MONITOR_FREQUENCY = MONITOR_FREQUENCIES['daily']
+
+_INTERVAL = re.compile(r'^\s*(\d+)\s*([mhdw])\s*$')
+_INTERVAL_UNITS = {'m': 'minutes', 'h': 'hours', 'd': 'days', 'w': 'weeks'}
+
+def parse_frequency(frequency: Optional[str]) -> timedelta:
+    """Turns ``ProductMonitorJob.frequency`` into an interval.
+
+    Accepts ``hourly``, ``daily``, ``weekly`` or ``<n>m|h|d|w`` (e.g.
+    ``15m``); anything else falls back to daily.
+    """
+    value = (frequency or '').strip().lower()
+    if value in MONITOR_FREQUENCIES:
+        return MONITOR_FREQUENCIES[value]
+    match = _INTERVAL.match(value)
+    if match and int(match.group(1)) > 0:
+        return timedelta(**{_INTERVAL_UNITS[match.group(2)]: int(match.group(1))})
+    return DEFAULT_MONITOR_FREQUENCY
+
+class MonitorResults():
+    """Counts from one ``run_due_monitor_jobs`` call."""
+    def __init__(self, claimed: int = 0, priced: int = 0, notified: int = 0):
+        self.claimed = claimed
+        self.priced = priced
+        self.notified = notified
+        # (next_run_at, id) of every checked job
+        self.scheduled: List[tuple] = []
+
+    def __str__(self):
+        return f"MonitorResults(claimed={self.claimed}, priced={self.priced}, notified={self.notified})"
+
+def check_monitor_jobs(jobs: List[ProductMonitorJob], now=None) -> MonitorResults:
+    """Checks a batch of jobs against current effective prices.
+
+    Prices for every product in the batch come from one lookup. A job
+    notifies only when its product's price crosses from above its target
+    to at or below it (or is already below on the first check); the
+    notification is queued in the outbox in the caller's transaction.
+    Every job is rescheduled one ``frequency`` after ``now``.
+    """
+    now = now or timezone.now()
+    amounts = current_effective_amounts(list({job.product_id for job in jobs}))
+    results = MonitorResults(claimed=len(jobs))
+    events = []
+    for job in jobs:
+        job.next_run_at = now + parse_frequency(job.frequency)
+        job.last_checked_at = now
+        results.scheduled.append((job.next_run_at, job.pk))
+        amount = amounts.get(job.product_id)
+        if amount is None:
+            continue
+        results.priced += 1
+        below = amount <= job.target_price
+        if below and job.is_below_target is not True:
+            events.append((
+                f"monitor:{job.pk}:{now.isoformat()}",
+                {
+                    "job_id": job.pk,
+                    "product_id": job.product_id,
+                    "user_id": job.user_id,
+                    "type": "price_below_target",
+                    "price": str(amount),
+                    "target_price": str(job.target_price),
+                    "previous_price": str(job.last_price) if job.last_price is not None else None,
+                },
+            ))
+        job.last_price = amount
+        job.is_below_target = below
+    results.notified = enqueue_events(PRODUCT_PRICE_ALERTS_TOPIC, events) if events else 0
+    ProductMonitorJob.objects.bulk_update(
+        jobs, ['next_run_at', 'last_checked_at', 'last_price', 'is_below_target'],
+    )
+    return results
+
+def run_due_monitor_jobs(
+    batch_size: int = MONITOR_BATCH_SIZE,
+    now=None,
+    job_ids: Optional[List[int]] = None,
+) -> MonitorResults:
+    """Claims the most overdue active jobs (or the due ones of ``job_ids``) and checks them.
+
+    The batch is claimed with ``SELECT ... FOR UPDATE SKIP LOCKED`` on the
+    ``(is_active, next_run_at)`` index, or on the primary key when
+    ``job_ids`` is given, so several workers can run side by side without
+    checking a job twice.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        due = ProductMonitorJob.objects.select_for_update(skip_locked=True).filter(is_active=True, next_run_at__lte=now)
+        if job_ids is not None:
+            due = due.filter(pk__in=job_ids)
+        jobs = list(
+            due.order_by('next_run_at')
+            .only('id', 'product_id', 'user_id', 'target_price', 'frequency', 'last_price', 'is_below_target')[:batch_size]
+        )
+        if not jobs:
+            return MonitorResults()
+        results = check_monitor_jobs(jobs, now)
+    logger.info(str(results))
+    return results
+
+class MonitorScheduler():
+    """Sleeps until the next job is due instead of polling the table.
+
+    The due times of the next ``lookahead`` jobs are loaded into a heap
+    once per ``refresh_interval``. Each wake-up pops the due entries,
+    claims those jobs by primary key and pushes back the next run time of
+    every job it checked, so no query is needed to know when to wake
+    next. The heap is only a hint: a job another worker checked is
+    skipped at claim time, and jobs created or rescheduled elsewhere (or
+    beyond the lookahead) are picked up at the next reload.
+
+    Example:
+        scheduler = MonitorScheduler()
+        while True:
+            scheduler.run_pending()
+            time.sleep(scheduler.seconds_until_due())
+    """
+    def __init__(
+        self,
+        batch_size: int = MONITOR_BATCH_SIZE,
+        lookahead: int = MONITOR_LOOKAHEAD,
+        refresh_interval: float = 60.0,
+    ):
+        self.batch_size = batch_size
+        self.lookahead = lookahead
+        self.refresh_interval = refresh_interval
+        self._heap = []
+        self._loaded_at = None
+
+    def refill(self, now=None) -> int:
+        now = now or timezone.now()
+        upcoming = (
+            ProductMonitorJob.objects.filter(is_active=True)
+            .order_by('next_run_at')
+            .values_list('next_run_at', 'id')[:self.lookahead]
+        )
+        self._heap = list(upcoming)
+        heapq.heapify(self._heap)
+        self._loaded_at = now
+        return len(self._heap)
+
+    def _stale(self, now) -> bool:
+        return self._loaded_at is None or (now - self._loaded_at).total_seconds() >= self.refresh_interval
+
+    def seconds_until_due(self, now=None) -> float:
+        """Seconds to sleep before the next job is due, capped at ``refresh_interval``."""
+        now = now or timezone.now()
+        if not self._heap:
+            return self.refresh_interval
+        wait = (self._heap[0][0] - now).total_seconds()
+        return max(0.0, min(wait, self.refresh_interval))
+
+    def run_pending(self, now=None) -> MonitorResults:
+        """Checks every job in the heap that is due at ``now``, one claimed batch at a time."""
+        now = now or timezone.now()
+        if self._stale(now):
+            self.refill(now)
+        total = MonitorResults()
+        while self._heap and self._heap[0][0] <= now:
+            job_ids = []
+            while self._heap and self._heap[0][0] <= now and len(job_ids) < self.batch_size:
+                job_ids.append(heapq.heappop(self._heap)[1])
+            results = run_due_monitor_jobs(self.batch_size, now, job_ids=job_ids)
+            total.claimed += results.claimed
+            total.priced += results.priced
+            total.notified += results.notified
+            for entry in results.scheduled:
+                heapq.heappush(self._heap, entry)
+        return total
@@ -0,0 +1,70 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+from assets.models import AssetAssociation
+from prices.effective import effective_price_data
+from prices.lookup import prices_at
+from prices.models import Price
+from .models import Product
+
+PRODUCT_ENTITY_TYPE = 'Product'
+
+def prefetch_product_assets(product_ids: List[int]) -> Dict[int, list]:
+    """Loads the assets associated with a page of products in one query.
+
+    Args:
+        product_ids (List[int]): Primary keys of the products being serialized.
+
+    Returns:
+        Dict[int, list]: Assets keyed by product id, in association order.
+    """
+    assets = defaultdict(list)
+    associations = AssetAssociation.objects.filter(
+        entity=PRODUCT_ENTITY_TYPE,
+        entity_id__in=product_ids,
+    ).select_related('asset').order_by('id')
+    for assoc in associations:
+        if assoc.asset:
+            assets[assoc.entity_id].append(assoc.asset)
+    return assets
+
+def prefetch_product_prices(product_ids: List[int], price_lookup: Optional[dict] = None) -> Dict[int, Price]:
+    """Loads the price valid now (or at ``price_lookup['at']``) for a page of products.
+
+    Mirrors the single-product lookup in ``ProductSerializer.get_price``;
+    see ``prices.lookup.prices_at`` for how overlapping prices resolve.
+
+    Args:
+        product_ids (List[int]): Primary keys of the products being serialized.
+        price_lookup (dict): Optional ``at``, ``region_code`` and
+            ``currency_code``.
+
+    Returns:
+        Dict[int, Price]: The valid price keyed by product id.
+    """
+    prices = Price.objects.select_related('product').prefetch_related(
+        'price_modifiers__category',
+        'price_modifiers__product_attribute',
+        'price_modifiers__product_attribute_set',
+        'price_modifiers__price_rules',
+    )
+    return prices_at(product_ids, queryset=prices, **(price_lookup or {}))
+
+def prefetch_product_relations(products: Iterable[Product], price_lookup: Optional[dict] = None) -> dict:
+    """Builds the serializer context used by ``ProductSerializer`` for a page.
+
+    ``price_lookup`` picks the moment and market of the prices, as parsed
+    by ``prices.serializers.PriceLookupQuerySerializer``.
+
+    Example:
+        context.update(prefetch_product_relations(page))
+        ProductSerializer(page, many=True, context=context)
+    """
+    product_ids = [p.pk for p in products]
+    if not product_ids:
+        return {'product_assets': {}, 'product_prices': {}, 'product_effective_prices': {}}
+    prices = prefetch_product_prices(product_ids, price_lookup)
+    return {
+        'product_assets': prefetch_product_assets(product_ids),
+        'product_prices': prices,
+        'product_effective_prices': effective_price_data(products, prices, (price_lookup or {}).get('at')),
+    }
@@ -0,0 +1,150 @@
+import logging
+from typing import Callable, Dict, FrozenSet, Optional, Tuple
+from django.db import transaction
+from django.utils import timezone
+from .indexing import refresh_product_indexes
+from .models import AttributeSetPropagation, Product, ProductAttributeSet
+
+logger = logging.getLogger(__name__)
+
+PROPAGATION_CHUNK_SIZE = 1000
+
+ProgressCallback = Callable[[AttributeSetPropagation], None]
+
+class AttributeSetSchema:
+    """The attribute codes and defaults of a set, with per-shape key diffs.
+
+    Products of one set almost always share a handful of key shapes, so the
+    keys to drop and add are computed once per distinct shape rather than
+    once per product.
+    """
+    def __init__(self, attribute_set: ProductAttributeSet):
+        self.defaults = {attr.code: attr.default_value for attr in attribute_set.attributes.all()}
+        self.codes = frozenset(self.defaults)
+        self._diffs: Dict[FrozenSet[str], Tuple[FrozenSet[str], Tuple[str, ...]]] = {}
+
+    def diff(self, keys: FrozenSet[str]) -> Tuple[FrozenSet[str], Tuple[str, ...]]:
+        """Returns the ``(removed, added)`` codes for a product with ``keys``."""
+        diff = self._diffs.get(keys)
+        if diff is None:
+            diff = (keys - self.codes, tuple(sorted(self.codes - keys)))
+            self._diffs[keys] = diff
+        return diff
+
+    def apply(self, attributes_data) -> Optional[dict]:
+        """Returns the migrated attributes, or None when nothing changes.
+
+        Values of attributes still in the set are kept; attributes no longer
+        in the set are dropped and new ones get their default value.
+        """
+        if not isinstance(attributes_data, dict):
+            attributes_data = {}
+            removed, added = frozenset(), tuple(sorted(self.codes))
+        else:
+            removed, added = self.diff(frozenset(attributes_data))
+        if not removed and not added:
+            return None
+        data = {k: v for k, v in attributes_data.items() if k not in removed}
+        for code in added:
+            data[code] = self.defaults[code]
+        return data
+
+def get_checkpoint(attribute_set: ProductAttributeSet) -> AttributeSetPropagation:
+    """Returns the run for the set's current schema, starting a new one if needed."""
+    checkpoint, created = AttributeSetPropagation.objects.get_or_create(
+        attribute_set=attribute_set,
+        defaults={'schema_version': attribute_set.updated_at},
+    )
+    if not created and checkpoint.schema_version != attribute_set.updated_at:
+        checkpoint.schema_version = attribute_set.updated_at
+        checkpoint.last_product_id = 0
+        checkpoint.processed = 0
+        checkpoint.updated = 0
+        checkpoint.completed_at = None
+    if checkpoint.completed_at is None:
+        checkpoint.total = Product.objects.filter(attribute_set=attribute_set).count()
+        checkpoint.save()
+    return checkpoint
+
+def propagate_attribute_set(
+    attribute_set: ProductAttributeSet,
+    chunk_size: int = PROPAGATION_CHUNK_SIZE,
+    progress: Optional[ProgressCallback] = None,
+) -> AttributeSetPropagation:
+    """Migrates ``attributes_data`` of every product in the set to its schema.
+
+    Products are read in primary key order, ``chunk_size`` at a time, with
+    ``iterator()`` and only the columns needed to rewrite and reindex them.
+    Each chunk is written with one ``bulk_update`` in its own transaction
+    together with the checkpoint and index updates, so a run that is
+    interrupted (e.g. a function timeout followed by a redelivery) resumes
+    after the last committed chunk instead of starting over. A completed
+    run for the current schema version is a no-op.
+
+    Args:
+        attribute_set (ProductAttributeSet): The set whose schema changed.
+        chunk_size (int): Products read and written per chunk.
+        progress (ProgressCallback): Called with the checkpoint after each chunk.
+
+    Returns:
+        AttributeSetPropagation: The checkpoint with the final counts.
+
+    Example:
+        run = propagate_attribute_set(attribute_set)
+        logger.info(f"{run.updated} of {run.processed} products updated")
+    """
+    schema = AttributeSetSchema(attribute_set)
+    checkpoint = get_checkpoint(attribute_set)
+    if checkpoint.completed_at is not None:
+        logger.info(f"Attribute set {attribute_set.pk} already propagated for {checkpoint.schema_version}")
+        return checkpoint
+    if checkpoint.last_product_id:
+        logger.info(f"Resuming attribute set {attribute_set.pk} after product {checkpoint.last_product_id}")
+
+    products = (
+        Product.objects.filter(attribute_set=attribute_set)
+        .only(
+            'id', 'name', 'description', 'attributes_data',
+            'brand_id', 'category_id', 'attribute_set_id', 'verification_status',
+        )
+        .order_by('id')
+    )
+    while True:
+        with transaction.atomic():
+            # Locking the checkpoint lets a redelivered message running at the
+            # same time pick up where this one is instead of redoing chunks.
+            checkpoint = AttributeSetPropagation.objects.select_for_update().get(pk=checkpoint.pk)
+            if checkpoint.completed_at is not None or checkpoint.schema_version != attribute_set.updated_at:
+                break
+            changed = []
+            count = 0
+            last_id = checkpoint.last_product_id
+            for product in products.filter(id__gt=last_id)[:chunk_size].iterator(chunk_size=chunk_size):
+                count += 1
+                last_id = product.id
+                data = schema.apply(product.attributes_data)
+                if data is not None:
+                    product.attributes_data = data
+                    changed.append(product)
+            if changed:
+                # bulk_update skips auto_now, so updated_at is set by hand.
+                now = timezone.now()
+                for product in changed:
+                    product.updated_at = now
+                Product.objects.bulk_update(changed, ['attributes_data', 'updated_at'])
+                refresh_product_indexes(changed)
+            checkpoint.last_product_id = last_id
+            checkpoint.processed += count
+            checkpoint.updated += len(changed)
+            if count < chunk_size:
+                checkpoint.completed_at = timezone.now()
+            checkpoint.save()
+        logger.info(
+            f"Attribute set {attribute_set.pk}: {checkpoint.processed}/{checkpoint.total} products processed, "
+            f"{checkpoint.updated} updated"
+        )
+        if progress is not None:
+            progress(checkpoint)
+        if checkpoint.completed_at is not None:
+            break
+    return checkpoint
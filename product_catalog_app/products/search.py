@@ -0,0 +1,176 @@
+import math
+import re
+import unicodedata
+from collections import Counter
+from typing import Any, Dict, Iterable, List
+from django.db import transaction
+from django.db.models import Avg, Case, Count, F, FloatField, Sum, Value, When
+from django.db.models.functions import Cast
+from .models import Product, ProductSearchDocument, ProductSearchPosting
+
+SEARCH_BATCH_SIZE = 1000
+MAX_TERM_LENGTH = 64
+
+# Name matches count this many times a description or attribute match.
+NAME_WEIGHT = 3
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+STOP_WORDS = frozenset((
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is',
+    'it', 'of', 'on', 'or', 'that', 'the', 'this', 'to', 'with',
+))
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+def stem(token: str) -> str:
+    """Reduces an English word to a crude stem by stripping common suffixes.
+
+    Not a full Porter stemmer; it only has to map a word and its usual
+    inflections (plural, -ing, -ed, trailing e) to the same term, the same
+    way for indexed text and queries.
+
+    Example:
+        stem('running') == stem('runs') == 'run'
+    """
+    if len(token) <= 3 or token.isdigit():
+        return token
+    if token.endswith('ies') and len(token) > 4:
+        return token[:-3] + 'y'
+    for suffix in ('ing', 'ed'):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            token = token[:-len(suffix)]
+            if token[-1] == token[-2] and token[-1] not in 'lsz':
+                token = token[:-1]
+            return token
+    if token.endswith(('sses', 'xes', 'zes', 'ches', 'shes')):
+        token = token[:-2]
+    elif token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        token = token[:-1]
+    if token.endswith('e') and len(token) > 3:
+        token = token[:-1]
+    return token
+
+def tokenize(text: Any) -> List[str]:
+    """Splits text into lowercase, accent-folded, stemmed terms without stop words."""
+    if text is None:
+        return []
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii').lower()
+    return [
+        stem(token)[:MAX_TERM_LENGTH]
+        for token in TOKEN_PATTERN.findall(text)
+        if token not in STOP_WORDS
+    ]
+
+def _attribute_text(value: Any) -> Iterable[Any]:
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from _attribute_text(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _attribute_text(item)
+    elif value is not None and not isinstance(value, bool):
+        yield value
+
+def product_terms(product: Product) -> Counter:
+    """Weighted term frequencies of a product's name, description and attribute values."""
+    terms = Counter()
+    for term in tokenize(product.name):
+        terms[term] += NAME_WEIGHT
+    terms.update(tokenize(product.description))
+    data = product.attributes_data if isinstance(product.attributes_data, dict) else {}
+    for value in _attribute_text(data):
+        terms.update(tokenize(value))
+    return terms
+
+def index_products(products: Iterable[Product], batch_size: int = SEARCH_BATCH_SIZE) -> int:
+    """Replaces the search index entries of ``products``.
+
+    Args:
+        products (Iterable[Product]): Saved products with name, description
+            and ``attributes_data`` loaded.
+        batch_size (int): Maximum rows per INSERT statement.
+
+    Returns:
+        int: The number of postings written.
+
+    Example:
+        index_products(Product.objects.filter(brand=brand))
+    """
+    products = list(products)
+    if not products:
+        return 0
+    documents = []
+    postings = []
+    for product in products:
+        terms = product_terms(product)
+        length = sum(terms.values())
+        documents.append(ProductSearchDocument(product_id=product.pk, length=length))
+        postings.extend(
+            ProductSearchPosting(
+                term=term,
+                product_id=product.pk,
+                term_frequency=frequency,
+                document_length=length,
+            )
+            for term, frequency in terms.items()
+        )
+    ids = [p.pk for p in products]
+    with transaction.atomic():
+        ProductSearchPosting.objects.filter(product_id__in=ids).delete()
+        ProductSearchDocument.objects.filter(product_id__in=ids).delete()
+        ProductSearchDocument.objects.bulk_create(documents, batch_size=batch_size)
+        ProductSearchPosting.objects.bulk_create(postings, batch_size=batch_size)
+    return len(postings)
+
+def _inverse_document_frequencies(terms: List[str], total: int) -> Dict[str, float]:
+    frequencies = dict(
+        ProductSearchPosting.objects.filter(term__in=terms)
+        .values('term')
+        .annotate(df=Count('id'))
+        .values_list('term', 'df')
+    )
+    return {
+        term: math.log(1 + (total - df + 0.5) / (df + 0.5))
+        for term, df in frequencies.items()
+    }
+
+def search_products(query: str, k1: float = BM25_K1, b: float = BM25_B):
+    """Ranks products matching ``query`` with BM25.
+
+    Scoring runs in the database over the postings of the query terms only,
+    so the result can be paginated with LIMIT/OFFSET without loading every
+    match.
+
+    Args:
+        query (str): Free text; tokenized the same way as indexed products.
+        k1 (float): BM25 term frequency saturation.
+        b (float): BM25 document length normalization.
+
+    Returns:
+        QuerySet: ``{'product_id': ..., 'score': ...}`` rows, best match first.
+
+    Example:
+        rows = search_products('red lego bricks')[:10]
+        products = Product.objects.in_bulk([r['product_id'] for r in rows])
+    """
+    terms = sorted(set(tokenize(query)))
+    stats = ProductSearchDocument.objects.aggregate(total=Count('id'), average_length=Avg('length'))
+    idf = _inverse_document_frequencies(terms, stats['total']) if terms else {}
+    if not idf:
+        return ProductSearchPosting.objects.none().values('product_id')
+
+    weight = Case(
+        *[When(term=term, then=Value(value)) for term, value in idf.items()],
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+    tf = Cast('term_frequency', FloatField())
+    norm = Value(k1 * (1 - b)) + Value(k1 * b / max(stats['average_length'] or 1, 1)) * Cast(F('document_length'), FloatField())
+    return (
+        ProductSearchPosting.objects.filter(term__in=list(idf))
+        .values('product_id')
+        .annotate(score=Sum(weight * tf * Value(k1 + 1) / (tf + norm), output_field=FloatField()))
+        .order_by('-score', 'product_id')
+    )
@@ -1,12 +1,14 @@
-import json
-from django.db import models
+from django.db import transaction
 from rest_framework import serializers
-from .models import Product, ProductAttribute, ProductAttributeSet, ProductMonitorJob
+from .models import Product, ProductAttribute, ProductAttributeSet, ProductImportError, ProductImportJob, ProductMonitorJob
+from .prefetch import PRODUCT_ENTITY_TYPE
+from .validation import get_attribute_set_validator
 from assets.models import AssetAssociation
 from assets.serializers import AssetSerializer
 from brands.models import Brand
 from categories.models import Category
-from prices.models import Price
+from prices.effective import effective_price_data
+from prices.lookup import prices_at
 from prices.serializers import PriceSerializer
 
 class ProductAttributeSerializer(serializers.ModelSerializer):
@@ -25,6 +27,7 @@ class ProductAttributeSerializer(serializers.ModelSerializer):
             'default_value',
             'options',
             'validation_rules',
+            'is_filterable',
             'created_at',
             'updated_at',
         ]
@@ -115,6 +118,7 @@ class ProductAttributeSetSerializer(serializers.ModelSerializer):
             data['product_type_brands'] = brands_data
         return data
         
+    @transaction.atomic
     def create(self, validated_data):
         attributes_data = validated_data.pop('attributes', [])
         brands_data = validated_data.pop('product_type_brands', [])
@@ -123,6 +127,9 @@ class ProductAttributeSetSerializer(serializers.ModelSerializer):
         product_attribute_set.product_type_brands.set(brands_data)
         return product_attribute_set
     
+    # Atomic so the outbox event written by the post_save signal commits
+    # together with the set and its membership changes.
+    @transaction.atomic
     def update(self, instance, validated_data):
         attributes_data = validated_data.pop('attributes', None)
         brands_data = validated_data.pop('product_type_brands', None)
@@ -200,141 +207,25 @@ class ProductSerializer(serializers.ModelSerializer):
             'updated_at',
         ]
 
-        def validate(self, data):
-            # Retrieve the attribute_set and attributes_data from the incoming dictionary.
-            # This is the reliable way to access sibling fields.
-            attribute_set_id = data.get('attribute_set')
-            attributes_data = data.get('attributes_data')
-
-            # If we are updating an existing instance and the attribute_set is not provided,
-            # we can get it from the instance.
-            if self.instance and not attribute_set_id:
-                attribute_set_id = self.instance.attribute_set_id
-
-            # Proceed with validation only if an attribute set is specified.
-            if not attribute_set_id:
-                # If no attribute set, no attributes_data validation is needed.
-                # We can return the data as is.
-                return data
-
-            try:
-                attribute_set = ProductAttributeSet.objects.get(pk=attribute_set_id.id)
-            except ProductAttributeSet.DoesNotExist:
-                raise serializers.ValidationError({"attribute_set": "Attribute set does not exist"})
-
-            defined_attributes = attribute_set.attributes.all()
-
-            if attributes_data is None:
-                attributes_data = {}
-
-            if not isinstance(attributes_data, dict):
-                raise serializers.ValidationError({"attributes_data": "must be a JSON object."})
-
-            # The rest of your validation logic remains the same, but now operates
-            # on the 'attributes_data' field from the 'data' dictionary.
-            for attr in defined_attributes:
-                attr_code = attr.code
-                attr_value = attributes_data.get(attr_code)
-
-                if attr.is_required and (attr_value is None or (isinstance(attr_value, str) and not attr_value.strip())):
-                    raise serializers.ValidationError(
-                        {attr_code: f"'{attr.name}' is required."}
-                    )
-
-                if attr_value is None and not attr.is_required:
-                    continue
-
-                if attr.type == 'number':
-                    try:
-                        # You should check for `isinstance(attr_value, (int, float))` first
-                        # before attempting `float(attr_value)`.
-                        if not isinstance(attr_value, (int, float)):
-                            float(attr_value)
-                    except (ValueError, TypeError):
-                        raise serializers.ValidationError(
-                            {attr_code: f"'{attr.name}' must be a valid number."}
-                        )
-                    # Validation rules check
-                    if attr.validation_rules and isinstance(attr_value, (int, float)):
-                        if 'min' in attr.validation_rules and attr_value < attr.validation_rules['min']:
-                            raise serializers.ValidationError(
-                                {attr_code: f"'{attr.name}' must be at least {attr.validation_rules['min']}."}
-                            )
-                        if 'max' in attr.validation_rules and attr_value > attr.validation_rules['max']:
-                            raise serializers.ValidationError(
-                                {attr_code: f"'{attr.name}' must be at most {attr.validation_rules['max']}'"}
-                            )
-                elif attr.type == 'boolean':
-                    if not isinstance(attr_value, bool):
-                        raise serializers.ValidationError(
-                            {attr_code: f"'{attr.name}' must be a boolean"}
-                        )
-                elif attr.type in ['select', 'multiselect']:
-                    valid_values = [opt['value'] for opt in attr.options] if attr.options else []
-                    if attr.type == 'select':
-                        if attr_value not in valid_values:
-                            raise serializers.ValidationError(
-                                {attr_code: f"'{attr.name}' value '{attr_value}' is not a valid option."}
-                            )
-                    elif attr.type == 'multiselect':
-                        if not isinstance(attr_value, list):
-                            raise serializers.ValidationError(
-                                {attr_code: f"'{attr.name}' must be a list of values."}
-                            )
-                        if not all(item in valid_values for item in attr_value):
-                            raise serializers.ValidationError(
-                                {attr_code: f"One or more values in '{attr.name}' are not valid options."}
-                            )
-                elif attr.type == 'json':
-                    if not isinstance(attr_value, (dict, list)):
-                        try:
-                            json.loads(attr_value)
-                        except (json.JSONDecodeError, TypeError):
-                            raise serializers.ValidationError(
-                                {attr_code: f"'{attr.name}' must be valid JSON."}
-                            )
-                elif attr.type == 'date':
-                    try:
-                        models.DateField().to_python(attr_value)
-                    except (ValueError, TypeError):
-                        raise serializers.ValidationError(
-                            {attr_code: f"'{attr.name}' must be a valid date (YYYY-MM-DD)."}
-                        )
-                elif attr.type == 'datetime':
-                    try:
-                        models.DateTimeField().to_python(attr_value)
-                    except (ValueError, TypeError):
-                        raise serializers.ValidationError(
-                            {attr_code: f"'{attr.name}' must be a valid datetime (YYYY-MM-DDTHH:MM:SSZ)."}
-                        )
-                elif attr.type in ['text', 'textarea']:
-                    if not isinstance(attr_value, str):
-                        raise serializers.ValidationError(
-                            {attr_code: f"'{attr.name}' must be a string."}
-                        )
-                    if attr.validation_rules and isinstance(attr_value, str):
-                        if 'min_length' in attr.validation_rules and len(attr_value) < attr.validation_rules['min_length']:
-                            raise serializers.ValidationError(
-                                {attr_code: f"'{attr.name}' must be at least {attr.validation_rules['min_length']} characters long."}
-                            )
-                        if 'max_length' in attr.validation_rules and len(attr_value) > attr.validation_rules['max_length']:
-                            raise serializers.ValidationError(
-                                {attr_code: f"'{attr.name}' must be at most {attr.validation_rules['max_length']} characters long."}
-                            )
-                        if 'pattern' in attr.validation_rules:
-                            import re
-                            if not re.match(attr.validation_rules['pattern'], attr_value):
-                                raise serializers.ValidationError(
-                                    {attr_code: f"'{attr.name}' does not match the required pattern."}
-                                )
-
-            # Return the validated data at the end
+    def validate(self, data):
+        attribute_set = data.get('attribute_set')
+        if attribute_set is None and self.instance is not None:
+            attribute_set = self.instance.attribute_set
+        if attribute_set is None:
             return data
+        if 'attributes_data' in data or self.instance is None:
+            attributes_data = data.get('attributes_data')
+        else:
+            attributes_data = self.instance.attributes_data
+        get_attribute_set_validator(attribute_set)(attributes_data)
+        return data
 
     def get_assets(self, obj: Product) -> list:
-        ENTITY_TYPE = 'Product'
+        prefetched = self.context.get('product_assets')
+        if prefetched is not None:
+            return AssetSerializer(prefetched.get(obj.pk, []), many=True).data
         associations = AssetAssociation.objects.filter(
-            entity=ENTITY_TYPE,
+            entity=PRODUCT_ENTITY_TYPE,
             entity_id=obj.pk,
         ).select_related('asset')
         ordered_assets = [
@@ -343,16 +234,24 @@ class ProductSerializer(serializers.ModelSerializer):
         return AssetSerializer(ordered_assets, many=True).data
 
     def get_price(self, obj: Product):
-        try:
-            price = Price.objects.get(
-                product=obj,
-                is_active=True,
-            )
-            return PriceSerializer(price).data if price else None
-        except Price.DoesNotExist:
+        prefetched = self.context.get('product_prices')
+        if prefetched is not None:
+            price = prefetched.get(obj.pk)
+            return self._price_data(price, self.context.get('product_effective_prices', {}).get(obj.pk))
+        price_lookup = self.context.get('price_lookup') or {}
+        price = prices_at([obj.pk], **price_lookup).get(obj.pk)
+        if price is None:
             return None
-        except Exception:
+        return self._price_data(price, effective_price_data([obj], {obj.pk: price}, price_lookup.get('at')).get(obj.pk))
+
+    def _price_data(self, price, effective):
+        if not price:
             return None
+        data = PriceSerializer(price).data
+        effective = effective or {}
+        data['effective_price'] = effective.get('effective_price', data['price'])
+        data['applied_modifiers'] = effective.get('applied_modifiers', [])
+        return data
 
     def create(self, validated_data):
         return super().create(validated_data)
@@ -381,4 +280,76 @@ class ProductMonitorJobSerializer(serializers.ModelSerializer):
         read_only_fields = [
             'created_at',
             'updated_at',
-        ]
\ No newline at end of file
+        ]
+
+class PrefetchedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """Resolves pks from ``context['related'][model]`` before querying.
+
+    Lets a caller validating many rows load the related objects for all of
+    them up front instead of one query per row and field.
+    """
+    def to_internal_value(self, data):
+        prefetched = self.context.get('related', {}).get(self.get_queryset().model)
+        if prefetched is not None:
+            try:
+                return prefetched[int(data)]
+            except (KeyError, TypeError, ValueError):
+                pass
+        return super().to_internal_value(data)
+
+class ProductImportSerializer(ProductSerializer):
+    brand = PrefetchedPrimaryKeyRelatedField(
+        queryset=Brand.objects.all(),
+        allow_null=True,
+        required=False,
+    )
+    category = PrefetchedPrimaryKeyRelatedField(
+        queryset=Category.objects.all(),
+        allow_null=True,
+        required=False,
+    )
+    attribute_set = PrefetchedPrimaryKeyRelatedField(
+        queryset=ProductAttributeSet.objects.all(),
+    )
+
+class ProductImportJobSerializer(serializers.ModelSerializer):
+    file = serializers.FileField(write_only=True)
+
+    class Meta:
+        model = ProductImportJob
+        fields = [
+            'id',
+            'file',
+            'format',
+            'status',
+            'chunk_size',
+            'rows_processed',
+            'created_count',
+            'error_count',
+            'last_error',
+            'started_at',
+            'completed_at',
+            'created_at',
+            'updated_at',
+        ]
+        read_only_fields = [
+            'status',
+            'rows_processed',
+            'created_count',
+            'error_count',
+            'last_error',
+            'started_at',
+            'completed_at',
+            'created_at',
+            'updated_at',
+        ]
+
+class ProductImportErrorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ProductImportError
+        fields = [
+            'id',
+            'row_number',
+            'errors',
+            'data',
+        ]
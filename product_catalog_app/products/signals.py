@@ -1,8 +1,9 @@
+from django.utils import timezone
+from categories.counts import adjust_category_counts
+from core.outbox import enqueue_event
 from messaging.constants import PRODUCT_ATTRIBUTES_SET_UPDATES_TOPIC
-from messaging.factory import get_messenger
-from .models import ProductAttributeSet
-
-messenger = get_messenger()
+from .indexing import refresh_product_indexes
+from .models import Product, ProductAttribute, ProductAttributeIndex, ProductAttributeSet
 
 def attribute_set_updated(sender, instance: ProductAttributeSet, created, **kwargs):
     if not created:
@@ -11,4 +12,51 @@ def attribute_set_updated(sender, instance: ProductAttributeSet, created, **kwar
             "type": "update",
             "message": "Product attribute set updated",
         }
-        messenger.publish(PRODUCT_ATTRIBUTES_SET_UPDATES_TOPIC, data=message)
\ No newline at end of file
+        # Relayed by the relay_outbox command; repeated saves of the same set
+        # before the relay runs are published once.
+        enqueue_event(PRODUCT_ATTRIBUTES_SET_UPDATES_TOPIC, f"attribute-set:{instance.pk}", message)
+
+# Compiled attribute validators are keyed on the set's updated_at, so any
+# change to an attribute or to set membership has to move it forward.
+def attribute_changed(sender, instance: ProductAttribute, **kwargs):
+    ProductAttributeSet.objects.filter(attributes=instance).update(updated_at=timezone.now())
+
+def attribute_set_attributes_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        sets = ProductAttributeSet.objects.filter(pk=instance.pk)
+    elif action == 'pre_clear':
+        sets = ProductAttributeSet.objects.filter(attributes=instance)
+    else:
+        sets = ProductAttributeSet.objects.filter(pk__in=pk_set or [])
+    sets.update(updated_at=timezone.now())
+
+def _counted_category_id(category_id, is_active):
+    return category_id if is_active else None
+
+# Category product counts only move when a product enters or leaves a
+# category's active set, so the stored state is read before the save.
+def product_saving(sender, instance: Product, **kwargs):
+    previous = None
+    if instance.pk is not None:
+        row = Product.objects.filter(pk=instance.pk).values_list('category_id', 'is_active').first()
+        if row is not None:
+            previous = _counted_category_id(*row)
+    instance._counted_category_id = previous
+
+def product_saved(sender, instance: Product, **kwargs):
+    refresh_product_indexes([instance])
+    previous = getattr(instance, '_counted_category_id', None)
+    current = _counted_category_id(instance.category_id, instance.is_active)
+    if previous != current:
+        adjust_category_counts({previous: -1, current: 1})
+    instance._counted_category_id = current
+
+def product_deleted(sender, instance: Product, **kwargs):
+    adjust_category_counts({_counted_category_id(instance.category_id, instance.is_active): -1})
+
+def attribute_filterable_changed(sender, instance: ProductAttribute, created, **kwargs):
+    # Turning filtering on needs a backfill: run rebuild_attribute_index.
+    if not created and not instance.is_filterable:
+        ProductAttributeIndex.objects.filter(attribute=instance).delete()
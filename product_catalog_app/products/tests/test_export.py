@@ -0,0 +1,56 @@
+import csv
+import io
+import json
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+from brands.models import Brand
+from products.indexing import iter_product_chunks
+from products.models import Product
+from prices.models import Price
+
+class ProductExportTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=get_user_model()(username='exporter'))
+        brand = Brand.objects.create(name='Lego')
+        self.products = [
+            Product.objects.create(name=f'product {i}', brand=brand, attributes_data={'pieces': i})
+            for i in range(5)
+        ]
+        Price.objects.create(product=self.products[0], price='9.99', currency_code='USD', region_code='US')
+
+    def _content(self, response):
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_chunks_cover_every_product(self):
+        """
+        Test that chunked iteration returns every product once, in id order
+        """
+        chunks = list(iter_product_chunks(Product.objects.all(), chunk_size=2))
+        self.assertEqual([len(c) for c in chunks], [2, 2, 1])
+        self.assertEqual([p.pk for c in chunks for p in c], [p.pk for p in self.products])
+
+    def test_ndjson_export(self):
+        """
+        Test that the NDJSON export streams one serialized product per line
+        """
+        response = self.client.get('/api/products/export/', {'format': 'ndjson'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEqual([r['id'] for r in rows], [p.pk for p in self.products])
+        self.assertEqual(rows[0]['brand_name'], 'Lego')
+        self.assertEqual(rows[0]['price']['price'], '9.99')
+        self.assertIsNone(rows[1]['price'])
+
+    def test_csv_export_applies_filters(self):
+        """
+        Test that the CSV export has a header row and honours list filters
+        """
+        response = self.client.get('/api/products/export/', {'format': 'csv', 'name': 'product 3'})
+        self.assertEqual(response.status_code, 200)
+        rows = list(csv.DictReader(io.StringIO(self._content(response))))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['name'], 'product 3')
+        self.assertEqual(json.loads(rows[0]['attributes_data']), {'pieces': 3})
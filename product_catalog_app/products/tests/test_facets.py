@@ -0,0 +1,76 @@
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.test import APIClient
+from brands.models import Brand
+from products.facets import facet_counts
+from products.ingest import bulk_create_products
+from products.models import Product, ProductAttribute, ProductFacetValue
+
+class FacetCountsTest(TestCase):
+    def setUp(self):
+        self.lego = Brand.objects.create(name='Lego')
+        self.mega = Brand.objects.create(name='Mega')
+        self.color = ProductAttribute.objects.create(
+            name='Color',
+            type='multiselect',
+            options=[{'value': 'red', 'label': 'Red'}, {'value': 'blue', 'label': 'Blue'}],
+        )
+        Product.objects.create(name='a', brand=self.lego, attributes_data={'color': ['red', 'blue']})
+        Product.objects.create(name='b', brand=self.lego, attributes_data={'color': ['red']}, verification_status='PENDING')
+        bulk_create_products([{'name': 'c', 'brand': self.mega, 'attributes_data': {'color': ['blue', 'blue']}}])
+
+    def test_counts_every_facet_in_one_query(self):
+        """
+        Test that brand, status and multiselect values are counted together
+        """
+        with self.assertNumQueries(3):
+            counts = facet_counts(Product.objects.all())
+        self.assertEqual(counts['brand'], [
+            {'value': str(self.lego.pk), 'label': 'Lego', 'count': 2},
+            {'value': str(self.mega.pk), 'label': 'Mega', 'count': 1},
+        ])
+        self.assertEqual(counts['attr.color'], [
+            {'value': 'blue', 'label': 'Blue', 'count': 2},
+            {'value': 'red', 'label': 'Red', 'count': 2},
+        ])
+        self.assertEqual(
+            {r['value']: r['count'] for r in counts['verification_status']},
+            {'EXEMPT': 2, 'PENDING': 1},
+        )
+
+    def test_rebuild_command_restores_counts(self):
+        """
+        Test that rebuilding the index chunk by chunk gives the same counts
+        """
+        before = facet_counts(Product.objects.all())
+        ProductFacetValue.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_facet_index', chunk_size=2, stdout=out)
+        self.assertIn('for 3 products', out.getvalue())
+        self.assertEqual(facet_counts(Product.objects.all()), before)
+
+    def test_counts_follow_filters_and_updates(self):
+        """
+        Test that counts respect the filter and follow product changes
+        """
+        product = Product.objects.get(name='a')
+        product.brand = self.mega
+        product.save()
+        counts = facet_counts(Product.objects.filter(brand=self.mega), ['attr.color'])
+        self.assertEqual(list(counts), ['attr.color'])
+        self.assertEqual(
+            {r['value']: r['count'] for r in counts['attr.color']},
+            {'blue': 2, 'red': 1},
+        )
+
+    def test_facets_endpoint(self):
+        """
+        Test that /products/facets/ applies the list filters
+        """
+        client = APIClient()
+        client.force_authenticate(user=get_user_model()(username='facets'))
+        response = client.get('/api/products/facets/', {'verification_status': 'PENDING', 'facets': 'brand'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'brand': [{'value': str(self.lego.pk), 'label': 'Lego', 'count': 1}]})
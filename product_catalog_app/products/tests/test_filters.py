@@ -0,0 +1,71 @@
+from io import StringIO
+from django.core.management import call_command
+from django.test import TestCase
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from products.filters import AttributeFilterBackend
+from products.ingest import bulk_create_products
+from products.models import Product, ProductAttribute, ProductAttributeIndex
+
+class AttributeFilterBackendTest(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        self.color = ProductAttribute.objects.create(
+            name='Color',
+            type='multiselect',
+            is_filterable=True,
+            options=[{'value': 'red', 'label': 'Red'}, {'value': 'blue', 'label': 'Blue'}],
+        )
+        self.part_count = ProductAttribute.objects.create(name='Part Count', type='number', is_filterable=True)
+        self.notes = ProductAttribute.objects.create(name='Notes', type='text')
+        self.red_small = Product.objects.create(name='red small', attributes_data={'color': ['red'], 'part-count': 100})
+        self.red_large = Product.objects.create(name='red large', attributes_data={'color': ['red', 'blue'], 'part-count': 900})
+        self.blue_large = Product.objects.create(name='blue large', attributes_data={'color': ['blue'], 'part-count': '750'})
+
+    def _filter(self, params):
+        request = Request(self.factory.get('/products/', params))
+        queryset = AttributeFilterBackend().filter_queryset(request, Product.objects.order_by('id'), None)
+        return list(queryset.values_list('name', flat=True))
+
+    def test_filters_on_indexed_values(self):
+        """
+        Test equality, multiselect membership and numeric ranges
+        """
+        self.assertEqual(self._filter({'attr.color': 'red'}), ['red small', 'red large'])
+        self.assertEqual(self._filter({'attr.color': 'red', 'attr.part_count__gte': '500'}), ['red large'])
+        self.assertEqual(self._filter({'attr.part-count__lt': '800'}), ['red small', 'blue large'])
+        self.assertEqual(self._filter({'attr.color__in': 'blue,green'}), ['red large', 'blue large'])
+
+    def test_rejects_unindexed_attributes(self):
+        """
+        Test that non filterable attributes and bad values are rejected
+        """
+        with self.assertRaises(ValidationError):
+            self._filter({'attr.notes': 'x'})
+        with self.assertRaises(ValidationError):
+            self._filter({'attr.part_count__gte': 'many'})
+        with self.assertRaises(ValidationError):
+            self._filter({'attr.color__contains': 'r'})
+
+    def test_index_follows_product_changes(self):
+        """
+        Test that saves, bulk creates and disabling filtering keep the index in sync
+        """
+        self.red_small.attributes_data = {'color': ['blue']}
+        self.red_small.save()
+        bulk_create_products([{'name': 'bulk', 'attributes_data': {'color': ['red']}}])
+        self.assertEqual(self._filter({'attr.color': 'red'}), ['red large', 'bulk'])
+
+        self.part_count.is_filterable = False
+        self.part_count.save()
+        self.assertFalse(ProductAttributeIndex.objects.filter(attribute=self.part_count).exists())
+
+    def test_rebuild_command_backfills(self):
+        """
+        Test that rebuild_attribute_index indexes a newly filterable attribute
+        """
+        Product.objects.create(name='noted', attributes_data={'notes': 'fragile'})
+        ProductAttribute.objects.filter(pk=self.notes.pk).update(is_filterable=True)
+        call_command('rebuild_attribute_index', attribute=['notes'], chunk_size=2, stdout=StringIO())
+        self.assertEqual(self._filter({'attr.notes': 'fragile'}), ['noted'])
@@ -0,0 +1,146 @@
+import json
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from core.models import OutboxEvent
+from messaging.constants import PRODUCT_CREATION_TOPIC
+from products import imports
+from products.models import Product, ProductAttribute, ProductAttributeSet, ProductImportJob
+
+class ProductImportTest(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.pieces = ProductAttribute.objects.create(name='Pieces', type='number', is_required=True)
+        self.attribute_set = ProductAttributeSet.objects.create(name='Toys')
+        self.attribute_set.attributes.set([self.pieces])
+
+    def _job(self, content, file_format, chunk_size=2):
+        return ProductImportJob.objects.create(
+            file=SimpleUploadedFile(f'feed.{file_format}', content.encode('utf-8')),
+            format=file_format,
+            chunk_size=chunk_size,
+        )
+
+    def _ndjson(self, rows):
+        return ''.join(json.dumps(row) + '\n' for row in rows)
+
+    def test_csv_import_reports_row_errors(self):
+        """
+        Test that valid CSV rows are created and invalid rows are reported
+        """
+        content = (
+            'name,attribute_set,attributes_data\n'
+            f'Castle,{self.attribute_set.pk},"{{""pieces"": 500}}"\n'
+            f'Ship,{self.attribute_set.pk},"{{}}"\n'
+            f'Truck,{self.attribute_set.pk},"{{""pieces"": 90}}"\n'
+            'Plane,999,\n'
+        )
+        job = imports.run_import(self._job(content, 'csv'))
+        self.assertEqual(job.status, 'COMPLETED')
+        self.assertEqual((job.rows_processed, job.created_count, job.error_count), (4, 2, 2))
+        self.assertCountEqual(Product.objects.values_list('name', flat=True), ['Castle', 'Truck'])
+        self.assertCountEqual(
+            OutboxEvent.objects.filter(topic=PRODUCT_CREATION_TOPIC).values_list('payload__product_id', flat=True),
+            Product.objects.values_list('pk', flat=True),
+        )
+        errors = list(job.row_errors.order_by('row_number'))
+        self.assertEqual([e.row_number for e in errors], [2, 4])
+        self.assertIn('pieces', errors[0].errors)
+        self.assertIn('attribute_set', errors[1].errors)
+
+    def test_resumes_after_failed_chunk(self):
+        """
+        Test that a failed import resumes after the last committed chunk
+        """
+        rows = [{'name': f'Set {i}', 'attribute_set': self.attribute_set.pk, 'attributes_data': {'pieces': i + 1}} for i in range(5)]
+        rows.insert(3, 'not an object')
+        job = self._job(self._ndjson(rows), 'ndjson')
+        real_import_chunk = imports.import_chunk
+        calls = []
+
+        def flaky_import_chunk(job, chunk):
+            calls.append(len(chunk))
+            if len(calls) == 2:
+                raise RuntimeError('database went away')
+            return real_import_chunk(job, chunk)
+
+        with mock.patch.object(imports, 'import_chunk', flaky_import_chunk):
+            job = imports.run_import(job)
+        self.assertEqual(job.status, 'FAILED')
+        self.assertEqual(job.rows_processed, 2)
+
+        job = imports.run_import(job)
+        self.assertEqual(job.status, 'COMPLETED')
+        self.assertEqual((job.rows_processed, job.created_count, job.error_count), (6, 5, 1))
+        self.assertEqual(Product.objects.count(), 5)
+
+    def test_import_endpoint(self):
+        """
+        Test that an uploaded file is queued, imported by the command and exposes the row errors
+        """
+        client = APIClient()
+        user = get_user_model()(username='importer', is_superuser=True, is_active=True)
+        client.force_authenticate(user=user)
+        content = self._ndjson([
+            {'name': 'Castle', 'attribute_set': self.attribute_set.pk, 'attributes_data': {'pieces': 10}},
+            {'name': 'x', 'attribute_set': self.attribute_set.pk},
+        ])
+        response = client.post('/api/product-imports/', {
+            'file': SimpleUploadedFile('feed.ndjson', content.encode('utf-8')),
+            'format': 'ndjson',
+        }, format='multipart')
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['status'], 'PENDING')
+        self.assertEqual(Product.objects.count(), 0)
+        call_command('import_products', '--pending', stdout=StringIO(), stderr=StringIO())
+        job = ProductImportJob.objects.get(pk=response.data['id'])
+        self.assertEqual((job.status, job.created_count, job.error_count), ('COMPLETED', 1, 1))
+        errors = client.get(f"/api/product-imports/{response.data['id']}/errors/")
+        self.assertEqual(errors.data['results'][0]['row_number'], 2)
+        self.assertIn('name', errors.data['results'][0]['errors'])
+
+    def test_resume_claims_job(self):
+        """
+        Test that resume queues a failed job again and refuses running or completed ones
+        """
+        client = APIClient()
+        client.force_authenticate(user=get_user_model()(username='importer', is_superuser=True, is_active=True))
+        job = self._job('{"name": "Castle"}\n', 'ndjson')
+        for job_status, expected in (('RUNNING', 409), ('COMPLETED', 400), ('FAILED', 202)):
+            ProductImportJob.objects.filter(pk=job.pk).update(status=job_status)
+            response = client.post(f'/api/product-imports/{job.pk}/resume/')
+            self.assertEqual(response.status_code, expected)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'PENDING')
+        ProductImportJob.objects.filter(pk=job.pk).update(status='RUNNING')
+        with self.assertRaises(imports.ImportJobUnavailable):
+            imports.run_import(job)
+
+    def test_chunk_size_is_bounded(self):
+        """
+        Test that the endpoint rejects chunk sizes outside 1..5000 and a zero chunk size fails the run
+        """
+        client = APIClient()
+        client.force_authenticate(user=get_user_model()(username='importer', is_superuser=True, is_active=True))
+        for chunk_size in (0, 5001):
+            response = client.post('/api/product-imports/', {
+                'file': SimpleUploadedFile('feed.ndjson', b'{"name": "Castle"}\n'),
+                'format': 'ndjson',
+                'chunk_size': chunk_size,
+            }, format='multipart')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('chunk_size', response.data)
+        job = ProductImportJob.objects.create(
+            file=SimpleUploadedFile('feed.ndjson', b'{"name": "Castle"}\n'), format='ndjson', chunk_size=0,
+        )
+        self.assertEqual(imports.run_import(job).status, 'FAILED')
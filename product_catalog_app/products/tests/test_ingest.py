@@ -0,0 +1,38 @@
+from django.db import transaction
+from django.test import TestCase
+from core.models import OutboxEvent
+from products.ingest import bulk_create_products
+from products.messaging import enqueue_validation_events
+from products.models import Product
+
+class BulkCreateProductsTest(TestCase):
+    def test_returns_created_pks_only(self):
+        """
+        Test that created products carry their own pks and ignore same-named rows
+        """
+        existing = Product.objects.create(name='duplicate name')
+        rows = [{'name': 'duplicate name'}] + [{'name': f'product {i}'} for i in range(6)]
+        created = bulk_create_products(rows, chunk_size=4)
+        self.assertEqual(len(created), 7)
+        self.assertTrue(all(p.pk for p in created))
+        self.assertNotIn(existing.pk, [p.pk for p in created])
+        self.assertEqual(Product.objects.count(), 8)
+        self.assertEqual([p.name for p in created], [r['name'] for r in rows])
+
+class EnqueueValidationEventsTest(TestCase):
+    def test_rolled_back_products_leave_no_events(self):
+        """
+        Test that validation events are only kept when the products commit
+        """
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                created = bulk_create_products([{'name': 'rolled back'}])
+                enqueue_validation_events([p.pk for p in created])
+                raise RuntimeError('abort')
+        self.assertFalse(OutboxEvent.objects.exists())
+
+        created = bulk_create_products([{'name': 'kept'}])
+        self.assertEqual(enqueue_validation_events([p.pk for p in created]), 1)
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.event_key, f'product-create:{created[0].pk}')
+        self.assertEqual(event.payload['product_id'], created[0].pk)
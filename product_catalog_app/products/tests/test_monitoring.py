@@ -0,0 +1,92 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.test import TestCase
+from django.utils import timezone
+from core.models import OutboxEvent
+from messaging.constants import PRODUCT_PRICE_ALERTS_TOPIC
+from prices.models import Price
+from products.models import Product, ProductMonitorJob
+from products.monitoring import MonitorScheduler, parse_frequency, run_due_monitor_jobs
+
+class MonitorSchedulerTest(TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.product = Product.objects.create(name='Brick')
+        self.price = Price.objects.create(product=self.product, price=Decimal('100.00'))
+
+    def create_job(self, user_id, target_price, **kwargs):
+        kwargs.setdefault('next_run_at', self.now - timedelta(minutes=1))
+        return ProductMonitorJob.objects.create(product=self.product, user_id=user_id, target_price=target_price, **kwargs)
+
+    def alerts(self):
+        return OutboxEvent.objects.filter(topic=PRODUCT_PRICE_ALERTS_TOPIC)
+
+    def test_parse_frequency(self):
+        """
+        Test that named and numeric frequencies are parsed and unknown ones fall back to daily
+        """
+        self.assertEqual(parse_frequency('hourly'), timedelta(hours=1))
+        self.assertEqual(parse_frequency('15m'), timedelta(minutes=15))
+        self.assertEqual(parse_frequency(' 2D '), timedelta(days=2))
+        self.assertEqual(parse_frequency('sometimes'), timedelta(days=1))
+        self.assertEqual(parse_frequency('0h'), timedelta(days=1))
+
+    def test_notifies_only_on_crossing(self):
+        """
+        Test that a job notifies when the price drops to its target and not again while it stays below
+        """
+        job = self.create_job(1, Decimal('90.00'), frequency='hourly')
+        results = run_due_monitor_jobs(now=self.now)
+        self.assertEqual((results.claimed, results.priced, results.notified), (1, 1, 0))
+        job.refresh_from_db()
+        self.assertEqual(job.last_price, Decimal('100.00'))
+        self.assertFalse(job.is_below_target)
+        self.assertEqual(job.next_run_at, self.now + timedelta(hours=1))
+
+        self.price.price = Decimal('85.00')
+        self.price.save()
+        later = self.now + timedelta(hours=2)
+        self.assertEqual(run_due_monitor_jobs(now=later).notified, 1)
+        event = self.alerts().get()
+        self.assertEqual(event.payload['price'], '85.00')
+        self.assertEqual(event.payload['previous_price'], '100.00')
+
+        self.assertEqual(run_due_monitor_jobs(now=later + timedelta(hours=2)).notified, 0)
+        self.assertEqual(self.alerts().count(), 1)
+
+    def test_skips_jobs_not_due_or_inactive(self):
+        """
+        Test that only active jobs whose next run has passed are claimed
+        """
+        self.create_job(1, Decimal('150.00'))
+        self.create_job(2, Decimal('150.00'), next_run_at=self.now + timedelta(hours=1))
+        self.create_job(3, Decimal('150.00'), is_active=False)
+        results = run_due_monitor_jobs(now=self.now)
+        self.assertEqual((results.claimed, results.notified), (1, 1))
+        self.assertEqual(self.alerts().get().payload['user_id'], 1)
+
+    def test_unpriced_product_is_rescheduled(self):
+        """
+        Test that a job whose product has no price is rescheduled without a notification
+        """
+        self.price.delete()
+        job = self.create_job(1, Decimal('150.00'))
+        results = run_due_monitor_jobs(now=self.now)
+        self.assertEqual((results.claimed, results.priced), (1, 0))
+        job.refresh_from_db()
+        self.assertIsNone(job.is_below_target)
+        self.assertGreater(job.next_run_at, self.now)
+
+    def test_scheduler_runs_batches_and_sleeps_until_next_due(self):
+        """
+        Test that the scheduler drains due jobs in batches and reschedules them in its heap without reloading
+        """
+        for user_id in range(5):
+            self.create_job(user_id, Decimal('150.00'), frequency='30m')
+        scheduler = MonitorScheduler(batch_size=2, refresh_interval=3600)
+        results = scheduler.run_pending(now=self.now)
+        self.assertEqual((results.claimed, results.notified), (5, 5))
+        self.assertEqual(scheduler.seconds_until_due(now=self.now), 30 * 60)
+        with self.assertNumQueries(0):
+            self.assertEqual(scheduler.run_pending(now=self.now + timedelta(minutes=1)).claimed, 0)
+        self.assertEqual(scheduler.run_pending(now=self.now + timedelta(minutes=30)).claimed, 5)
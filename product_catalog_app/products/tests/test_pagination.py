@@ -0,0 +1,78 @@
+from urllib.parse import parse_qs, urlparse
+from django.test import TestCase
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from core.pagination import StandardResultsSetPagination
+from products.models import Product
+
+class CursorPaginationTest(TestCase):
+    def setUp(self):
+        self.factory = APIRequestFactory()
+        # duplicate names exercise the (name, id) tie-breaker
+        for i in range(7):
+            Product.objects.create(name=f"product {i % 3}")
+
+    def _page(self, params):
+        paginator = StandardResultsSetPagination()
+        request = Request(self.factory.get('/products/', params))
+        rows = paginator.paginate_queryset(Product.objects.all(), request)
+        return rows, paginator.get_paginated_response([r.pk for r in rows]).data
+
+    def _params(self, link):
+        return {k: v[0] for k, v in parse_qs(urlparse(link).query, keep_blank_values=True).items()}
+
+    def _walk(self, params):
+        seen = []
+        rows, data = self._page(params)
+        seen.extend(data['results'])
+        while data['next']:
+            rows, data = self._page(self._params(data['next']))
+            seen.extend(data['results'])
+        return seen, data
+
+    def test_cursor_mode_walks_every_row_once(self):
+        """
+        Test that following next links returns every product once, in id order
+        """
+        seen, last = self._walk({'cursor': '', 'page_size': 3})
+        self.assertEqual(seen, list(Product.objects.order_by('id').values_list('id', flat=True)))
+        self.assertNotIn('count', last)
+
+    def test_cursor_mode_name_ordering(self):
+        """
+        Test (name, id) ordering with duplicate names
+        """
+        seen, _ = self._walk({'cursor': '', 'page_size': 2, 'ordering': 'name'})
+        self.assertEqual(seen, list(Product.objects.order_by('name', 'id').values_list('id', flat=True)))
+
+    def test_previous_link_returns_prior_page(self):
+        """
+        Test that the previous link of the second page returns the first page
+        """
+        _, first = self._page({'cursor': '', 'page_size': 3})
+        _, second = self._page(self._params(first['next']))
+        _, back = self._page(self._params(second['previous']))
+        self.assertEqual(back['results'], first['results'])
+        self.assertIsNone(back['previous'])
+
+    def test_invalid_cursor(self):
+        """
+        Test that a malformed cursor token is rejected
+        """
+        with self.assertRaises(NotFound):
+            self._page({'cursor': 'not-a-token'})
+
+    def test_unsupported_cursor_ordering(self):
+        """
+        Test that an ordering without a keyset is rejected instead of falling back to id
+        """
+        with self.assertRaises(ValidationError):
+            self._page({'cursor': '', 'ordering': '-created_at'})
+
+    def test_page_number_mode_unchanged(self):
+        """
+        Test that requests without a cursor keep page number pagination
+        """
+        _, data = self._page({'page_size': 3})
+        self.assertEqual(data['count'], 7)
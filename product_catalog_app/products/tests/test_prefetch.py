@@ -0,0 +1,45 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from assets.models import Asset, AssetAssociation
+from prices.models import Price
+from products.models import Product
+from products.prefetch import PRODUCT_ENTITY_TYPE, prefetch_product_relations
+from products.serializers import ProductSerializer
+
+class ProductPrefetchTest(TestCase):
+    def _create_products(self, count, offset=0):
+        products = []
+        for i in range(offset, offset + count):
+            product = Product.objects.create(name=f"product {i}")
+            asset = Asset.objects.create(url=f"https://example.com/{i}.jpg", type='image')
+            AssetAssociation.objects.create(asset=asset, entity=PRODUCT_ENTITY_TYPE, entity_id=product.pk)
+            Price.objects.create(product=product, price=10 + i)
+            products.append(product)
+        return products
+
+    def _count_queries(self, products):
+        with CaptureQueriesContext(connection) as ctx:
+            context = prefetch_product_relations(products)
+            ProductSerializer(products, many=True, context=context).data
+        return len(ctx.captured_queries)
+
+    def test_query_count_is_flat(self):
+        """
+        Test that serializing a page costs the same number of queries regardless of size
+        """
+        small = self._count_queries(self._create_products(2))
+        large = self._count_queries(self._create_products(20, offset=2))
+        self.assertEqual(small, large)
+
+    def test_prefetched_values_match_per_object_lookup(self):
+        """
+        Test that prefetched assets and prices match the unbatched serializer output
+        """
+        products = self._create_products(3)
+        context = prefetch_product_relations(products)
+        batched = ProductSerializer(products, many=True, context=context).data
+        single = ProductSerializer(products, many=True).data
+        for b, s in zip(batched, single):
+            self.assertEqual(b['assets'], s['assets'])
+            self.assertEqual(b['price'], s['price'])
@@ -0,0 +1,65 @@
+from django.test import TestCase
+from products.models import AttributeSetPropagation, Product, ProductAttribute, ProductAttributeSet
+from products.propagation import propagate_attribute_set
+
+class PropagateAttributeSetTest(TestCase):
+    def setUp(self):
+        self.color = ProductAttribute.objects.create(name='Color', type='text', default_value='black')
+        self.size = ProductAttribute.objects.create(name='Size', type='text', default_value='M')
+        self.attribute_set = ProductAttributeSet.objects.create(name='Shirts')
+        self.attribute_set.attributes.set([self.color, self.size])
+        self.attribute_set.refresh_from_db()
+
+    def create_products(self, count, attributes_data):
+        return [
+            Product.objects.create(name=f'shirt {i}', attribute_set=self.attribute_set, attributes_data=dict(attributes_data))
+            for i in range(count)
+        ]
+
+    def test_drops_removed_and_adds_new_keys(self):
+        """
+        Test that stale keys are removed, new keys get defaults and values are kept
+        """
+        products = self.create_products(5, {'color': 'red', 'legacy': 1})
+        run = propagate_attribute_set(self.attribute_set, chunk_size=2)
+        self.assertEqual((run.processed, run.updated, run.total), (5, 5, 5))
+        self.assertIsNotNone(run.completed_at)
+        for product in products:
+            product.refresh_from_db()
+            self.assertEqual(product.attributes_data, {'color': 'red', 'size': 'M'})
+
+    def test_resumes_from_checkpoint(self):
+        """
+        Test that a run resumes after the last committed product
+        """
+        products = self.create_products(4, {})
+        AttributeSetPropagation.objects.create(
+            attribute_set=self.attribute_set,
+            schema_version=self.attribute_set.updated_at,
+            last_product_id=products[1].pk,
+            processed=2,
+        )
+        seen = []
+        run = propagate_attribute_set(self.attribute_set, chunk_size=10, progress=lambda c: seen.append(c.processed))
+        self.assertEqual(run.processed, 4)
+        self.assertEqual(run.updated, 2)
+        self.assertEqual(seen, [4])
+        self.assertEqual(Product.objects.get(pk=products[0].pk).attributes_data, {})
+        self.assertEqual(Product.objects.get(pk=products[3].pk).attributes_data, {'color': 'black', 'size': 'M'})
+
+    def test_schema_change_restarts_run(self):
+        """
+        Test that a completed run is skipped until the schema changes
+        """
+        self.create_products(2, {'color': 'red', 'size': 'L'})
+        self.assertEqual(propagate_attribute_set(self.attribute_set).updated, 0)
+        self.assertEqual(propagate_attribute_set(self.attribute_set).processed, 2)
+
+        self.attribute_set.attributes.remove(self.size)
+        self.attribute_set.refresh_from_db()
+        run = propagate_attribute_set(self.attribute_set)
+        self.assertEqual((run.processed, run.updated), (2, 2))
+        self.assertEqual(
+            list(Product.objects.values_list('attributes_data', flat=True)),
+            [{'color': 'red'}, {'color': 'red'}],
+        )
@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+from products.models import Product, ProductSearchPosting
+from products.search import search_products, stem, tokenize
+
+class TokenizeTest(TestCase):
+    def test_stems_inflections_together(self):
+        """
+        Test that plurals and verb forms share a term and stop words are dropped
+        """
+        self.assertEqual(stem('running'), stem('runs'))
+        self.assertEqual(stem('boxes'), stem('box'))
+        self.assertEqual(stem('sizes'), stem('size'))
+        self.assertEqual(tokenize('The Red Bricks, 500 pieces'), ['red', 'brick', '500', 'piec'])
+
+class SearchProductsTest(TestCase):
+    def setUp(self):
+        self.bricks = Product.objects.create(name='Red brick set', description='Classic building bricks')
+        self.car = Product.objects.create(name='Race car', description='A red car built from bricks')
+        self.shirt = Product.objects.create(name='Shirt', description='Cotton', attributes_data={'color': 'Red'})
+
+    def test_ranks_name_matches_first(self):
+        """
+        Test that products are ranked by BM25 with name matches weighted higher
+        """
+        ids = [row['product_id'] for row in search_products('bricks')]
+        self.assertEqual(ids, [self.bricks.pk, self.car.pk])
+        self.assertCountEqual(
+            [row['product_id'] for row in search_products('red')],
+            [self.bricks.pk, self.car.pk, self.shirt.pk],
+        )
+        self.assertEqual(list(search_products('the')), [])
+
+    def test_index_follows_saves_and_deletes(self):
+        """
+        Test that product saves and deletes update the index
+        """
+        self.shirt.name = 'Brick patterned shirt'
+        self.shirt.save()
+        self.assertIn(self.shirt.pk, [row['product_id'] for row in search_products('brick')])
+        self.shirt.delete()
+        self.assertFalse(ProductSearchPosting.objects.filter(product_id=self.shirt.pk).exists())
+
+    def test_search_endpoint(self):
+        """
+        Test that /products/search/ returns ranked, paginated products
+        """
+        client = APIClient()
+        client.force_authenticate(user=get_user_model()(username='searcher'))
+        response = client.get('/api/products/search/', {'q': 'red bricks', 'page_size': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(response.data['results'][0]['id'], self.bricks.pk)
+        self.assertIn('score', response.data['results'][0])
+        self.assertEqual(client.get('/api/products/search/').status_code, 400)
@@ -0,0 +1,71 @@
+from django.test import TestCase
+from rest_framework.exceptions import ValidationError
+from products.models import ProductAttribute, ProductAttributeSet
+from products.serializers import ProductSerializer
+from products.validation import clear_attribute_set_validators, get_attribute_set_validator
+
+class AttributeSetValidatorTest(TestCase):
+    def setUp(self):
+        clear_attribute_set_validators()
+        self.color = ProductAttribute.objects.create(
+            name='Color',
+            type='select',
+            is_required=True,
+            options=[{'value': 'red', 'label': 'Red'}, {'value': 'blue', 'label': 'Blue'}],
+        )
+        self.part_count = ProductAttribute.objects.create(
+            name='Part Count',
+            type='number',
+            validation_rules={'min': 1, 'max': 5000},
+        )
+        self.model_number = ProductAttribute.objects.create(
+            name='Model Number',
+            type='text',
+            validation_rules={'pattern': r'^[A-Z]{2}-\d+$'},
+        )
+        self.attribute_set = ProductAttributeSet.objects.create(name='Toys')
+        self.attribute_set.attributes.set([self.color, self.part_count, self.model_number])
+        self.attribute_set.refresh_from_db()
+
+    def test_valid_attributes(self):
+        """
+        Test that valid attributes_data passes
+        """
+        validator = get_attribute_set_validator(self.attribute_set)
+        self.assertEqual(validator.errors({'color': 'red', 'part-count': 500, 'model-number': 'AB-12'}), {})
+
+    def test_invalid_attributes_collects_errors(self):
+        """
+        Test that every failing attribute is reported
+        """
+        validator = get_attribute_set_validator(self.attribute_set)
+        errors = validator.errors({'part-count': 9000, 'model-number': 'nope'})
+        self.assertEqual(set(errors), {'color', 'part-count', 'model-number'})
+        with self.assertRaises(ValidationError):
+            validator({'color': 'green'})
+
+    def test_validator_is_cached_until_set_changes(self):
+        """
+        Test that the schema is loaded once and reloaded after an attribute changes
+        """
+        first = get_attribute_set_validator(self.attribute_set)
+        with self.assertNumQueries(0):
+            self.assertIs(get_attribute_set_validator(self.attribute_set), first)
+        self.color.options = [{'value': 'green', 'label': 'Green'}]
+        self.color.save()
+        self.attribute_set.refresh_from_db()
+        second = get_attribute_set_validator(self.attribute_set)
+        self.assertIsNot(second, first)
+        self.assertEqual(second.errors({'color': 'green'}), {})
+
+    def test_serializer_uses_validator(self):
+        """
+        Test that ProductSerializer rejects invalid attributes_data
+        """
+        serializer = ProductSerializer(data={
+            'name': 'robot kit',
+            'attribute_set': self.attribute_set.pk,
+            'attributes_data': {'color': 'green'},
+        })
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('color', serializer.errors)
@@ -1,11 +1,12 @@
 from django.urls import include, path
 from rest_framework import routers
-from .views import ProductAttributeViewSet, ProductAttributeSetViewSet, ProductViewSet, ProductMonitorJobViewSet, ProductImageViewSet
+from .views import ProductAttributeViewSet, ProductAttributeSetViewSet, ProductViewSet, ProductImportJobViewSet, ProductMonitorJobViewSet, ProductImageViewSet
 
 router = routers.DefaultRouter()
 router.register(r'product-attributes', ProductAttributeViewSet, basename='product-attribute')
 router.register(r'product-attribute-sets', ProductAttributeSetViewSet, basename='product-attribute-set')
 router.register(r'products', ProductViewSet, basename='product')
+router.register(r'product-imports', ProductImportJobViewSet, basename='product-import')
 router.register(r'product-monitor-jobs', ProductMonitorJobViewSet, basename='product-monitor-job')
 # router.register(r'product-image', ProductImageViewSet, basename='product-image')
 
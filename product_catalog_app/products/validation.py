@@ -0,0 +1,201 @@
+import json
+import logging
+import re
+import threading
+from typing import Any, Callable, Dict, Optional
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import models
+from rest_framework import serializers
+from .models import ProductAttribute, ProductAttributeSet
+
+logger = logging.getLogger(__name__)
+
+# A compiled check returns an error message, or None when the value is valid.
+AttributeCheck = Callable[[Any], Optional[str]]
+
+def _option_values(attr: ProductAttribute):
+    values = [opt['value'] for opt in attr.options] if attr.options else []
+    try:
+        return frozenset(values)
+    except TypeError:
+        return tuple(values)
+
+def _compile_number(attr: ProductAttribute) -> AttributeCheck:
+    rules = attr.validation_rules or {}
+    minimum = rules.get('min')
+    maximum = rules.get('max')
+
+    def check(value):
+        if not isinstance(value, (int, float)):
+            try:
+                float(value)
+            except (ValueError, TypeError):
+                return f"'{attr.name}' must be a valid number."
+            return None
+        if minimum is not None and value < minimum:
+            return f"'{attr.name}' must be at least {minimum}."
+        if maximum is not None and value > maximum:
+            return f"'{attr.name}' must be at most {maximum}."
+        return None
+    return check
+
+def _compile_boolean(attr: ProductAttribute) -> AttributeCheck:
+    def check(value):
+        if not isinstance(value, bool):
+            return f"'{attr.name}' must be a boolean"
+        return None
+    return check
+
+def _compile_select(attr: ProductAttribute) -> AttributeCheck:
+    valid_values = _option_values(attr)
+
+    def check(value):
+        try:
+            if value in valid_values:
+                return None
+        except TypeError:
+            pass
+        return f"'{attr.name}' value '{value}' is not a valid option."
+    return check
+
+def _compile_multiselect(attr: ProductAttribute) -> AttributeCheck:
+    valid_values = _option_values(attr)
+
+    def check(value):
+        if not isinstance(value, list):
+            return f"'{attr.name}' must be a list of values."
+        try:
+            if all(item in valid_values for item in value):
+                return None
+        except TypeError:
+            pass
+        return f"One or more values in '{attr.name}' are not valid options."
+    return check
+
+def _compile_json(attr: ProductAttribute) -> AttributeCheck:
+    def check(value):
+        if isinstance(value, (dict, list)):
+            return None
+        try:
+            json.loads(value)
+        except (json.JSONDecodeError, TypeError):
+            return f"'{attr.name}' must be valid JSON."
+        return None
+    return check
+
+def _compile_temporal(field: models.Field, message: str):
+    def compiler(attr: ProductAttribute) -> AttributeCheck:
+        def check(value):
+            try:
+                field.to_python(value)
+            except (ValueError, TypeError, DjangoValidationError):
+                return message.format(name=attr.name)
+            return None
+        return check
+    return compiler
+
+def _compile_text(attr: ProductAttribute) -> AttributeCheck:
+    rules = attr.validation_rules or {}
+    min_length = rules.get('min_length')
+    max_length = rules.get('max_length')
+    pattern = None
+    if rules.get('pattern'):
+        try:
+            pattern = re.compile(rules['pattern'])
+        except re.error as e:
+            logger.warning(f"Ignoring invalid pattern for attribute {attr.code}: {e}")
+
+    def check(value):
+        if not isinstance(value, str):
+            return f"'{attr.name}' must be a string."
+        if min_length is not None and len(value) < min_length:
+            return f"'{attr.name}' must be at least {min_length} characters long."
+        if max_length is not None and len(value) > max_length:
+            return f"'{attr.name}' must be at most {max_length} characters long."
+        if pattern is not None and not pattern.match(value):
+            return f"'{attr.name}' does not match the required pattern."
+        return None
+    return check
+
+ATTRIBUTE_COMPILERS = {
+    'number': _compile_number,
+    'boolean': _compile_boolean,
+    'select': _compile_select,
+    'multiselect': _compile_multiselect,
+    'json': _compile_json,
+    'date': _compile_temporal(models.DateField(), "'{name}' must be a valid date (YYYY-MM-DD)."),
+    'datetime': _compile_temporal(models.DateTimeField(), "'{name}' must be a valid datetime (YYYY-MM-DDTHH:MM:SSZ)."),
+    'text': _compile_text,
+    'textarea': _compile_text,
+}
+
+class AttributeSetValidator:
+    """Validates ``Product.attributes_data`` against a compiled attribute set.
+
+    All per-attribute work that does not depend on the product (type
+    dispatch, option sets, numeric bounds, regexes) is done once when the
+    validator is built, so validating a product is a single pass over
+    precompiled checks.
+
+    Example:
+        validator = get_attribute_set_validator(attribute_set)
+        validator(attributes_data)  # raises serializers.ValidationError
+    """
+    def __init__(self, attribute_set: ProductAttributeSet):
+        self.key = (attribute_set.pk, attribute_set.updated_at)
+        self._rules = []
+        for attr in attribute_set.attributes.all():
+            compiler = ATTRIBUTE_COMPILERS.get(attr.type)
+            check = compiler(attr) if compiler else None
+            self._rules.append((attr.code, attr.name, attr.is_required, check))
+
+    def errors(self, attributes_data) -> Dict[str, str]:
+        """Returns validation errors keyed by attribute code; empty when valid."""
+        if attributes_data is None:
+            attributes_data = {}
+        if not isinstance(attributes_data, dict):
+            return {"attributes_data": "must be a JSON object."}
+        errors = {}
+        for code, name, is_required, check in self._rules:
+            value = attributes_data.get(code)
+            if value is None or (isinstance(value, str) and not value.strip()):
+                if is_required:
+                    errors[code] = f"'{name}' is required."
+                    continue
+                if value is None:
+                    continue
+            if check is not None:
+                message = check(value)
+                if message:
+                    errors[code] = message
+        return errors
+
+    def __call__(self, attributes_data):
+        errors = self.errors(attributes_data)
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attributes_data
+
+_validators: Dict[int, AttributeSetValidator] = {}
+_validators_lock = threading.Lock()
+
+def get_attribute_set_validator(attribute_set: ProductAttributeSet) -> AttributeSetValidator:
+    """Returns the cached validator for ``attribute_set``, compiling it if stale.
+
+    Validators are cached per process and keyed on the set id and
+    ``updated_at``; attribute and membership changes bump the set's
+    ``updated_at`` (see ``products.signals``) so every worker recompiles.
+    """
+    key = (attribute_set.pk, attribute_set.updated_at)
+    with _validators_lock:
+        validator = _validators.get(attribute_set.pk)
+    if validator is not None and validator.key == key:
+        return validator
+    validator = AttributeSetValidator(attribute_set)
+    with _validators_lock:
+        _validators[attribute_set.pk] = validator
+    return validator
+
+def clear_attribute_set_validators() -> None:
+    with _validators_lock:
+        _validators.clear()
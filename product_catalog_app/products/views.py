@@ -1,33 +1,39 @@
 import logging
 from asgiref.sync import async_to_sync
-from rest_framework import permissions, status, viewsets
+from rest_framework import mixins, permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.filters import SearchFilter, OrderingFilter
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
+from core.pagination import SearchResultsSetPagination, StandardResultsSetPagination
+from django.db import transaction
+from django.http import StreamingHttpResponse
 from django.utils.text import slugify
+from prices.serializers import PriceLookupQuerySerializer
 from product_catalog_app.containers.django_container import DjangoContainer
 from product_catalog_app.products.agents.generate_from_image.command import GenerateProductFromImageCommand
 from product_catalog_app.products.agents.generate_from_image.params import GenerateProductFromImageParams
 from product_catalog_app.products.commands.generate_description import GenerateDescriptionCommand
 from product_catalog_app.products.commands.params import GenerateDescriptionParams
-from .messaging import publish_validation_events
-from .models import Product, ProductAttribute, ProductAttributeSet, ProductMonitorJob
-from .serializers import AIProductGenerateRequestSeralizer, AIImageProductGenerateRequestSerializer, ProductSerializer, ProductAttributeSerializer, ProductAttributeSetSerializer, ProductMonitorJobSerializer
+from .export import EXPORT_FORMATS, CSVRenderer, NDJSONRenderer
+from .facets import facet_counts
+from .filters import AttributeFilterBackend
+from .imports import ImportJobUnavailable, queue_import
+from .ingest import bulk_create_products
+from .messaging import enqueue_validation_events
+from .models import Product, ProductAttribute, ProductAttributeSet, ProductImportJob, ProductMonitorJob
+from .prefetch import prefetch_product_relations
+from .search import search_products
+from .serializers import AIProductGenerateRequestSeralizer, AIImageProductGenerateRequestSerializer, ProductSerializer, ProductAttributeSerializer, ProductAttributeSetSerializer, ProductImportErrorSerializer, ProductImportJobSerializer, ProductMonitorJobSerializer
 from .services import ProductAIGenerationService, ProductAIGenerationServiceError
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
-class StandardResultsSetPagination(PageNumberPagination):
-    page_size = 10
-    page_size_query_param = 'page_size'
-    max_page_size = 200
-    
 class ProductAttributeViewSet(viewsets.ModelViewSet):
     queryset = ProductAttribute.objects.all().order_by('name')
     serializer_class = ProductAttributeSerializer
@@ -91,12 +97,46 @@ class ProductViewSet(viewsets.ModelViewSet):
     serializer_class = ProductSerializer
     pagination_class = StandardResultsSetPagination
     permission_classes = [permissions.IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, AttributeFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['name', 'description', 'is_ai_generated', 'verification_status']
     search_fields = ['name', 'description']
     ordering_fields = ['id', 'name']
     ordering = ['id']
 
+    def get_queryset(self):
+        return super().get_queryset().select_related('brand', 'category', 'attribute_set')
+
+    def get_serializer_context(self):
+        """Adds the ``?at=``/``?region_code=``/``?currency_code=`` price lookup."""
+        context = super().get_serializer_context()
+        if self.request is not None:
+            lookup = PriceLookupQuerySerializer(data=self.request.query_params)
+            lookup.is_valid(raise_exception=True)
+            context['price_lookup'] = dict(lookup.validated_data)
+        return context
+
+    def get_prefetched_serializer(self, products, **kwargs):
+        """Serializer with assets and prices for ``products`` loaded in batch."""
+        context = self.get_serializer_context()
+        context.update(prefetch_product_relations(products, context.get('price_lookup')))
+        return self.get_serializer_class()(products, context=context, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_prefetched_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_prefetched_serializer(list(queryset), many=True)
+        return Response(serializer.data)
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        context = self.get_serializer_context()
+        context.update(prefetch_product_relations([instance], context.get('price_lookup')))
+        serializer = self.get_serializer_class()(instance, context=context)
+        return Response(serializer.data)
+
     @action(detail=False, methods=['post'], url_path='bulk')
     def bulk_create(self, request, *args, **kwargs):
         logger.info("Received bulk create request for products.")
@@ -106,34 +146,67 @@ class ProductViewSet(viewsets.ModelViewSet):
             return Response(
                 {"error": "Invalid request format. Expected a list of products."},
                 status=status.HTTP_400_BAD_REQUEST,
-                created_products=[],
             )
         logger.info(f"Bulk create request received with {len(request.data)} products.")
         serializer = self.get_serializer(data=request.data, many=True)
         serializer.is_valid(raise_exception=True)
-        products = [
-            Product(
-                name=p.get('name'),
-                description=p.get('description'),
-                is_active=p.get('is_active'),
-                is_ai_generated=p.get('is_ai_generated'),
-                verification_status=p.get('verification_status'),
-                brand=p.get('brand'),
-                category=p.get('category'),
-                attribute_set=p.get('attribute_set'),
-                attributes_data=p.get('attributes_data'),
-                suggested_corrections=p.get('suggested_corrections'),
-            )
-            for p in serializer.validated_data
-        ]
-        names = {p.name for p in products}
-        Product.objects.bulk_create(products)
-        created = Product.objects.filter(name__in=names)
-        product_ids = [p.id for p in created]
-        publish_validation_events(product_ids)
-        response_serializer = self.get_serializer(created, many=True)
+        with transaction.atomic():
+            created = bulk_create_products(serializer.validated_data)
+            enqueue_validation_events([p.pk for p in created])
+        response_serializer = self.get_prefetched_serializer(created, many=True)
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=['get'], url_path='search', pagination_class=SearchResultsSetPagination)
+    def search(self, request, *args, **kwargs):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {"error": "Missing search query parameter 'q'."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        page = self.paginate_queryset(search_products(query))
+        scores = {row['product_id']: row['score'] for row in page}
+        products = self.get_queryset().in_bulk(list(scores))
+        ranked = [products[pk] for pk in scores if pk in products]
+        results = self.get_prefetched_serializer(ranked, many=True).data
+        for item, product in zip(results, ranked):
+            item['score'] = scores[product.pk]
+        return self.get_paginated_response(results)
+
+    @action(detail=False, methods=['get'], url_path='facets')
+    def facets(self, request, *args, **kwargs):
+        """Facet counts for the products matching the request's filters.
+
+        ``?facets=brand,attr.color`` limits the response to those facets.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        requested = request.query_params.get('facets')
+        facets = [f.strip() for f in requested.split(',') if f.strip()] if requested else None
+        return Response(facet_counts(queryset, facets))
+
+    @action(
+        detail=False,
+        methods=['get'],
+        url_path='export',
+        renderer_classes=[JSONRenderer, BrowsableAPIRenderer, NDJSONRenderer, CSVRenderer],
+    )
+    def export(self, request, *args, **kwargs):
+        """Streams every product matching the list filters as NDJSON or CSV."""
+        export_format = request.query_params.get('format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {"error": f"Unsupported export format '{export_format}'. Use one of: {', '.join(EXPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        exporter, content_type = EXPORT_FORMATS[export_format]
+        queryset = self.filter_queryset(self.get_queryset())
+        response = StreamingHttpResponse(
+            exporter(queryset, self.get_serializer_context()),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = f'attachment; filename="products.{export_format}"'
+        return response
+
     @action(detail=False, methods=['post'], url_path='generate')
     def generate(self, request, *args, **kwargs):
         logger.info("Received AI generation request for product")
@@ -262,10 +335,66 @@ class ProductImageViewSet(APIView):
                 "details": str(e),
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             
+class ProductImportJobViewSet(mixins.CreateModelMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    API endpoint for importing products from CSV or NDJSON files.
+
+    The upload is stored as a pending job and imported in chunks by the
+    ``import_products --pending`` management command (or ``--job`` for a
+    single job), outside the request. A job that fails part way is queued
+    again with the ``resume`` action.
+    """
+    queryset = ProductImportJob.objects.all()
+    serializer_class = ProductImportJobSerializer
+    pagination_class = StandardResultsSetPagination
+    cursor_orderings = {'id': ('id',)}
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = (MultiPartParser, FormParser,)
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = ['status', 'format']
+    ordering_fields = ['id']
+    ordering = ['-id']
+
+    def check_import_permission(self, request):
+        if not request.user.has_perm('products.add_product'):
+            raise PermissionDenied('You do not have permission to import products.')
+
+    def create(self, request, *args, **kwargs):
+        self.check_import_permission(request)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = serializer.save(user_id=getattr(request.user, 'pk', None))
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['post'], url_path='resume')
+    def resume(self, request, *args, **kwargs):
+        self.check_import_permission(request)
+        try:
+            job = queue_import(self.get_object())
+        except ImportJobUnavailable as e:
+            if e.status == 'RUNNING':
+                return Response(
+                    {"error": "Import is already running."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            return Response(
+                {"error": "Import has already completed."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(self.get_serializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'], url_path='errors')
+    def errors(self, request, *args, **kwargs):
+        job = self.get_object()
+        page = self.paginate_queryset(job.row_errors.order_by('id'))
+        serializer = ProductImportErrorSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
 class ProductMonitorJobViewSet(viewsets.ModelViewSet):
     queryset = ProductMonitorJob.objects.all()
     serializer_class = ProductMonitorJobSerializer
     pagination_class = StandardResultsSetPagination
+    cursor_orderings = {'id': ('id',)}
     permission_classes = [permissions.IsAuthenticated]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['product', 'user_id']
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any
+from typing import Any, Dict, Iterable, Optional
+from .publisher import PublishCounters, PublisherSettings, PublishResults, publish_all
 
 class AbstractPubSubClient(ABC):
     def __init__(self, container):
@@ -7,6 +8,8 @@ class AbstractPubSubClient(ABC):
         self._project_id = self._container.get_config_property('PUBSUB_PROJECT_ID')
         self._publisher = None
         self._subscriber = None
+        self._publisher_settings = PublisherSettings(self._get_optional_config_property)
+        self._counters = PublishCounters()
         self.initialize()
 
     # initialize publisher and subscriber in concrete class
@@ -14,6 +17,12 @@ class AbstractPubSubClient(ABC):
     def initialize(self):
         pass
 
+    def _get_optional_config_property(self, property):
+        try:
+            return self._container.get_config_property(property)
+        except ValueError:
+            return None
+
     @property
     def project_id(self):
         return self._project_id
@@ -26,10 +35,48 @@ class AbstractPubSubClient(ABC):
     def subscriber(self):
         return self._subscriber
 
+    @property
+    def publisher_settings(self) -> PublisherSettings:
+        return self._publisher_settings
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Counts of messages queued (awaiting ack), published and failed."""
+        return self._counters.snapshot()
+
     @abstractmethod
     def publish(self, topic: str, data: Dict[str, Any]):
         pass
 
+    def publish_many(
+        self,
+        topic: str,
+        messages: Iterable[Dict[str, Any]],
+        keys: Optional[Iterable[Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> PublishResults:
+        """Publishes a batch of messages and collects their futures into one result.
+
+        Args:
+            topic: The topic id to publish to.
+            messages: The message payloads.
+            keys: Optional identifiers (e.g. product ids) reported back in the results.
+            timeout: Seconds to wait for outstanding publishes once all are sent.
+
+        Returns:
+            PublishResults: Published and failed keys.
+
+        Example:
+            results = client.publish_many(PRODUCT_CREATION_TOPIC, messages, keys=product_ids)
+        """
+        return publish_all(
+            lambda message: self.publish(topic, message),
+            messages,
+            keys=keys,
+            max_in_flight=self._publisher_settings.max_in_flight_messages,
+            timeout=timeout,
+        )
+
     @abstractmethod
     def subscribe(self, subscription_id: str, callback):
         pass
@@ -48,4 +95,4 @@ class AbstractPubSubClient(ABC):
     
     @abstractmethod
     def get_topic(self, topic_id: str):
-        pass
\ No newline at end of file
+        pass
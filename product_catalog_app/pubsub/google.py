@@ -1,19 +1,36 @@
-import json
 from typing import Dict, Any
 from google.api_core.exceptions import AlreadyExists, NotFound
 from google.cloud import pubsub_v1
 from .base import AbstractPubSubClient
+from .publisher import PublisherSettings, encode_message
+
+def make_publisher_client(settings: PublisherSettings) -> pubsub_v1.PublisherClient:
+    """Builds a publisher that batches messages and blocks when too many are in flight."""
+    return pubsub_v1.PublisherClient(
+        batch_settings=pubsub_v1.types.BatchSettings(
+            max_messages=settings.max_messages,
+            max_bytes=settings.max_bytes,
+            max_latency=settings.max_latency,
+        ),
+        publisher_options=pubsub_v1.types.PublisherOptions(
+            flow_control=pubsub_v1.types.PublishFlowControl(
+                message_limit=settings.max_in_flight_messages,
+                byte_limit=settings.max_in_flight_bytes,
+                limit_exceeded_behavior=pubsub_v1.types.LimitExceededBehavior.BLOCK,
+            ),
+        ),
+    )
 
 class GooglePubSubClient(AbstractPubSubClient):
     def initialize(self):
-        self._publisher = pubsub_v1.PublisherClient()
+        self._publisher = make_publisher_client(self.publisher_settings)
         self._subscriber = pubsub_v1.SubscriberClient()
 
     def publish(self, topic: str, data: Dict[str, Any]):
-        return self.publisher.publish(
+        return self._counters.track(self.publisher.publish(
             self.publisher.topic_path(self.project_id, topic),
-            data=json.dumps(data).encode('utf-8')
-        )
+            data=encode_message(data)
+        ))
 
     def subscribe(self, subscription_id: str, callback):        
         return self.subscriber.subscribe(
@@ -0,0 +1,164 @@
+import concurrent.futures
+import json
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+DEFAULT_PUBLISHER_SETTINGS = {
+    'PUBSUB_BATCH_MAX_MESSAGES': 100,
+    'PUBSUB_BATCH_MAX_BYTES': 1024 * 1024,
+    'PUBSUB_BATCH_MAX_LATENCY': 0.05,
+    'PUBSUB_MAX_IN_FLIGHT_MESSAGES': 1000,
+    'PUBSUB_MAX_IN_FLIGHT_BYTES': 10 * 1024 * 1024,
+}
+
+class PublisherSettings():
+    """Batching and flow-control limits shared by the publisher clients.
+
+    Batches are flushed when any of ``max_messages``, ``max_bytes`` or
+    ``max_latency`` (seconds) is reached. Publishing blocks once
+    ``max_in_flight_messages`` or ``max_in_flight_bytes`` are awaiting an ack.
+    """
+    def __init__(self, get_setting: Callable[[str], Any]):
+        """Initialize from a settings lookup.
+
+        Args:
+            get_setting: Returns the configured value for a setting name, or
+                a falsy value when it is not set.
+        """
+        values = {}
+        for name, default in DEFAULT_PUBLISHER_SETTINGS.items():
+            value = get_setting(name)
+            values[name] = type(default)(value) if value else default
+        self.max_messages = values['PUBSUB_BATCH_MAX_MESSAGES']
+        self.max_bytes = values['PUBSUB_BATCH_MAX_BYTES']
+        self.max_latency = values['PUBSUB_BATCH_MAX_LATENCY']
+        self.max_in_flight_messages = values['PUBSUB_MAX_IN_FLIGHT_MESSAGES']
+        self.max_in_flight_bytes = values['PUBSUB_MAX_IN_FLIGHT_BYTES']
+
+class PublishCounters():
+    """Thread-safe counters for messages queued, published and failed."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._published = 0
+        self._failed = 0
+
+    def track(self, future: concurrent.futures.Future) -> concurrent.futures.Future:
+        """Counts ``future`` as queued until it resolves."""
+        with self._lock:
+            self._queued += 1
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: concurrent.futures.Future) -> None:
+        failed = future.cancelled() or future.exception() is not None
+        with self._lock:
+            self._queued -= 1
+            if failed:
+                self._failed += 1
+            else:
+                self._published += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'queued': self._queued,
+                'published': self._published,
+                'failed': self._failed,
+            }
+
+class PublishResults():
+    """Aggregated outcome of a ``publish_many`` call.
+
+    Messages are identified by the keys passed to ``publish_many`` (their
+    position in the input when no keys are given).
+    """
+    def __init__(self):
+        self._published = []
+        self._message_ids = []
+        self._failed = []
+        self._errors = []
+
+    def __str__(self):
+        return f"PublishResults(published={len(self.published)}, failed={len(self.failed)})"
+
+    def add_published(self, key, message_id) -> None:
+        self._published.append(key)
+        self._message_ids.append(message_id)
+
+    def add_failed(self, key, error: Exception) -> None:
+        self._failed.append(key)
+        self._errors.append(f"{key}: {error}")
+
+    @property
+    def published(self) -> List[Any]:
+        return self._published
+
+    @property
+    def message_ids(self) -> List[str]:
+        return self._message_ids
+
+    @property
+    def failed(self) -> List[Any]:
+        return self._failed
+
+    @property
+    def errors(self) -> List[str]:
+        return self._errors
+
+    @property
+    def success(self) -> bool:
+        return not self._failed
+
+def encode_message(data: Dict[str, Any]) -> bytes:
+    return json.dumps(data).encode('utf-8')
+
+def _collect(done, pending: dict, results: PublishResults) -> None:
+    for future in done:
+        key = pending.pop(future)
+        try:
+            results.add_published(key, future.result())
+        except Exception as e:
+            results.add_failed(key, e)
+
+def publish_all(
+    publish: Callable[[Dict[str, Any]], concurrent.futures.Future],
+    messages: Iterable[Dict[str, Any]],
+    keys: Optional[Iterable[Any]] = None,
+    max_in_flight: int = DEFAULT_PUBLISHER_SETTINGS['PUBSUB_MAX_IN_FLIGHT_MESSAGES'],
+    timeout: Optional[float] = None,
+) -> PublishResults:
+    """Publishes every message and waits for all of them to resolve.
+
+    At most ``max_in_flight`` publishes are left unacknowledged at once;
+    once the limit is reached the call waits for the broker before sending
+    more.
+
+    Args:
+        publish: Sends one message and returns its future.
+        messages: The message payloads.
+        keys: Optional identifiers reported back in the results.
+        max_in_flight: Maximum number of unacknowledged publishes.
+        timeout: Seconds to wait for the outstanding publishes at the end.
+
+    Returns:
+        PublishResults: Published and failed keys.
+    """
+    results = PublishResults()
+    pending = {}
+    keys = iter(keys) if keys is not None else None
+    for index, message in enumerate(messages):
+        key = next(keys) if keys is not None else index
+        if len(pending) >= max_in_flight:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            _collect(done, pending, results)
+        try:
+            pending[publish(message)] = key
+        except Exception as e:
+            results.add_failed(key, e)
+    if pending:
+        done, not_done = concurrent.futures.wait(pending, timeout=timeout)
+        _collect(done, pending, results)
+        for future in not_done:
+            results.add_failed(pending.pop(future), TimeoutError('publish was not acknowledged in time'))
+    return results
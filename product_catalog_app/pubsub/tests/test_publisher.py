@@ -0,0 +1,90 @@
+import concurrent.futures
+import threading
+from unittest.mock import Mock
+from pubsub.publisher import PublishCounters, PublisherSettings, publish_all
+
+
+def make_future(exc=None):
+    """Create an already resolved future.
+
+    Args:
+        exc: Exception to resolve the future with, or None for success.
+
+    Returns:
+        concurrent.futures.Future: The resolved future.
+    """
+    future = concurrent.futures.Future()
+    if exc:
+        future.set_exception(exc)
+    else:
+        future.set_result('message-id')
+    return future
+
+
+class TestPublishAll:
+    """Test cases for publish_all."""
+
+    def test_aggregates_published_and_failed(self):
+        """Test that successes and failures are collected by key."""
+        publish = Mock(side_effect=lambda m: make_future(RuntimeError('boom') if m['id'] == 3 else None))
+        messages = [{'id': i} for i in range(1, 6)]
+
+        results = publish_all(publish, messages, keys=[m['id'] for m in messages], max_in_flight=2)
+
+        assert sorted(results.published) == [1, 2, 4, 5]
+        assert results.failed == [3]
+        assert not results.success
+        assert publish.call_count == 5
+
+    def test_bounds_in_flight(self):
+        """Test that no more than max_in_flight publishes are left unacknowledged."""
+        futures = []
+        outstanding = []
+
+        def publish(message):
+            outstanding.append(sum(1 for f in futures if not f.done()))
+            future = concurrent.futures.Future()
+            futures.append(future)
+            threading.Timer(0.01, future.set_result, args=('ok',)).start()
+            return future
+
+        results = publish_all(publish, [{} for _ in range(10)], max_in_flight=3)
+
+        assert max(outstanding) < 3
+        assert len(results.published) == 10
+
+    def test_publish_exception_is_reported(self):
+        """Test that a publish call raising is reported as a failure."""
+        publish = Mock(side_effect=ValueError('bad message'))
+
+        results = publish_all(publish, [{'id': 1}])
+
+        assert results.failed == [0]
+        assert 'bad message' in results.errors[0]
+
+
+class TestPublishCounters:
+    """Test cases for PublishCounters."""
+
+    def test_counts_queued_published_and_failed(self):
+        """Test that counters follow future resolution."""
+        counters = PublishCounters()
+        ok = counters.track(concurrent.futures.Future())
+        bad = counters.track(concurrent.futures.Future())
+        assert counters.snapshot() == {'queued': 2, 'published': 0, 'failed': 0}
+
+        ok.set_result('id')
+        bad.set_exception(RuntimeError('boom'))
+
+        assert counters.snapshot() == {'queued': 0, 'published': 1, 'failed': 1}
+
+
+class TestPublisherSettings:
+    """Test cases for PublisherSettings."""
+
+    def test_defaults_and_overrides(self):
+        """Test that unset values fall back to defaults."""
+        settings = PublisherSettings({'PUBSUB_BATCH_MAX_MESSAGES': '50'}.get)
+
+        assert settings.max_messages == 50
+        assert settings.max_latency == 0.05